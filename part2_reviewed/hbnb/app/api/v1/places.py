@@ -25,6 +25,21 @@ place_model = api.model('Place', {
     'amenities': fields.List(fields.String, required=True, description="List of amenity IDs")
 })
 
+place_filter_parser = api.parser()
+place_filter_parser.add_argument('min_price', type=float, location='args', help='Minimum price per night')
+place_filter_parser.add_argument('max_price', type=float, location='args', help='Maximum price per night')
+place_filter_parser.add_argument('bbox', type=str, location='args', help='south,west,north,east')
+place_filter_parser.add_argument('owner_id', type=str, location='args', help='Owner ID')
+
+
+def parse_bbox(value):
+    try:
+        south, west, north, east = (float(bound) for bound in value.split(','))
+    except ValueError:
+        raise ValueError("bbox must be south,west,north,east")
+    return south, west, north, east
+
+
 @api.route('/')
 class PlaceList(Resource):
     @api.expect(place_model)
@@ -61,10 +76,18 @@ class PlaceList(Resource):
             } for amenity in new_place["amenities"]]
         }, 201
 
+    @api.expect(place_filter_parser)
     @api.response(200, 'List of places retrieved successfully')
+    @api.response(400, 'Invalid filter')
     def get(self):
-        """Retrieve a list of all places"""
-        places = facade.get_all_places()
+        """Retrieve a list of all places, optionally filtered"""
+        filters = place_filter_parser.parse_args()
+        try:
+            if filters['bbox'] is not None:
+                filters['bbox'] = parse_bbox(filters['bbox'])
+        except ValueError as error:
+            return {'error': str(error)}, 400
+        places = facade.find_places(**filters)
         return [{
             'id': place["id"],
             'title': place["title"],
@@ -0,0 +1,300 @@
+"""Slotted variants of the models for large in-memory data sets.
+
+CompactUser, CompactAmenity, CompactPlace and CompactReview validate and
+behave like User, Amenity, Place and Review and expose the same attributes,
+but have no per-instance __dict__. The id is kept as its 16 UUID bytes and
+the timestamps as epoch floats; id, created_at and updated_at are rebuilt
+as str and datetime on access. Place reviews/amenities and User places are
+only allocated when first used, and owner_id is read from the owner.
+"""
+import time
+import uuid
+from datetime import datetime
+
+from app.models.user import User
+
+
+class CompactBaseModel:
+    __slots__ = ('_id', '_created_at', '_updated_at')
+
+    def __init__(self):
+        self._id = uuid.uuid4().bytes
+        # One float shared by both until the first save()
+        self._created_at = self._updated_at = time.time()
+
+    @property
+    def id(self):
+        return str(uuid.UUID(bytes=self._id))
+
+    @id.setter
+    def id(self, value):
+        self._id = uuid.UUID(value).bytes
+
+    @property
+    def created_at(self):
+        return datetime.fromtimestamp(self._created_at)
+
+    @created_at.setter
+    def created_at(self, value):
+        self._created_at = value.timestamp()
+
+    @property
+    def updated_at(self):
+        return datetime.fromtimestamp(self._updated_at)
+
+    @updated_at.setter
+    def updated_at(self, value):
+        self._updated_at = value.timestamp()
+
+    def save(self):
+        """Update the updated_at timestamp whenever the object is modified"""
+        self._updated_at = time.time()
+
+    def update(self, data):
+        """Update the attributes of the object based on the provided dictionary"""
+        for key, value in data.items():
+            if hasattr(self, key):
+                setattr(self, key, value)
+        self.save()
+
+
+class CompactUser(CompactBaseModel):
+    __slots__ = ('first_name', 'last_name', '_email', 'is_admin', '_places')
+
+    def __init__(self, first_name, last_name, email, is_admin=False):
+        if not isinstance(first_name, str):
+            raise TypeError("First name is required")
+        if first_name == "" or len(first_name) > 50:
+            raise ValueError("First name is required and must be at most 50 characters")
+        if not isinstance(last_name, str):
+            raise TypeError("Last name is required")
+        if last_name == "" or len(last_name) > 50:
+            raise ValueError("Last name is required and must be at most 50 characters")
+        if not isinstance(is_admin, bool):
+            raise TypeError("Is_admin must be boolean type")
+
+        super().__init__()
+        self.first_name = first_name
+        self.last_name = last_name
+        self.email = email
+        self.is_admin = is_admin
+        self._places = None
+
+    @property
+    def email(self):
+        return self._email
+
+    @email.setter
+    def email(self, new_email):
+        if not isinstance(new_email, str):
+            raise TypeError("email must be strings")
+        self._email = User.verified_email(new_email)
+
+    @property
+    def places(self):
+        if self._places is None:
+            self._places = []
+        return self._places
+
+    @places.setter
+    def places(self, value):
+        self._places = list(value)
+
+    def add_place(self, place):
+        self.places.append(place)
+
+    def delete_place(self, place):
+        self.places.remove(place)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'first_name': self.first_name,
+            'last_name': self.last_name,
+            'email': self.email
+        }
+
+
+class CompactAmenity(CompactBaseModel):
+    __slots__ = ('_name',)
+
+    def __init__(self, name):
+        self.name = name
+        super().__init__()
+
+    @property
+    def name(self):
+        return self._name
+
+    @name.setter
+    def name(self, value):
+        if not isinstance(value, str):
+            raise TypeError("name must be a string")
+        if len(value) > 50:
+            raise ValueError("name must be at most 50 characters long")
+        if not value.strip():
+            raise ValueError("name is required and cannot be empty")
+        self._name = value
+        self.save()
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "name": self.name,
+        }
+
+
+class CompactPlace(CompactBaseModel):
+    __slots__ = ('title', 'description', 'price', 'latitude', 'longitude', 'owner', '_reviews', '_amenities')
+
+    def __init__(self, title, price, latitude, longitude, owner, description=""):
+        if not isinstance(owner, CompactUser):
+            raise TypeError("Owner must be a User")
+        if not isinstance(title, str):
+            raise TypeError("Title must be a string")
+        if not title or len(title) > 100:
+            raise ValueError("Title is required and must be at most 100 characters")
+        if not isinstance(description, str):
+            raise TypeError("Description must be a string")
+        if description == "":
+            raise ValueError("Description is required")
+        if not isinstance(price, float):
+            raise TypeError("Price must be a float number")
+        if price < 0:
+            raise ValueError("Price must be a positive number")
+        if not isinstance(latitude, float):
+            raise TypeError("Latitude must be a float")
+        if not -90.0 <= latitude <= 90.0:
+            raise ValueError("Latitude must be between -90 and 90")
+        if not isinstance(longitude, float):
+            raise TypeError("Longitude must be a float")
+        if not -180.0 <= longitude <= 180.0:
+            raise ValueError("Longitude must be between -180 and 180")
+
+        super().__init__()
+        self.title = title
+        self.description = description
+        self.price = price
+        self.latitude = latitude
+        self.longitude = longitude
+        self.owner = owner
+        self._reviews = None
+        self._amenities = None
+
+    @property
+    def owner_id(self):
+        return self.owner.id
+
+    @property
+    def reviews(self):
+        if self._reviews is None:
+            self._reviews = []
+        return self._reviews
+
+    @reviews.setter
+    def reviews(self, value):
+        self._reviews = list(value)
+
+    @property
+    def amenities(self):
+        if self._amenities is None:
+            self._amenities = []
+        return self._amenities
+
+    @amenities.setter
+    def amenities(self, value):
+        self._amenities = list(value)
+
+    def add_review(self, review):
+        self.reviews.append(review)
+
+    def delete_review(self, review):
+        if review in self.reviews:
+            self.reviews.remove(review)
+
+    def add_amenity(self, amenity):
+        self.amenities.append(amenity)
+
+    def delete_amenity(self, amenity):
+        if amenity in self.amenities:
+            self.amenities.remove(amenity)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "title": self.title,
+            "description": self.description,
+            "price": self.price,
+            "latitude": self.latitude,
+            "longitude": self.longitude,
+            "owner_id": self.owner_id,
+            "amenities": [amenity.to_dict() for amenity in self._amenities or ()]
+        }
+
+
+class CompactReview(CompactBaseModel):
+    __slots__ = ('_text', '_rating', '_place', '_user')
+
+    def __init__(self, text, rating, user, place):
+        self.text = text
+        self.rating = rating
+        self.place = place
+        self.user = user
+        super().__init__()
+
+    @property
+    def text(self):
+        return self._text
+
+    @text.setter
+    def text(self, value):
+        if not isinstance(value, str):
+            raise TypeError("text must be a string")
+        if not value.strip():
+            raise ValueError("text is required and cannot be empty")
+        self._text = value
+        self.save()
+
+    @property
+    def rating(self):
+        return self._rating
+
+    @rating.setter
+    def rating(self, value):
+        if not isinstance(value, int):
+            raise TypeError("rating must be an integer")
+        if not (1 <= value <= 5):
+            raise ValueError("rating must be between 1 and 5")
+        self._rating = value
+        self.save()
+
+    @property
+    def place(self):
+        return self._place
+
+    @place.setter
+    def place(self, value):
+        if not isinstance(value, CompactPlace):
+            raise TypeError("place must be a place instance")
+        self._place = value
+        self.save()
+
+    @property
+    def user(self):
+        return self._user
+
+    @user.setter
+    def user(self, value):
+        if not isinstance(value, CompactUser):
+            raise ValueError("user must be a user instance")
+        self._user = value
+        self.save()
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "text": self.text,
+            "rating": self.rating,
+            "place_id": self.place.id,
+            "user_id": self.user.id
+        }
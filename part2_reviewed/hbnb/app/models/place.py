@@ -70,5 +70,6 @@ class Place(BaseModel):
             "latitude": self.latitude,
             "longitude": self.longitude,
             "owner_id": self.owner_id,
-            "amenities": [facade.get_amenity(a).to_dict() for a in self.amenities] #parcours les ID a = id
+            # create_place stores Amenity objects, update() the ids of the payload
+            "amenities": facade.get_amenities([getattr(a, 'id', a) for a in self.amenities])
         }
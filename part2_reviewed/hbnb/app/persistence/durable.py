@@ -0,0 +1,286 @@
+"""In-memory repositories that survive restarts.
+
+A DurableStore owns a directory holding a write-ahead log and snapshots for
+the repositories it creates. Every add, update and delete is appended to the
+log and fsynced before the call returns; concurrent writers share one fsync.
+Once the log holds snapshot_every records a background thread rotates it and
+writes the whole state to a snapshot, after which older files are removed.
+open() loads the latest snapshot and replays the logs written since.
+
+Files are sequences of records: a big-endian length and crc32 followed by a
+pickled (repository name, id, object) tuple, the object being None for a
+delete. snapshot.N holds the state before wal.N. Objects referencing objects
+of another repository of the store (review.place, place.owner...) store the
+reference by id, so repositories must be created in dependency order.
+"""
+import io
+import os
+import pickle
+import struct
+import threading
+import zlib
+
+from app.persistence.repository import ConcurrentInMemoryRepository
+
+RECORD_HEADER = struct.Struct('>II')
+
+
+class DurableInMemoryRepository(ConcurrentInMemoryRepository):
+    """ConcurrentInMemoryRepository whose changes are logged to its DurableStore"""
+
+    def __init__(self, store, name, unique=(), indexed=(), extra_indexes=()):
+        super().__init__(unique, indexed, extra_indexes)
+        self._store = store
+        self.name = name
+
+    def _changed(self, obj_id, obj):
+        self._store.append(self.name, obj_id, obj)
+
+    def add(self, obj):
+        super().add(obj)
+        self._store.sync()
+
+    def update(self, obj_id, data):
+        super().update(obj_id, data)
+        self._store.sync()
+
+    def delete(self, obj_id):
+        super().delete(obj_id)
+        self._store.sync()
+
+    def _restore(self, obj_id, obj):
+        """Apply a replayed record without logging it, returning the object it replaced"""
+        previous = self._storage.get(obj_id)
+        if obj is None:
+            if previous is not None:
+                del self._storage[obj_id]
+                self._unindex(previous)
+        elif previous is None:
+            self._index(obj)
+            self._storage[obj_id] = obj
+        else:
+            self._swap(previous, obj)
+            self._storage[obj_id] = obj
+        return previous
+
+
+class _RecordPickler(pickle.Pickler):
+    """Pickles references to objects stored in the store by (repository name, id)"""
+
+    def __init__(self, file, repositories, root):
+        super().__init__(file, pickle.HIGHEST_PROTOCOL)
+        self.repositories = repositories
+        self.root = root
+
+    def persistent_id(self, obj):
+        if obj is self.root:
+            return None
+        obj_id = getattr(obj, 'id', None)
+        if not isinstance(obj_id, str):
+            return None
+        for name, repository in self.repositories.items():
+            stored = repository.get(obj_id)
+            if stored is not None and type(stored) is type(obj):
+                return name, obj_id
+        # No longer stored: keep a copy inline
+        return None
+
+
+class _RecordUnpickler(pickle.Unpickler):
+    def __init__(self, file, repositories, deleted):
+        super().__init__(file)
+        self.repositories = repositories
+        self.deleted = deleted
+
+    def persistent_load(self, pid):
+        name, obj_id = pid
+        obj = self.repositories[name].get(obj_id)
+        if obj is None:
+            obj = self.deleted.get(pid)
+        if obj is None:
+            raise pickle.UnpicklingError(f"{name} '{obj_id}' referenced before it was stored")
+        return obj
+
+
+class DurableStore:
+    """Write-ahead log and snapshots shared by a set of DurableInMemoryRepository.
+
+    Create the repositories with repository(), then call open() once before
+    using them. With sync=False records are written without fsync, which
+    only survives a crash of the process, not of the machine.
+    """
+
+    def __init__(self, path, snapshot_every=100_000, sync=True):
+        self.path = path
+        self.snapshot_every = snapshot_every
+        self.sync_writes = sync
+        self._repositories = {}
+        # _sync_lock is always taken before _lock
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._log = None
+        self._generation = 0
+        self._log_records = 0
+        self._appended = 0
+        self._synced = 0
+        self._snapshot_thread = None
+        self.fsyncs = 0
+
+    def repository(self, name, unique=(), indexed=(), extra_indexes=()):
+        if self._log is not None:
+            raise RuntimeError("Repositories must be created before the store is opened")
+        repository = DurableInMemoryRepository(self, name, unique, indexed, extra_indexes)
+        self._repositories[name] = repository
+        return repository
+
+    def _file(self, kind, generation):
+        return os.path.join(self.path, f"{kind}.{generation}")
+
+    def _generations(self, kind):
+        prefix = kind + '.'
+        return sorted(int(name[len(prefix):]) for name in os.listdir(self.path)
+                      if name.startswith(prefix) and name[len(prefix):].isdigit())
+
+    # ---------- Records ----------
+
+    def _encode(self, name, obj_id, obj):
+        buffer = io.BytesIO()
+        _RecordPickler(buffer, self._repositories, obj).dump((name, obj_id, obj))
+        payload = buffer.getvalue()
+        return RECORD_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+    def _replay(self, path, deleted):
+        """Apply the records of path and return how many there were.
+
+        A torn or corrupt record, left by a crash in the middle of a write,
+        ends the file: it is truncated there so new records follow valid ones.
+        """
+        count = 0
+        with open(path, 'r+b') as file:
+            while True:
+                offset = file.tell()
+                header = file.read(RECORD_HEADER.size)
+                if not header:
+                    break
+                if len(header) == RECORD_HEADER.size:
+                    length, checksum = RECORD_HEADER.unpack(header)
+                    payload = file.read(length)
+                if len(header) != RECORD_HEADER.size or len(payload) != length or zlib.crc32(payload) != checksum:
+                    file.truncate(offset)
+                    break
+                name, obj_id, obj = _RecordUnpickler(io.BytesIO(payload), self._repositories, deleted).load()
+                previous = self._repositories[name]._restore(obj_id, obj)
+                if obj is None and previous is not None:
+                    deleted[(name, obj_id)] = previous
+                count += 1
+        return count
+
+    # ---------- Lifecycle ----------
+
+    def open(self):
+        """Load the latest snapshot, replay the logs written since and start a new log"""
+        os.makedirs(self.path, exist_ok=True)
+        for name in os.listdir(self.path):
+            if name.endswith('.tmp'):
+                os.remove(os.path.join(self.path, name))
+        snapshots = self._generations('snapshot')
+        logs = self._generations('wal')
+        generation = snapshots[-1] if snapshots else 0
+        # Objects deleted later in the logs may still be referenced by earlier records
+        deleted = {}
+        if snapshots:
+            self._replay(self._file('snapshot', generation), deleted)
+        for log_generation in logs:
+            if log_generation >= generation:
+                self._log_records += self._replay(self._file('wal', log_generation), deleted)
+        self._generation = max(logs + [generation]) + 1
+        self._log = open(self._file('wal', self._generation), 'ab')
+        if self._log_records >= self.snapshot_every:
+            self._start_snapshot()
+
+    def close(self):
+        if self._snapshot_thread is not None:
+            self._snapshot_thread.join()
+        with self._sync_lock, self._lock:
+            if self._log is not None:
+                self._log.flush()
+                os.fsync(self._log.fileno())
+                self._log.close()
+                self._log = None
+
+    # ---------- Writes ----------
+
+    def append(self, name, obj_id, obj):
+        """Write a record to the log, called by repositories under their write lock"""
+        with self._lock:
+            self._log.write(self._encode(name, obj_id, obj))
+            self._appended += 1
+            self._log_records += 1
+            if self._log_records >= self.snapshot_every:
+                self._start_snapshot()
+
+    def sync(self):
+        """Make every record appended so far durable.
+
+        Writers waiting here are covered by the fsync of the one ahead of
+        them, so the number of fsyncs drops as concurrency rises.
+        """
+        if not self.sync_writes:
+            return
+        target = self._appended
+        with self._sync_lock:
+            if self._synced >= target:
+                return
+            with self._lock:
+                log = self._log
+                appended = self._appended
+                log.flush()
+            os.fsync(log.fileno())
+            self.fsyncs += 1
+            self._synced = appended
+
+    # ---------- Snapshots ----------
+
+    def _start_snapshot(self):
+        if self._snapshot_thread is None or not self._snapshot_thread.is_alive():
+            self._log_records = 0
+            self._snapshot_thread = threading.Thread(target=self.snapshot, daemon=True)
+            self._snapshot_thread.start()
+
+    def snapshot(self):
+        """Write the current state to a snapshot and remove the files it replaces.
+
+        The log is rotated first, under the store locks, together with a copy
+        of every repository's object list. Objects are never modified once
+        stored, so the copies stay consistent while they are written. A
+        change made in between lands in both the snapshot and the new log,
+        and replaying it twice gives the same state.
+        """
+        with self._sync_lock, self._lock:
+            self._log.flush()
+            os.fsync(self._log.fileno())
+            self._log.close()
+            self._synced = self._appended
+            self._generation += 1
+            generation = self._generation
+            self._log = open(self._file('wal', generation), 'ab')
+            state = [(name, repository.get_all()) for name, repository in self._repositories.items()]
+
+        path = self._file('snapshot', generation)
+        with open(path + '.tmp', 'wb') as file:
+            for name, objects in state:
+                for obj in objects:
+                    file.write(self._encode(name, obj.id, obj))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(path + '.tmp', path)
+        directory = os.open(self.path, os.O_RDONLY)
+        try:
+            os.fsync(directory)
+        finally:
+            os.close(directory)
+
+        for kind in ('snapshot', 'wal'):
+            for old in self._generations(kind):
+                if old < generation:
+                    os.remove(self._file(kind, old))
@@ -0,0 +1,114 @@
+"""Columnar copy of the place attributes the place filters work on.
+
+PlaceColumns is an extra index for the place repository: it keeps price,
+latitude, longitude and owner of every stored place in NumPy arrays so a
+filter is a handful of vectorized comparisons instead of a Python loop over
+every Place. numpy is optional; without it the facade falls back to
+place_matches() over every place.
+"""
+import threading
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def place_matches(place, min_price=None, max_price=None, bbox=None, owner_id=None):
+    """The filters of PlaceColumns.filter() applied to one place.
+
+    bbox is (south, west, north, east), bounds included.
+    """
+    if min_price is not None and place.price < min_price:
+        return False
+    if max_price is not None and place.price > max_price:
+        return False
+    if bbox is not None:
+        south, west, north, east = bbox
+        if not (south <= place.latitude <= north and west <= place.longitude <= east):
+            return False
+    return owner_id is None or place.owner_id == owner_id
+
+
+class PlaceColumns:
+    """Price, latitude, longitude and owner of every place, one array each.
+
+    Rows stay dense: a deleted row is filled with the last one. Owners are
+    stored as integer codes. Changes and filters hold a lock, so a filter
+    never sees a place half written.
+    """
+
+    def __init__(self, capacity=1024):
+        if np is None:
+            raise RuntimeError("PlaceColumns requires numpy")
+        self._lock = threading.Lock()
+        self.price = np.empty(capacity, dtype=np.float64)
+        self.latitude = np.empty(capacity, dtype=np.float64)
+        self.longitude = np.empty(capacity, dtype=np.float64)
+        self.owner = np.empty(capacity, dtype=np.int32)
+        self._ids = []
+        self._rows = {}
+        self._owner_codes = {}
+
+    def __len__(self):
+        return len(self._ids)
+
+    def _columns(self):
+        return (self.price, self.latitude, self.longitude, self.owner)
+
+    def _write(self, row, place):
+        self.price[row] = place.price
+        self.latitude[row] = place.latitude
+        self.longitude[row] = place.longitude
+        self.owner[row] = self._owner_codes.setdefault(place.owner_id, len(self._owner_codes))
+
+    def add(self, place):
+        with self._lock:
+            row = self._rows.get(place.id)
+            if row is None:
+                row = len(self._ids)
+                if row == len(self.price):
+                    self.price, self.latitude, self.longitude, self.owner = (
+                        np.resize(column, 2 * row) for column in self._columns())
+                self._ids.append(place.id)
+                self._rows[place.id] = row
+            self._write(row, place)
+
+    def replace(self, old, new):
+        with self._lock:
+            self._write(self._rows[old.id], new)
+
+    def discard(self, place):
+        with self._lock:
+            row = self._rows.pop(place.id, None)
+            if row is None:
+                return
+            last = len(self._ids) - 1
+            last_id = self._ids.pop()
+            if row != last:
+                for column in self._columns():
+                    column[row] = column[last]
+                self._ids[row] = last_id
+                self._rows[last_id] = row
+
+    def filter(self, min_price=None, max_price=None, bbox=None, owner_id=None):
+        """Ids of the places matching every given filter, see place_matches()"""
+        with self._lock:
+            size = len(self._ids)
+            mask = np.ones(size, dtype=bool)
+            price = self.price[:size]
+            if min_price is not None:
+                mask &= price >= min_price
+            if max_price is not None:
+                mask &= price <= max_price
+            if bbox is not None:
+                south, west, north, east = bbox
+                latitude, longitude = self.latitude[:size], self.longitude[:size]
+                mask &= (latitude >= south) & (latitude <= north) & (longitude >= west) & (longitude <= east)
+            if owner_id is not None:
+                code = self._owner_codes.get(owner_id)
+                if code is None:
+                    return []
+                mask &= self.owner[:size] == code
+            ids = self._ids
+            return [ids[row] for row in np.flatnonzero(mask).tolist()]
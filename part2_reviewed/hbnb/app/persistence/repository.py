@@ -1,4 +1,7 @@
+import copy
+import threading
 from abc import ABC, abstractmethod
+from operator import attrgetter
 
 class Repository(ABC):
     @abstractmethod
@@ -9,6 +12,10 @@ class Repository(ABC):
     def get(self, obj_id):
         pass
 
+    @abstractmethod
+    def get_many(self, ids):
+        pass
+
     @abstractmethod
     def get_all(self):
         pass
@@ -25,28 +32,207 @@ class Repository(ABC):
     def get_by_attribute(self, attr_name, attr_value):
         pass
 
+    @abstractmethod
+    def find_all_by_attribute(self, attr_name, attr_value):
+        pass
+
 
 class InMemoryRepository(Repository):
-    def __init__(self):
+    """Objects stored by id, with optional secondary hash indexes.
+
+    unique and indexed name the attributes to index, dotted paths such as
+    'place.id' included. A unique index maps a value to one object and
+    rejects duplicates, a multi-valued index maps it to every object
+    carrying it. Indexes are kept up to date by add, update and delete,
+    so indexed attributes must only change through update().
+
+    extra_indexes are objects maintaining their own view of the stored
+    objects, such as PlaceColumns. They are told about each change through
+    add(obj), replace(old, new) and discard(obj).
+    """
+
+    def __init__(self, unique=(), indexed=(), extra_indexes=()):
         self._storage = {}
+        self._unique = {attr_name: {} for attr_name in unique}
+        self._indexes = {attr_name: {} for attr_name in indexed}
+        self._extra_indexes = tuple(extra_indexes)
+
+    @staticmethod
+    def _value(obj, attr_name):
+        return attrgetter(attr_name)(obj)
+
+    def _check_unique(self, obj, values):
+        for attr_name, value in values.items():
+            if self._unique[attr_name].get(value, obj) is not obj:
+                raise ValueError(f"{attr_name} '{value}' already exists")
+
+    def _index(self, obj):
+        self._check_unique(obj, {attr_name: self._value(obj, attr_name) for attr_name in self._unique})
+        for attr_name, index in self._unique.items():
+            index[self._value(obj, attr_name)] = obj
+        for attr_name, index in self._indexes.items():
+            index.setdefault(self._value(obj, attr_name), {})[obj.id] = obj
+        for index in self._extra_indexes:
+            index.add(obj)
+
+    def _unindex(self, obj):
+        for attr_name, index in self._unique.items():
+            index.pop(self._value(obj, attr_name), None)
+        for attr_name, index in self._indexes.items():
+            value = self._value(obj, attr_name)
+            bucket = index.get(value)
+            if bucket is not None:
+                bucket.pop(obj.id, None)
+                if not bucket:
+                    del index[value]
+        for index in self._extra_indexes:
+            index.discard(obj)
 
     def add(self, obj):
+        previous = self._storage.get(obj.id)
+        if previous is not None:
+            self._unindex(previous)
+        try:
+            self._index(obj)
+        except ValueError:
+            if previous is not None:
+                self._index(previous)
+            raise
         self._storage[obj.id] = obj
 
     def get(self, obj_id):
         return self._storage.get(obj_id)
 
+    def get_many(self, ids):
+        """Objects for ids in the order given, unknown and repeated ids skipped"""
+        found = map(self._storage.get, dict.fromkeys(ids))
+        return [obj for obj in found if obj is not None]
+
     def get_all(self):
         return list(self._storage.values())
 
     def update(self, obj_id, data):
         obj = self.get(obj_id)
         if obj:
-            obj.update(data)
+            self._check_unique(obj, {attr_name: data[attr_name] for attr_name in self._unique if attr_name in data})
+            self._unindex(obj)
+            try:
+                obj.update(data)
+            finally:
+                # Re-index whatever state the object ended in
+                self._index(obj)
 
     def delete(self, obj_id):
         if obj_id in self._storage:
-            del self._storage[obj_id]
+            self._unindex(self._storage.pop(obj_id))
+
+    def get_by_attribute(self, attr_name, attr_value):
+        if attr_name == 'id':
+            return self._storage.get(attr_value)
+        if attr_name in self._unique:
+            return self._unique[attr_name].get(attr_value)
+        if attr_name in self._indexes:
+            return next(iter(self._indexes[attr_name].get(attr_value, {}).values()), None)
+        return next((obj for obj in self._storage.values() if self._value(obj, attr_name) == attr_value), None)
+
+    def find_all_by_attribute(self, attr_name, attr_value):
+        """Every object whose attribute equals attr_value, O(1) on average when indexed"""
+        if attr_name == 'id':
+            obj = self._storage.get(attr_value)
+            return [obj] if obj is not None else []
+        if attr_name in self._unique:
+            obj = self._unique[attr_name].get(attr_value)
+            return [obj] if obj is not None else []
+        if attr_name in self._indexes:
+            return list(self._indexes[attr_name].get(attr_value, {}).values())
+        return [obj for obj in self._storage.values() if self._value(obj, attr_name) == attr_value]
+
+
+class ConcurrentInMemoryRepository(InMemoryRepository):
+    """InMemoryRepository safe to share between request threads.
+
+    Writers serialize on a lock. Objects are copy-on-write: update() applies
+    the data to a copy and swaps it in, so an object handed to a reader is
+    never modified and a failed update leaves nothing behind. The new version
+    is indexed before the old one is dropped, so a lookup finds either of them.
+
+    Readers take no lock. A single lookup is one dict access and listings
+    work on a list(values()) snapshot, which CPython copies in one step.
+    References held elsewhere (review.place, place.owner...) keep the version
+    they were given; look objects up again for fresh data.
+    """
+
+    def __init__(self, unique=(), indexed=(), extra_indexes=()):
+        super().__init__(unique, indexed, extra_indexes)
+        self._write_lock = threading.Lock()
+
+    def _swap(self, old, new):
+        for attr_name, index in self._unique.items():
+            old_value, new_value = self._value(old, attr_name), self._value(new, attr_name)
+            index[new_value] = new
+            if old_value != new_value:
+                index.pop(old_value, None)
+        for attr_name, index in self._indexes.items():
+            old_value, new_value = self._value(old, attr_name), self._value(new, attr_name)
+            index.setdefault(new_value, {})[new.id] = new
+            if old_value != new_value:
+                bucket = index[old_value]
+                del bucket[old.id]
+                if not bucket:
+                    del index[old_value]
+        for index in self._extra_indexes:
+            index.replace(old, new)
+
+    def _changed(self, obj_id, obj):
+        """Called under the write lock once obj_id is stored as obj, None when deleted"""
+
+    def add(self, obj):
+        with self._write_lock:
+            previous = self._storage.get(obj.id)
+            if previous is None:
+                self._index(obj)
+            else:
+                self._check_unique(previous, {attr_name: self._value(obj, attr_name) for attr_name in self._unique})
+                self._swap(previous, obj)
+            self._storage[obj.id] = obj
+            self._changed(obj.id, obj)
+
+    def update(self, obj_id, data):
+        while True:
+            obj = self._storage.get(obj_id)
+            if obj is None:
+                return
+            # Build the new version outside the lock, publish it only if no
+            # other writer replaced obj in the meantime
+            new_obj = copy.copy(obj)
+            new_obj.update(data)
+            with self._write_lock:
+                if self._storage.get(obj_id) is not obj:
+                    continue
+                self._check_unique(obj, {attr_name: self._value(new_obj, attr_name) for attr_name in self._unique})
+                self._swap(obj, new_obj)
+                self._storage[obj_id] = new_obj
+                self._changed(obj_id, new_obj)
+                return
+
+    def delete(self, obj_id):
+        with self._write_lock:
+            obj = self._storage.pop(obj_id, None)
+            if obj is not None:
+                self._unindex(obj)
+                self._changed(obj_id, None)
+
+    def get_all(self):
+        return list(self._storage.values())
 
     def get_by_attribute(self, attr_name, attr_value):
-        return next((obj for obj in self._storage.values() if getattr(obj, attr_name) == attr_value), None)
+        found = self.find_all_by_attribute(attr_name, attr_value)
+        return found[0] if found else None
+
+    def find_all_by_attribute(self, attr_name, attr_value):
+        if attr_name in self._indexes:
+            bucket = self._indexes[attr_name].get(attr_value)
+            return list(bucket.values()) if bucket else []
+        if attr_name == 'id' or attr_name in self._unique:
+            return super().find_all_by_attribute(attr_name, attr_value)
+        return [obj for obj in self.get_all() if self._value(obj, attr_name) == attr_value]
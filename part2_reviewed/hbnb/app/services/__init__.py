@@ -1,3 +1,14 @@
+import atexit
+import os
+from app.persistence.durable import DurableStore
 from app.services.facade import HBnBFacade
 
-facade = HBnBFacade()
+# Set HBNB_DATA_DIR to keep the data across restarts, HBNB_COMPACT_MODELS=1
+# to store slotted models
+_data_dir = os.getenv('HBNB_DATA_DIR')
+facade = HBnBFacade(DurableStore(_data_dir) if _data_dir else None,
+                    compact=os.getenv('HBNB_COMPACT_MODELS') == '1')
+if facade.store is not None:
+    # Opened once facade exists: replaying imports the models, which import it
+    facade.store.open()
+    atexit.register(facade.store.close)
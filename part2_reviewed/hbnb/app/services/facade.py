@@ -1,30 +1,59 @@
-from app.persistence.repository import InMemoryRepository
+from app.persistence.place_columns import PlaceColumns, np, place_matches
+from app.persistence.repository import ConcurrentInMemoryRepository
 
 class HBnBFacade:
-    def __init__(self):
-        self.user_repo = InMemoryRepository()
-        self.place_repo = InMemoryRepository()
-        self.review_repo = InMemoryRepository()
-        self.amenity_repo = InMemoryRepository()
+    def __init__(self, store=None, compact=False):
+        """Keep everything in memory, logged to store when given (a DurableStore).
+
+        compact=True creates the slotted models of app.models.compact.
+        """
+        def repository(name, **indexes):
+            if store is not None:
+                return store.repository(name, **indexes)
+            return ConcurrentInMemoryRepository(**indexes)
+
+        # Referenced objects first: a DurableStore reloads repositories in this order
+        self.user_repo = repository('users', indexed=('email',))
+        self.amenity_repo = repository('amenities')
+        # Vectorized place filters when numpy is installed
+        self.place_columns = PlaceColumns() if np is not None else None
+        self.place_repo = repository('places', extra_indexes=(self.place_columns,) if self.place_columns is not None else ())
+        self.review_repo = repository('reviews', indexed=('place.id',))
+        self.store = store
+        self.compact = compact
+
+    def _model(self, name):
+        """Model class to create, imported late as the models import the facade"""
+        if self.compact:
+            from app.models import compact
+            return getattr(compact, 'Compact' + name)
+        from app.models.amenity import Amenity
+        from app.models.place import Place
+        from app.models.review import Review
+        from app.models.user import User
+        return {'Amenity': Amenity, 'Place': Place, 'Review': Review, 'User': User}[name]
 
     def create_amenity(self, amenity_data):
-        from app.models.amenity import Amenity
-        new_amenity = Amenity(name=amenity_data['name'])
+        new_amenity = self._model('Amenity')(name=amenity_data['name'])
         self.amenity_repo.add(new_amenity)
         return new_amenity.to_dict()
 
     def get_amenity(self, amenity_id):
-        amenity = self.amenity_repo.get_by_attribute('id', amenity_id)
+        amenity = self.amenity_repo.get(amenity_id)
         if amenity is None:
             raise ValueError("Amenity not found")
         return amenity.to_dict()
 
+    def get_amenities(self, amenity_ids):
+        """Amenities in the order of amenity_ids, unknown ids skipped"""
+        return [amenity.to_dict() for amenity in self.amenity_repo.get_many(amenity_ids)]
+
     def get_all_amenities(self):
         amenities = self.amenity_repo.get_all()
         return [amenity.to_dict() for amenity in amenities]
 
     def update_amenity(self, amenity_id, amenity_data):
-        amenity = self.amenity_repo.get_by_attribute('id', amenity_id)
+        amenity = self.amenity_repo.get(amenity_id)
         if amenity is None:
             raise ValueError("Amenity not found")
 
@@ -32,19 +61,15 @@ class HBnBFacade:
         return self.amenity_repo.get(amenity_id).to_dict()
 
     def create_review(self, review_data):
-        from app.models.review import Review
-        from app.models.place import Place
-        from app.models.user import User
-
-        user = self.user_repo.get_by_attribute('id', review_data['user_id'])
+        user = self.user_repo.get(review_data['user_id'])
         if user is None:
             raise ValueError("User not found")
 
-        place = self.place_repo.get_by_attribute('id', review_data['place_id'])
+        place = self.place_repo.get(review_data['place_id'])
         if place is None:
             raise ValueError("Place not found")
 
-        new_review = Review(
+        new_review = self._model('Review')(
             text=review_data['text'],
             rating=review_data['rating'],
             place=place,
@@ -59,7 +84,7 @@ class HBnBFacade:
         return new_review.to_dict()
 
     def get_review(self, review_id):
-        review = self.review_repo.get_by_attribute('id', review_id)
+        review = self.review_repo.get(review_id)
         if review is None:
             raise ValueError("Review not found")
         return review.to_dict()
@@ -69,27 +94,25 @@ class HBnBFacade:
         return [review.to_dict() for review in reviews]
 
     def get_reviews_by_place(self, place_id):
-        place = self.place_repo.get_by_attribute('id', place_id)
+        place = self.place_repo.get(place_id)
         if place is None:
             raise ValueError("Place not found")
 
-        all_reviews = self.review_repo.get_all()
-        place_reviews = [review.to_dict() for review in all_reviews if review.place.id == place_id]
-        return place_reviews
+        return [review.to_dict() for review in self.review_repo.find_all_by_attribute('place.id', place_id)]
 
     def update_review(self, review_id, review_data):
         from app.models.place import Place
         from app.models.user import User
 
-        review = self.review_repo.get_by_attribute('id', review_id)
+        review = self.review_repo.get(review_id)
         if review is None:
             raise ValueError("Review not found")
 
-        user = self.user_repo.get_by_attribute('id', review_data['user_id'])
+        user = self.user_repo.get(review_data['user_id'])
         if user is None:
             raise ValueError("User not found")
 
-        place = self.place_repo.get_by_attribute('id', review_data['place_id'])
+        place = self.place_repo.get(review_data['place_id'])
         if place is None:
             raise ValueError("Place not found")
 
@@ -104,14 +127,13 @@ class HBnBFacade:
         return self.review_repo.get(review_id).to_dict()
 
     def delete_review(self, review_id):
-        review = self.review_repo.get_by_attribute('id', review_id)
+        review = self.review_repo.get(review_id)
         if review is None:
             raise ValueError("Review not found")
         self.review_repo.delete(review_id)
 
     def create_user(self, user_data):
-        from app.models.user import User
-        user = User(**user_data)
+        user = self._model('User')(**user_data)
         self.user_repo.add(user)
         return user.to_dict()
 
@@ -131,8 +153,6 @@ class HBnBFacade:
         return [u.to_dict() for u in self.user_repo.get_all()]
 
     def create_place(self, place_data):
-        from app.models.place import Place
-
         amenity_ids = place_data.pop("amenities", [])
         owner_id = place_data.pop("owner_id", None)
         
@@ -143,12 +163,9 @@ class HBnBFacade:
         if not owner:
             raise ValueError("Invalid owner_id")
 
-        place = Place(owner=owner, **place_data)
+        place = self._model('Place')(owner=owner, **place_data)
 
-        for amenity_id in amenity_ids:
-            amenity = self.amenity_repo.get(amenity_id)
-            if amenity:
-                place.amenities.append(amenity)
+        place.amenities.extend(self.amenity_repo.get_many(amenity_ids))
 
         print("place_data:", place_data)
         print("owner_id:", owner_id)
@@ -162,9 +179,23 @@ class HBnBFacade:
             raise ValueError("Place not found")
         return place.to_dict()
 
+    def get_places(self, place_ids):
+        """Places in the order of place_ids, unknown ids skipped"""
+        return [place.to_dict() for place in self.place_repo.get_many(place_ids)]
+
     def get_all_places(self):
         return [p.to_dict() for p in self.place_repo.get_all()]
 
+    def find_places(self, min_price=None, max_price=None, bbox=None, owner_id=None):
+        """Places within the price range and bbox (south, west, north, east) owned by owner_id"""
+        filters = dict(min_price=min_price, max_price=max_price, bbox=bbox, owner_id=owner_id)
+        if self.place_columns is None:
+            places = [p for p in self.place_repo.get_all() if place_matches(p, **filters)]
+        else:
+            # A place deleted since filter() ran comes back as None
+            places = [self.place_repo.get(place_id) for place_id in self.place_columns.filter(**filters)]
+        return [p.to_dict() for p in places if p is not None]
+
     def update_place(self, place_id, place_data):
         self.place_repo.update(place_id, place_data)
         return self.place_repo.get(place_id).to_dict()
@@ -176,7 +207,6 @@ class HBnBFacade:
         user = self.user_repo.get(user_id)
         if not user:
             raise ValueError("User not found")
-        for key, value in data.items():
-            if hasattr(user, key):
-                setattr(user, key, value)
-        return user.to_dict()
\ No newline at end of file
+        # Through the repository so the email index follows the change
+        self.user_repo.update(user_id, data)
+        return self.user_repo.get(user_id).to_dict()
\ No newline at end of file
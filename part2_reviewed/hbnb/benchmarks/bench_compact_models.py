@@ -0,0 +1,68 @@
+"""Bytes per object of the models vs their slotted Compact variants, with tracemalloc.
+
+Counts everything allocated while building the objects: ids, timestamps,
+lists and the field values themselves. The last column adds the object to
+a repository, whose dict keeps the 36-char id string as key either way.
+
+Usage: python benchmarks/bench_compact_models.py
+"""
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.amenity import Amenity
+from app.models.compact import CompactAmenity, CompactPlace, CompactReview, CompactUser
+from app.models.place import Place
+from app.models.review import Review
+from app.models.user import User
+from app.persistence.repository import ConcurrentInMemoryRepository
+
+COUNT = 100_000
+
+
+def measure(build, repository=False):
+    """Bytes allocated per object by build(i), kept alive until measured"""
+    gc.collect()
+    tracemalloc.start()
+    repo = ConcurrentInMemoryRepository() if repository else None
+    before = tracemalloc.get_traced_memory()[0]
+    objects = []
+    for i in range(COUNT):
+        obj = build(i)
+        objects.append(obj)
+        if repo is not None:
+            repo.add(obj)
+    # The list holding them is not part of the objects
+    used = tracemalloc.get_traced_memory()[0] - before - sys.getsizeof(objects)
+    tracemalloc.stop()
+    return used / COUNT
+
+
+def builders(user_class, amenity_class, place_class, review_class):
+    owner = user_class(first_name="Owner", last_name="Bench", email="owner@bench.com")
+    place = place_class(title="Place", price=100.0, latitude=1.0, longitude=2.0, owner=owner, description="Bench")
+    return {
+        'User': lambda i: user_class(first_name="Alice", last_name="Doe", email=f"user{i}@bench.com"),
+        'Amenity': lambda i: amenity_class(name=f"Amenity {i}"),
+        'Place': lambda i: place_class(title=f"Place {i}", price=100.0, latitude=1.0, longitude=2.0,
+                                       owner=owner, description="Bench"),
+        'Review': lambda i: review_class(text=f"Review {i}", rating=5, user=owner, place=place),
+    }
+
+
+def main():
+    regular = builders(User, Amenity, Place, Review)
+    compact = builders(CompactUser, CompactAmenity, CompactPlace, CompactReview)
+    print(f"{'model':<10} {'bytes':>8} {'compact':>8} {'saved':>7}   {'in repo':>8} {'compact':>8}")
+    for name in regular:
+        before, after = measure(regular[name]), measure(compact[name])
+        repo_before, repo_after = measure(regular[name], True), measure(compact[name], True)
+        print(f"{name:<10} {before:>8,.0f} {after:>8,.0f} {1 - after / before:>7.0%}   "
+              f"{repo_before:>8,.0f} {repo_after:>8,.0f}")
+
+
+if __name__ == '__main__':
+    main()
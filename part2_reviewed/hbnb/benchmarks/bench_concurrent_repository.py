@@ -0,0 +1,110 @@
+"""Read/write throughput with reader and writer threads sharing one repository.
+
+Compares the plain InMemoryRepository (unsafe, torn reads are counted),
+the same repository behind one global lock, and ConcurrentInMemoryRepository.
+
+Usage: python benchmarks/bench_concurrent_repository.py
+"""
+import os
+import sys
+import threading
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.persistence.repository import ConcurrentInMemoryRepository, InMemoryRepository
+
+SIZE = 10_000
+NAMES = 100
+READERS = 8
+WRITERS = 2
+DURATION = 3.0
+
+
+class Record:
+    """Plain object updated the way BaseModel.update does, one attribute at a time"""
+
+    def __init__(self, i):
+        self.id = str(uuid.uuid4())
+        self.first_name = self.last_name = f"N{i % NAMES}"
+
+    def update(self, data):
+        for key, value in data.items():
+            setattr(self, key, value)
+
+
+class LockedInMemoryRepository(InMemoryRepository):
+    """Every call behind one lock, readers included"""
+
+    def __init__(self, unique=(), indexed=()):
+        super().__init__(unique, indexed)
+        self._lock = threading.RLock()
+
+    def add(self, obj):
+        with self._lock:
+            super().add(obj)
+
+    def update(self, obj_id, data):
+        with self._lock:
+            super().update(obj_id, data)
+
+    def delete(self, obj_id):
+        with self._lock:
+            super().delete(obj_id)
+
+    def get(self, obj_id):
+        with self._lock:
+            return super().get(obj_id)
+
+    def find_all_by_attribute(self, attr_name, attr_value):
+        with self._lock:
+            return super().find_all_by_attribute(attr_name, attr_value)
+
+
+def run(repo_class):
+    repo = repo_class(indexed=('last_name',))
+    users = [Record(i) for i in range(SIZE)]
+    for user in users:
+        repo.add(user)
+    stop = threading.Event()
+    reads, writes, torn = [0] * READERS, [0] * WRITERS, [0] * READERS
+
+    def reader(slot):
+        i = slot
+        while not stop.is_set():
+            user = repo.get(users[i % SIZE].id)
+            if user.first_name != user.last_name:
+                torn[slot] += 1
+            repo.find_all_by_attribute('last_name', user.last_name)
+            reads[slot] += 2
+            i += READERS
+
+    def writer(slot):
+        i = slot
+        while not stop.is_set():
+            name = f"N{i % NAMES}"
+            repo.update(users[i % SIZE].id, {'first_name': name, 'last_name': name})
+            writes[slot] += 1
+            i += WRITERS
+
+    threads = [threading.Thread(target=reader, args=(slot,)) for slot in range(READERS)]
+    threads += [threading.Thread(target=writer, args=(slot,)) for slot in range(WRITERS)]
+    for thread in threads:
+        thread.start()
+    time.sleep(DURATION)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    print(f"{repo_class.__name__:<32} {sum(reads) / DURATION:>12,.0f} reads/s "
+          f"{sum(writes) / DURATION:>10,.0f} writes/s {sum(torn):>8,} torn reads")
+
+
+def main():
+    print(f"{READERS} readers, {WRITERS} writers, {SIZE:,} users, {DURATION:.0f}s each")
+    for repo_class in (InMemoryRepository, LockedInMemoryRepository, ConcurrentInMemoryRepository):
+        run(repo_class)
+
+
+if __name__ == '__main__':
+    main()
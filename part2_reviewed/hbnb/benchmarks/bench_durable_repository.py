@@ -0,0 +1,112 @@
+"""Write latency and recovery time of DurableInMemoryRepository.
+
+Recovery replays RECOVERY_SIZE adds followed by UPDATES rounds of updates,
+either from the log alone or from the snapshot compacting it.
+
+The SQLAlchemyRepository side is measured by part4/benchmarks/bench_repository_writes.py
+on the same record counts.
+
+Usage: python benchmarks/bench_durable_repository.py
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.persistence.durable import DurableStore
+from app.persistence.repository import ConcurrentInMemoryRepository
+
+WRITES = 2000
+THREADS = 8
+RECOVERY_SIZE = 200_000
+UPDATES = 2
+
+
+class Record:
+    """Amenity-sized object"""
+
+    def __init__(self, i):
+        self.id = str(uuid.uuid4())
+        self.name = f"Amenity {i}"
+        self.created_at = self.updated_at = datetime.now()
+
+    def update(self, data):
+        for key, value in data.items():
+            setattr(self, key, value)
+        self.updated_at = datetime.now()
+
+
+def write_latency(label, repo):
+    start = time.perf_counter()
+    for i in range(WRITES):
+        repo.add(Record(i))
+    print(f"{label:<44} {(time.perf_counter() - start) / WRITES * 1e6:>10,.1f} us/write")
+
+
+def concurrent_writes(path):
+    store = DurableStore(path)
+    repo = store.repository('amenities')
+    store.open()
+
+    def writer():
+        for i in range(WRITES // THREADS):
+            repo.add(Record(i))
+
+    threads = [threading.Thread(target=writer) for _ in range(THREADS)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    print(f"{f'durable, {THREADS} threads':<44} {elapsed / WRITES * 1e6:>10,.1f} us/write "
+          f"({store.fsyncs} fsyncs for {WRITES} writes)")
+    store.close()
+
+
+def recovery(label, path, snapshot):
+    store = DurableStore(path, snapshot_every=RECOVERY_SIZE * 10, sync=False)
+    repo = store.repository('amenities')
+    store.open()
+    records = [Record(i) for i in range(RECOVERY_SIZE)]
+    for record in records:
+        repo.add(record)
+    for n in range(UPDATES):
+        for record in records:
+            repo.update(record.id, {'name': f"{record.name} v{n}"})
+    if snapshot:
+        store.snapshot()
+    store.close()
+    size = sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+    start = time.perf_counter()
+    store = DurableStore(path, snapshot_every=RECOVERY_SIZE * 10)
+    repo = store.repository('amenities')
+    store.open()
+    elapsed = time.perf_counter() - start
+    assert len(repo.get_all()) == RECOVERY_SIZE
+    store.close()
+    print(f"{label:<44} {elapsed:>10,.2f} s ({size / 2**20:,.1f} MiB)")
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        write_latency('in memory, not durable', ConcurrentInMemoryRepository())
+        for label, sync in (('durable, no fsync', False), ('durable, fsync per write', True)):
+            store = DurableStore(os.path.join(tmp, label), sync=sync)
+            repo = store.repository('amenities')
+            store.open()
+            write_latency(label, repo)
+            store.close()
+        concurrent_writes(os.path.join(tmp, 'concurrent'))
+        recovery(f'recover {RECOVERY_SIZE:,} from the log', os.path.join(tmp, 'log'), False)
+        recovery(f'recover {RECOVERY_SIZE:,} from a snapshot', os.path.join(tmp, 'snapshot'), True)
+
+
+if __name__ == '__main__':
+    main()
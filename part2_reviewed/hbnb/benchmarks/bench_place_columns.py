@@ -0,0 +1,69 @@
+"""Place filters on 1M places: Python loop vs PlaceColumns masks.
+
+Usage: python benchmarks/bench_place_columns.py
+"""
+import os
+import random
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.persistence.place_columns import PlaceColumns, place_matches
+from app.persistence.repository import ConcurrentInMemoryRepository
+
+SIZE = 1_000_000
+OWNERS = 10_000
+RUNS = 5
+
+QUERIES = {
+    'price range': {'min_price': 100.0, 'max_price': 120.0},
+    'bbox': {'bbox': (40.0, -10.0, 50.0, 10.0)},
+    'price + bbox + owner': {'max_price': 300.0, 'bbox': (-45.0, -90.0, 45.0, 90.0), 'owner_id': 'owner-42'},
+}
+
+
+class Record:
+    """Plain object carrying the attributes the place filters read"""
+
+    def __init__(self, rng):
+        self.id = str(uuid.uuid4())
+        self.price = float(rng.randint(1, 500))
+        self.latitude = rng.uniform(-90.0, 90.0)
+        self.longitude = rng.uniform(-180.0, 180.0)
+        self.owner_id = f"owner-{rng.randrange(OWNERS)}"
+
+
+def timed(func):
+    start = time.perf_counter()
+    for _ in range(RUNS):
+        result = func()
+    return (time.perf_counter() - start) / RUNS, result
+
+
+def main():
+    rng = random.Random(0)
+    records = [Record(rng) for _ in range(SIZE)]
+    columns = PlaceColumns()
+    plain, indexed = ConcurrentInMemoryRepository(), ConcurrentInMemoryRepository(extra_indexes=(columns,))
+    for repo, label in ((plain, 'plain'), (indexed, 'with PlaceColumns')):
+        start = time.perf_counter()
+        for record in records:
+            repo.add(record)
+        print(f"{'add, ' + label:<40} {(time.perf_counter() - start) / SIZE * 1e6:>10,.2f} us/place")
+    array_bytes = sum(column.nbytes for column in columns._columns())
+    print(f"{'column arrays':<40} {array_bytes / 2**20:>10,.1f} MiB")
+
+    print(f"\n{'query':<24} {'matches':>8} {'loop ms':>10} {'masks ms':>10} {'+ get ms':>10}")
+    for label, filters in QUERIES.items():
+        loop_time, expected = timed(lambda: [p for p in plain.get_all() if place_matches(p, **filters)])
+        mask_time, ids = timed(lambda: columns.filter(**filters))
+        get_time, found = timed(lambda: [indexed.get(place_id) for place_id in columns.filter(**filters)])
+        assert sorted(p.id for p in found) == sorted(p.id for p in expected)
+        print(f"{label:<24} {len(ids):>8,} {loop_time * 1e3:>10,.1f} {mask_time * 1e3:>10,.1f} "
+              f"{get_time * 1e3:>10,.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""get_by_attribute / find_all_by_attribute on 1M objects, scan vs secondary indexes.
+
+Usage: python benchmarks/bench_repository.py
+"""
+import os
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.persistence.repository import InMemoryRepository
+
+SIZE = 1_000_000
+GROUPS = 10_000
+LOOKUPS = 1_000
+SCAN_LOOKUPS = 10
+
+
+class Record:
+    """Plain object carrying the attributes the facade looks up"""
+
+    def __init__(self, i):
+        self.id = str(uuid.uuid4())
+        self.email = f"user{i}@example.com"
+        self.place_id = f"place-{i % GROUPS}"
+
+    def update(self, data):
+        for key, value in data.items():
+            setattr(self, key, value)
+
+
+def timed(label, func, runs):
+    start = time.perf_counter()
+    for i in range(runs):
+        func(i)
+    per_call = (time.perf_counter() - start) / runs
+    print(f"{label:<40} {per_call * 1e6:>12,.1f} us/call")
+
+
+def main():
+    records = [Record(i) for i in range(SIZE)]
+    plain = InMemoryRepository()
+    indexed = InMemoryRepository(unique=('email',), indexed=('place_id',))
+    for repo, label in ((plain, 'plain'), (indexed, 'indexed')):
+        start = time.perf_counter()
+        for record in records:
+            repo.add(record)
+        print(f"{'add ' + label:<40} {(time.perf_counter() - start) / SIZE * 1e6:>12,.1f} us/call")
+
+    # Indexed lookups are spread over the whole storage. A scan stops at
+    # its first match, so scans ask for the last object of each tenth.
+    step = SIZE // LOOKUPS
+    tenth = SIZE // SCAN_LOOKUPS
+    timed('get_by_attribute email, scan',
+          lambda i: plain.get_by_attribute('email', f"user{(i + 1) * tenth - 1}@example.com"), SCAN_LOOKUPS)
+    timed('get_by_attribute email, unique index',
+          lambda i: indexed.get_by_attribute('email', f"user{i * step}@example.com"), LOOKUPS)
+    timed('find_all_by_attribute place_id, scan',
+          lambda i: plain.find_all_by_attribute('place_id', f"place-{i}"), SCAN_LOOKUPS)
+    timed('find_all_by_attribute place_id, index',
+          lambda i: indexed.find_all_by_attribute('place_id', f"place-{i}"), LOOKUPS)
+    timed('update place_id, index',
+          lambda i: indexed.update(records[i * step].id, {'place_id': f"place-{i}"}), LOOKUPS)
+
+if __name__ == '__main__':
+    main()
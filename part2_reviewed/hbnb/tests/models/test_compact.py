@@ -0,0 +1,84 @@
+import copy
+import uuid
+from datetime import datetime
+import pytest
+from app.models.compact import CompactUser, CompactAmenity, CompactPlace, CompactReview
+from app.models.user import User
+from app.models.place import Place
+from app.persistence.durable import DurableStore
+from app.services.facade import HBnBFacade
+
+
+@pytest.fixture
+def user():
+    return CompactUser(first_name="Alice", last_name="Wonders", email="alice@example.com")
+
+@pytest.fixture
+def place(user):
+    return CompactPlace(title="Beach House", description="Beautiful ocean view", price=200.0,
+                        latitude=25.0, longitude=55.0, owner=user)
+
+
+def test_compact_models_have_no_dict(user, place):
+    review = CompactReview(text="Great", rating=5, user=user, place=place)
+    for obj in (user, place, review, CompactAmenity(name="Wifi")):
+        assert not hasattr(obj, '__dict__')
+
+def test_same_attributes_as_the_models(user, place):
+    regular_user = User(first_name="Alice", last_name="Wonders", email="alice@example.com")
+    regular_place = Place(title="Beach House", description="Beautiful ocean view", price=200.0,
+                          latitude=25.0, longitude=55.0, owner=regular_user)
+    assert user.to_dict().keys() == regular_user.to_dict().keys()
+    assert place.to_dict().keys() == regular_place.to_dict().keys()
+    assert str(uuid.UUID(user.id)) == user.id
+    assert place.owner_id == user.id
+    assert isinstance(place.created_at, datetime)
+    assert place.reviews == [] and place.amenities == [] and user.places == []
+
+def test_update_and_copy(user, place):
+    amenity = CompactAmenity(name="Wifi")
+    place.add_amenity(amenity)
+    before = place.updated_at
+    place.update({'title': "Villa", 'price': 150.0})
+    assert (place.title, place.price) == ("Villa", 150.0)
+    assert place.updated_at >= before
+    clone = copy.copy(place)
+    assert clone.id == place.id and clone.amenities == [amenity]
+    assert place.to_dict()['amenities'] == [amenity.to_dict()]
+
+@pytest.mark.parametrize("field,value,error", [
+    ("title", 123, TypeError),
+    ("title", "", ValueError),
+    ("price", "100", TypeError),
+    ("price", -10.0, ValueError),
+    ("latitude", -200.0, ValueError),
+    ("owner", "not_user", TypeError),
+])
+def test_invalid_compact_place_inputs(field, value, error, user):
+    kwargs = {"title": "Valid", "description": "Valid desc", "price": 100.0,
+              "latitude": 0.0, "longitude": 0.0, "owner": user}
+    kwargs[field] = value
+    with pytest.raises(error):
+        CompactPlace(**kwargs)
+
+def test_compact_review_validation(user, place):
+    with pytest.raises(ValueError):
+        CompactReview(text="Great", rating=6, user=user, place=place)
+    with pytest.raises(TypeError):
+        CompactReview(text="Great", rating=5, user=user, place="place")
+
+def test_compact_facade_survives_restart(tmp_path):
+    facade = HBnBFacade(DurableStore(str(tmp_path)), compact=True)
+    facade.store.open()
+    user = facade.create_user({"first_name": "Bob", "last_name": "Doe", "email": "bob@example.com"})
+    place = facade.create_place({"title": "Flat", "description": "Nice", "price": 80.0,
+                                 "latitude": 1.0, "longitude": 2.0, "owner_id": user["id"]})
+    review = facade.create_review({"text": "Good", "rating": 4, "user_id": user["id"], "place_id": place["id"]})
+    facade.store.close()
+
+    facade = HBnBFacade(DurableStore(str(tmp_path)), compact=True)
+    facade.store.open()
+    assert isinstance(facade.user_repo.get(user["id"]), CompactUser)
+    assert facade.get_place(place["id"]) == place
+    assert facade.get_reviews_by_place(place["id"]) == [review]
+    facade.store.close()
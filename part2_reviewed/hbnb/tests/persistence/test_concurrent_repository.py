@@ -0,0 +1,111 @@
+import sys
+import threading
+import pytest
+from app.persistence.repository import ConcurrentInMemoryRepository
+from app.models.user import User
+
+WRITERS = 4
+READERS = 8
+ROUNDS = 2000
+
+
+def make_user(i):
+    return User(first_name=f"N{i}", last_name=f"N{i}", email=f"user{i}@example.com")
+
+
+@pytest.fixture
+def fast_switching():
+    """Switch threads as often as possible to shake out races"""
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+@pytest.fixture
+def repo():
+    return ConcurrentInMemoryRepository(unique=('email',), indexed=('last_name',))
+
+# ---------- Copy-on-write ----------
+
+def test_update_replaces_object(repo):
+    alice = make_user(0)
+    repo.add(alice)
+    repo.update(alice.id, {'first_name': "Alice", 'last_name': "Doe"})
+    updated = repo.get(alice.id)
+    assert updated is not alice
+    assert (alice.first_name, updated.first_name) == ("N0", "Alice")
+    assert repo.find_all_by_attribute('last_name', "N0") == []
+    assert repo.find_all_by_attribute('last_name', "Doe") == [updated]
+    assert repo.get_by_attribute('email', "user0@example.com") is updated
+
+def test_failed_update_changes_nothing(repo):
+    alice, bob = make_user(0), make_user(1)
+    repo.add(alice)
+    repo.add(bob)
+    with pytest.raises(ValueError):
+        repo.update(bob.id, {'last_name': "Doe", 'email': "user0@example.com"})
+    with pytest.raises(TypeError):
+        repo.update(bob.id, {'last_name': "Doe", 'email': None})
+    assert repo.get(bob.id) is bob
+    assert bob.last_name == "N1"
+    assert repo.find_all_by_attribute('last_name', "Doe") == []
+
+# ---------- Stress ----------
+
+def run_threads(*targets):
+    errors = []
+
+    def guarded(target):
+        try:
+            target()
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=guarded, args=(target,)) for target in targets]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return errors
+
+def test_readers_never_see_partial_updates(repo, fast_switching):
+    users = [make_user(i) for i in range(50)]
+    for user in users:
+        repo.add(user)
+    done = threading.Event()
+
+    def writer(offset):
+        def run():
+            for n in range(ROUNDS):
+                user = users[(offset + n) % len(users)]
+                repo.update(user.id, {'first_name': f"W{n}", 'last_name': f"W{n}"})
+                extra = make_user(10_000 * (offset + 1) + n)
+                repo.add(extra)
+                repo.delete(extra.id)
+        return run
+
+    def reader():
+        while not done.is_set():
+            for user in repo.get_all():
+                assert user.first_name == user.last_name
+                same = repo.find_all_by_attribute('last_name', user.last_name)
+                assert all(other.first_name == other.last_name for other in same)
+            for user in users:
+                current = repo.get(user.id)
+                assert current.first_name == current.last_name
+                assert repo.get_by_attribute('email', user.email) is not None
+
+    def writers():
+        try:
+            errors.extend(run_threads(*(writer(offset) for offset in range(WRITERS))))
+        finally:
+            done.set()
+
+    errors = []
+    errors.extend(run_threads(writers, *(reader for _ in range(READERS))))
+    assert errors == []
+    assert len(repo.get_all()) == len(users)
+    for user in users:
+        current = repo.get(user.id)
+        assert repo.find_all_by_attribute('last_name', current.last_name).count(current) == 1
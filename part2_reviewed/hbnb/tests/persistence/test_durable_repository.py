@@ -0,0 +1,108 @@
+import os
+import threading
+from app.persistence.durable import DurableStore
+from app.models.user import User
+from app.models.amenity import Amenity
+from app.models.place import Place
+from app.models.review import Review
+
+
+def open_store(path, **options):
+    store = DurableStore(str(path), **options)
+    repos = {
+        'users': store.repository('users', unique=('email',)),
+        'amenities': store.repository('amenities'),
+        'places': store.repository('places'),
+        'reviews': store.repository('reviews', indexed=('place.id',)),
+    }
+    store.open()
+    return store, repos
+
+
+def populate(repos):
+    alice = User(first_name="Alice", last_name="Doe", email="alice@example.com")
+    wifi = Amenity(name="Wifi")
+    place = Place(title="Flat", price=80.0, latitude=1.0, longitude=2.0, owner=alice, description="Nice")
+    place.add_amenity(wifi)
+    review = Review(text="Great", rating=5, user=alice, place=place)
+    repos['users'].add(alice)
+    repos['amenities'].add(wifi)
+    repos['places'].add(place)
+    repos['reviews'].add(review)
+    return alice, wifi, place, review
+
+# ---------- Recovery ----------
+
+def test_log_is_replayed_with_references(tmp_path):
+    store, repos = open_store(tmp_path)
+    alice, wifi, place, review = populate(repos)
+    repos['users'].update(alice.id, {'first_name': "Alicia"})
+    repos['amenities'].delete(wifi.id)
+    store.close()
+
+    store, repos = open_store(tmp_path)
+    assert repos['users'].get(alice.id).first_name == "Alicia"
+    assert repos['users'].get_by_attribute('email', "alice@example.com").id == alice.id
+    assert repos['amenities'].get_all() == []
+    restored = repos['reviews'].find_all_by_attribute('place.id', place.id)
+    assert [r.text for r in restored] == ["Great"]
+    # References point at the stored objects, not at copies
+    assert restored[0].place is repos['places'].get(place.id)
+    assert repos['places'].get(place.id).amenities[0].name == "Wifi"
+    store.close()
+
+def test_snapshot_compacts_the_log(tmp_path):
+    store, repos = open_store(tmp_path, snapshot_every=10)
+    alice, wifi, place, review = populate(repos)
+    for i in range(20):
+        repos['reviews'].update(review.id, {'rating': i % 5 + 1})
+    store.close()
+    files = sorted(os.listdir(tmp_path))
+    assert any(name.startswith('snapshot.') for name in files)
+    assert 'wal.1' not in files
+
+    store, repos = open_store(tmp_path, snapshot_every=10)
+    assert repos['reviews'].get(review.id).rating == 5
+    assert repos['reviews'].get(review.id).user is repos['users'].get(alice.id)
+    store.close()
+
+def test_torn_record_is_dropped(tmp_path):
+    store, repos = open_store(tmp_path)
+    alice, wifi, place, review = populate(repos)
+    store.close()
+    log = os.path.join(tmp_path, 'wal.1')
+    with open(log, 'r+b') as file:
+        file.truncate(os.path.getsize(log) - 3)
+
+    store, repos = open_store(tmp_path)
+    assert repos['reviews'].get_all() == []
+    assert repos['places'].get(place.id) is not None
+    repos['amenities'].add(Amenity(name="Pool"))
+    store.close()
+
+    store, repos = open_store(tmp_path)
+    assert sorted(a.name for a in repos['amenities'].get_all()) == ["Pool", "Wifi"]
+    store.close()
+
+# ---------- Group commit ----------
+
+def test_concurrent_writers_share_fsyncs(tmp_path):
+    store, repos = open_store(tmp_path)
+    start = threading.Barrier(8)
+
+    def writer(n):
+        start.wait()
+        for i in range(50):
+            repos['amenities'].add(Amenity(name=f"A{n}-{i}"))
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert store.fsyncs < 400
+    store.close()
+
+    store, repos = open_store(tmp_path)
+    assert len(repos['amenities'].get_all()) == 400
+    store.close()
@@ -0,0 +1,66 @@
+import random
+import pytest
+from app.persistence.place_columns import place_matches
+from app.persistence.repository import ConcurrentInMemoryRepository
+from app.models.user import User
+from app.models.place import Place
+
+pytest.importorskip('numpy')
+from app.persistence.place_columns import PlaceColumns
+
+FILTERS = [
+    {},
+    {'min_price': 50.0},
+    {'max_price': 120.0},
+    {'min_price': 50.0, 'max_price': 120.0},
+    {'bbox': (-10.0, -20.0, 30.0, 40.0)},
+    {'min_price': 80.0, 'bbox': (0.0, 0.0, 90.0, 180.0)},
+]
+
+
+def make_place(owner, price, latitude=0.0, longitude=0.0):
+    return Place(title="Flat", price=price, latitude=latitude, longitude=longitude, owner=owner, description="Nice")
+
+
+@pytest.fixture
+def owners():
+    return [User(first_name="Owner", last_name=str(i), email=f"owner{i}@example.com") for i in range(3)]
+
+
+@pytest.fixture
+def repo():
+    # A tiny capacity so the arrays have to grow
+    columns = PlaceColumns(capacity=4)
+    return ConcurrentInMemoryRepository(extra_indexes=(columns,)), columns
+
+
+def loop_filter(repo, **filters):
+    return sorted(p.id for p in repo.get_all() if place_matches(p, **filters))
+
+# ---------- Filters ----------
+
+def test_filters_match_the_loop(repo, owners):
+    repo, columns = repo
+    rng = random.Random(42)
+    for _ in range(200):
+        repo.add(make_place(rng.choice(owners), float(rng.randint(1, 200)),
+                            rng.uniform(-90.0, 90.0), rng.uniform(-180.0, 180.0)))
+    for filters in FILTERS + [{'owner_id': owners[1].id, 'max_price': 100.0}]:
+        assert sorted(columns.filter(**filters)) == loop_filter(repo, **filters)
+    assert columns.filter(owner_id="nobody") == []
+
+# ---------- Kept in sync ----------
+
+def test_columns_follow_update_and_delete(repo, owners):
+    repo, columns = repo
+    places = [make_place(owners[0], float(price)) for price in range(10, 110, 10)]
+    for place in places:
+        repo.add(place)
+    repo.update(places[0].id, {'price': 500.0})
+    repo.delete(places[1].id)
+    repo.delete(places[-1].id)
+    assert len(columns) == 8
+    assert columns.filter(min_price=400.0) == [places[0].id]
+    assert sorted(columns.filter(max_price=40.0)) == sorted(p.id for p in places[2:4])
+    for filters in FILTERS:
+        assert sorted(columns.filter(**filters)) == loop_filter(repo, **filters)
@@ -0,0 +1,71 @@
+import pytest
+from app.persistence.repository import InMemoryRepository
+from app.models.user import User
+from app.models.place import Place
+from app.models.review import Review
+
+
+def make_user(email):
+    return User(first_name="Alice", last_name="Doe", email=email)
+
+
+@pytest.fixture
+def repo():
+    return InMemoryRepository(unique=('email',), indexed=('last_name',))
+
+# ---------- Unique index ----------
+
+def test_get_by_unique_attribute(repo):
+    alice = make_user("alice@example.com")
+    repo.add(alice)
+    assert repo.get_by_attribute('email', "alice@example.com") is alice
+    assert repo.get_by_attribute('email', "nobody@example.com") is None
+
+def test_unique_index_rejects_duplicates(repo):
+    repo.add(make_user("alice@example.com"))
+    with pytest.raises(ValueError, match="already exists"):
+        repo.add(make_user("alice@example.com"))
+    assert len(repo.get_all()) == 1
+
+def test_unique_index_follows_update(repo):
+    alice, bob = make_user("alice@example.com"), make_user("bob@example.com")
+    repo.add(alice)
+    repo.add(bob)
+    with pytest.raises(ValueError):
+        repo.update(bob.id, {'email': "alice@example.com"})
+    repo.update(alice.id, {'email': "alice@test.org"})
+    assert repo.get_by_attribute('email', "alice@example.com") is None
+    assert repo.get_by_attribute('email', "alice@test.org") is alice
+    assert repo.get_by_attribute('email', "bob@example.com") is bob
+
+# ---------- Multi-valued index ----------
+
+def test_find_all_by_indexed_attribute(repo):
+    users = [make_user(f"user{i}@example.com") for i in range(3)]
+    for user in users:
+        repo.add(user)
+    repo.update(users[2].id, {'last_name': "Smith"})
+    assert repo.find_all_by_attribute('last_name', "Doe") == users[:2]
+    assert repo.find_all_by_attribute('last_name', "Smith") == [users[2]]
+    repo.delete(users[0].id)
+    assert repo.find_all_by_attribute('last_name', "Doe") == [users[1]]
+    assert repo.find_all_by_attribute('last_name', "Nobody") == []
+
+def test_dotted_index():
+    repo = InMemoryRepository(indexed=('place.id',))
+    owner, guest = make_user("owner@example.com"), make_user("guest@example.com")
+    place = Place(title="Villa", description="Nice", price=100.0, latitude=45.0, longitude=5.0, owner=owner)
+    other = Place(title="Flat", description="Small", price=50.0, latitude=45.0, longitude=5.0, owner=owner)
+    review = Review(text="Great", rating=5, user=guest, place=place)
+    repo.add(review)
+    assert repo.find_all_by_attribute('place.id', place.id) == [review]
+    repo.update(review.id, {'place': other})
+    assert repo.find_all_by_attribute('place.id', place.id) == []
+    assert repo.find_all_by_attribute('place.id', other.id) == [review]
+
+def test_unindexed_attributes_fall_back_to_a_scan(repo):
+    alice = make_user("alice@example.com")
+    repo.add(alice)
+    assert repo.get_by_attribute('first_name', "Alice") is alice
+    assert repo.find_all_by_attribute('first_name', "Alice") == [alice]
+    assert repo.get_by_attribute('id', alice.id) is alice
@@ -154,3 +154,15 @@ def test_delete_review_not_found(facade):
 def test_get_reviews_by_place_not_found(facade):
     with pytest.raises(ValueError):
         facade.get_reviews_by_place("bad-place-id")
+
+def test_facade_find_places():
+    from app.services.facade import HBnBFacade
+    facade = HBnBFacade()
+    owner = facade.create_user({"first_name": "Owner", "last_name": "Filter", "email": "owner@filter.com"})
+    for title, price, latitude in (("Cheap", 40.0, 10.0), ("Mid", 90.0, 20.0), ("Dear", 300.0, 30.0)):
+        facade.create_place({"title": title, "description": "Nice", "price": price, "latitude": latitude,
+                             "longitude": 5.0, "owner_id": owner["id"]})
+    if facade.place_columns is not None:
+        assert len(facade.place_columns) == 3
+    assert [p["title"] for p in facade.find_places(max_price=100.0, bbox=(15.0, 0.0, 35.0, 10.0))] == ["Mid"]
+    assert {p["title"] for p in facade.find_places(owner_id=owner["id"])} == {"Cheap", "Mid", "Dear"}
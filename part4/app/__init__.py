@@ -5,10 +5,18 @@ from flask_jwt_extended import JWTManager
 from flask_sqlalchemy import SQLAlchemy
 from flask_cors import CORS
 import config
+from app.passwords import PasswordHasher, PasswordHasherBusy
+from app.encoding import get_encoder, make_output_json
+from app.compression import init_compression
+from app.metrics import Metrics
+from app.query_guard import QueryGuard
 
 bcrypt = Bcrypt()
 jwt = JWTManager()
 db = SQLAlchemy()
+password_hasher = PasswordHasher(bcrypt)
+metrics = Metrics()
+query_guard = QueryGuard()
 
 from app.api.v1.users import api as users_ns
 from app.api.v1.auth import api as auth_ns
@@ -16,16 +24,30 @@ from app.api.v1.places import api as places_ns
 from app.api.v1.reviews import api as reviews_ns
 from app.api.v1.amenities import api as amenities_ns
 from app.api.v1.protected import api as protected_ns
+from app.api.v1.bulk import api as bulk_ns
 
 def create_app(config_class=config.DevelopmentConfig):
     app = Flask(__name__)
     app.config.from_object(config_class)
 
     CORS(app)
+    init_compression(app)
     bcrypt.init_app(app)
+    password_hasher.init_app(app)
     jwt.init_app(app)
     db.init_app(app)
 
+    from app.persistence.engine import init_sqlite
+    init_sqlite(app)
+    metrics.init_app(app)
+    query_guard.init_app(app)
+
+    from app.services import facade
+    facade.init_app(app)
+
+    from app.commands import hbnb_cli
+    app.cli.add_command(hbnb_cli)
+
     authorizations = {
         'apikey': {
             'type': 'apiKey',
@@ -38,6 +60,11 @@ def create_app(config_class=config.DevelopmentConfig):
     api = Api(app, version='1.0', title='HBnB API',
               description='HBnB Web Application API',
               authorizations=authorizations)
+    api.representation('application/json')(make_output_json(get_encoder(app.config['JSON_ENCODER'])))
+
+    @api.errorhandler(PasswordHasherBusy)
+    def handle_password_hasher_busy(error):
+        return {'error': str(error)}, 503
 
     api.add_namespace(users_ns, path='/api/v1/users')
     api.add_namespace(auth_ns, path='/api/v1/auth')
@@ -45,5 +72,6 @@ def create_app(config_class=config.DevelopmentConfig):
     api.add_namespace(reviews_ns, path='/api/v1/reviews')
     api.add_namespace(amenities_ns, path='/api/v1/amenities')
     api.add_namespace(protected_ns, path='/api/v1/protected')
+    api.add_namespace(bulk_ns, path='/api/v1/bulk')
 
     return app
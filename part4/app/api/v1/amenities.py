@@ -1,6 +1,9 @@
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from app.services import facade
+from app.query_guard import query_budget
+from app.api.v1.conditional import conditional
+from app.api.v1.pagination import pagination_parser, page_response
 
 
 api = Namespace('amenities', description='Amenity operations')
@@ -19,12 +22,12 @@ class AmenityList(Resource):
     @api.response(403, 'Forbidden')
     @api.doc(security='apikey')
     @jwt_required()
+    @query_budget(3)
     def post(self):
         current_user = get_jwt_identity()
         if not current_user:
             return {'error': 'Unauthorized'}, 401
         is_admin = get_jwt()['is_admin']
-        print(current_user, is_admin)
         if not is_admin:
             return {'error': 'Forbidden'}, 403
         """Register a new amenity"""
@@ -39,17 +42,29 @@ class AmenityList(Resource):
         except Exception as e:
             return {'error': str(e).strip("'")}, 400
 
+    @api.expect(pagination_parser)
     @api.response(200, 'List of amenities retrieved successfully')
+    @api.response(400, 'Invalid cursor')
+    @conditional('amenities')
+    @query_budget(2)
     def get(self):
-        """Retrieve a list of all amenities"""
-        amenities = facade.get_all_amenities()
-        return [amenity.to_dict() for amenity in amenities], 200
+        """Retrieve a page of amenities"""
+        args = pagination_parser.parse_args()
+        if args['all']:
+            return [amenity.to_dict() for amenity in facade.get_all_amenities()], 200
+        try:
+            amenities, next_cursor = facade.get_amenities_page(args['limit'], args['cursor'])
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        return page_response([amenity.to_dict() for amenity in amenities], next_cursor), 200
 
 
 @api.route('/<amenity_id>')
 class AmenityResource(Resource):
     @api.response(200, 'Amenity details retrieved successfully')
     @api.response(404, 'Amenity not found')
+    @conditional('amenities')
+    @query_budget(2)
     def get(self, amenity_id):
         """Get amenity details by ID"""
         amenity = facade.get_amenity(amenity_id)
@@ -65,6 +80,7 @@ class AmenityResource(Resource):
     @api.response(403, 'Forbidden')
     @api.doc(security='apikey')
     @jwt_required()
+    @query_budget(4)
     def put(self, amenity_id):
         current_user = get_jwt_identity()
         if not current_user:
@@ -1,6 +1,7 @@
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt, get_jwt_identity
 from app.services import facade
+from app.query_guard import query_budget
 
 api = Namespace('auth', description='Authentication operations')
 
@@ -13,6 +14,7 @@ login_model = api.model('Login', {
 @api.route('/login')
 class Login(Resource):
 	@api.expect(login_model)
+	@query_budget(5)
 	def post(self):
 		"""Authenticate user and return a JWT token"""
 		credentials = api.payload  # Get the email and password from the request payload
@@ -23,6 +25,10 @@ class Login(Resource):
 		# Step 2: Check if the user exists and the password is correct
 		if not user or not user.verify_password(credentials['password']):
 			return {'error': 'Invalid credentials'}, 401
+
+		# Upgrade hashes made with an outdated cost factor while the password is at hand
+		if user.password_needs_rehash():
+			facade.update_user(user.id, {'password': credentials['password']})
 		try:
 			# Step 3: Create a JWT token with the user's id and is_admin flag
 			access_token = create_access_token(identity=user.id, additional_claims={'is_admin': user.is_admin})
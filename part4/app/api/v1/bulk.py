@@ -0,0 +1,69 @@
+from flask import Response, request, stream_with_context
+from flask_restx import Namespace, Resource, reqparse, inputs
+from flask_jwt_extended import jwt_required, get_jwt
+from app.services import facade
+from app.query_guard import query_budget
+from app.services.exporter import EXPORTS, FORMATS, serialize
+
+api = Namespace('bulk', description='Bulk operations')
+
+import_parser = reqparse.RequestParser()
+import_parser.add_argument('chunk_size', type=inputs.int_range(1, 10000), default=1000, location='args',
+                           help='Records per transaction')
+
+@api.route('/import')
+class BulkImport(Resource):
+    @api.expect(import_parser)
+    @api.doc(security='apikey', description='Body: one JSON record per line, each with a "type" of '
+             'amenity, place or review and the fields of that model. Places take owner_id and a '
+             'list of amenity IDs, reviews take user_id and place_id.')
+    @api.response(200, 'Import finished, see errors for rejected lines')
+    @api.response(401, 'Unauthorized')
+    @api.response(403, 'Forbidden')
+    @jwt_required()
+    @query_budget(None)
+    def post(self):
+        """Import amenities, places and reviews from an NDJSON body"""
+        if not get_jwt()['is_admin']:
+            return {'error': 'Forbidden'}, 403
+        args = import_parser.parse_args()
+        return facade.bulk_import(request.stream, args['chunk_size']), 200
+
+export_parser = reqparse.RequestParser()
+export_parser.add_argument('format', choices=tuple(FORMATS), default='ndjson', location='args',
+                           help='ndjson or csv')
+
+@api.route('/export/<entity>')
+@api.doc(params={'entity': ', '.join(EXPORTS)})
+class BulkExport(Resource):
+    @api.expect(export_parser)
+    @api.doc(security='apikey', description='Send If-Modified-Since to only get rows updated since then.')
+    @api.response(200, 'Rows streamed')
+    @api.response(304, 'Nothing updated since If-Modified-Since')
+    @api.response(401, 'Unauthorized')
+    @api.response(403, 'Forbidden')
+    @api.response(404, 'Unknown entity')
+    @jwt_required()
+    @query_budget(2)
+    def get(self, entity):
+        """Stream every row of an entity as NDJSON or CSV"""
+        if not get_jwt()['is_admin']:
+            return {'error': 'Forbidden'}, 403
+        if entity not in EXPORTS:
+            return {'error': 'Unknown entity'}, 404
+        args = export_parser.parse_args()
+
+        since = request.if_modified_since
+        if since is not None:
+            # HTTP dates are UTC, updated_at is stored in naive local time
+            since = since.astimezone().replace(tzinfo=None)
+        last_updated = facade.get_last_updated(entity)
+        if since is not None and (last_updated is None or last_updated < since):
+            return Response(status=304)
+
+        rows = facade.export_rows(entity, since)
+        response = Response(stream_with_context(serialize(entity, rows, args['format'])),
+                            mimetype=FORMATS[args['format']])
+        if last_updated is not None:
+            response.last_modified = last_updated.astimezone()
+        return response
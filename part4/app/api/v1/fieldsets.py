@@ -0,0 +1,31 @@
+from flask_restx import reqparse
+
+# Query string for sparse fieldsets, see the FIELDS and EXPANSIONS of a model
+fieldset_parser = reqparse.RequestParser()
+fieldset_parser.add_argument('fields', type=str, location='args',
+                             help='Comma separated fields to return, e.g. title,price')
+fieldset_parser.add_argument('expand', type=str, location='args',
+                             help='Comma separated relationships to embed, e.g. owner,amenities')
+
+
+def _split(value):
+    return [name for name in (part.strip() for part in value.split(',')) if name]
+
+
+def parse_fieldset(args, model):
+    """Return the (fields, expand) asked for model, or None for the full representation.
+
+    fields defaults to model.DEFAULT_FIELDS and expand to nothing, 'id' is
+    always returned. Raises ValueError on unknown names.
+    """
+    if args['fields'] is None and args['expand'] is None:
+        return None
+    fields = _split(args['fields']) if args['fields'] is not None else list(model.DEFAULT_FIELDS)
+    expand = _split(args['expand']) if args['expand'] is not None else []
+    unknown = [name for name in fields if name not in model.FIELDS]
+    unknown += [name for name in expand if name not in model.EXPANSIONS]
+    if unknown:
+        raise ValueError(f"Unknown field: {', '.join(unknown)}")
+    if 'id' not in fields:
+        fields.insert(0, 'id')
+    return tuple(dict.fromkeys(fields)), tuple(dict.fromkeys(expand))
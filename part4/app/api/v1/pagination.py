@@ -0,0 +1,17 @@
+from flask_restx import reqparse, inputs
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+
+# Query string shared by every collection endpoint
+pagination_parser = reqparse.RequestParser()
+pagination_parser.add_argument('limit', type=inputs.int_range(1, MAX_LIMIT), default=DEFAULT_LIMIT,
+                               location='args', help=f'Page size (1-{MAX_LIMIT})')
+pagination_parser.add_argument('cursor', type=str, location='args',
+                               help='Opaque cursor returned as next_cursor by the previous page')
+pagination_parser.add_argument('all', type=inputs.boolean, default=False, location='args',
+                               help='Return every row as a plain list, without pagination')
+
+
+def page_response(items, next_cursor):
+    return {'items': items, 'next_cursor': next_cursor}
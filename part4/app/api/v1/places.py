@@ -1,13 +1,20 @@
-from flask_restx import Namespace, Resource, fields
+from flask_restx import Namespace, Resource, fields, reqparse, inputs
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from app.services import facade
+from app.query_guard import query_budget
+from app.api.v1.conditional import conditional, PLACE_TABLES
+from app.api.v1.pagination import pagination_parser, page_response, DEFAULT_LIMIT, MAX_LIMIT
+from app.api.v1.fieldsets import fieldset_parser, parse_fieldset
+from app.models.place import Place
+from app.persistence.place_repository import PLACE_SORTS
 
 api = Namespace('places', description='Place operations')
 
 # Define the models for related entities
-amenity_model = api.model('PlaceAmenity', {
-    'id': fields.String(description='Amenity ID'),
-    'name': fields.String(description='Name of the amenity')
+amenity_ids_model = api.schema_model('PlaceAmenityIds', {
+    'type': 'array',
+    'items': {'type': 'string'},
+    'description': "List of amenity ID's"
 })
 
 user_model = api.model('PlaceUser', {
@@ -27,6 +34,57 @@ place_model = api.model('Place', {
     'amenities': fields.List(fields.String, description="List of amenities ID's")
 })
 
+place_filter_parser = pagination_parser.copy()
+for argument in fieldset_parser.args:
+    place_filter_parser.add_argument(argument)
+place_filter_parser.add_argument('min_price', type=float, location='args', help='Minimum price per night')
+place_filter_parser.add_argument('max_price', type=float, location='args', help='Maximum price per night')
+place_filter_parser.add_argument('owner_id', type=str, location='args', help='Only places owned by this user')
+place_filter_parser.add_argument('amenity', type=str, action='append', location='args', dest='amenity_ids',
+                                 help='Amenity ID the place must have (repeatable)')
+place_filter_parser.add_argument('sort', choices=tuple(PLACE_SORTS), default='created_at', location='args',
+                                 help='Sort order')
+place_filter_parser.add_argument('ids', type=str, location='args',
+                                 help=f'Comma-separated place IDs (max {MAX_LIMIT}): return these places, '
+                                      'in this order, as a plain list')
+
+place_search_parser = place_filter_parser.copy()
+for name in ('cursor', 'all', 'sort', 'fields', 'expand', 'ids'):
+    place_search_parser.remove_argument(name)
+place_search_parser.add_argument('q', type=str, required=True, location='args', help='Words to search for')
+
+MAX_RADIUS_KM = 500
+
+# Table versions, places + owners, amenities, reviews
+PLACE_QUERY_BUDGET = 4
+# Plus the candidate locations, before relations are loaded for the nearest
+NEARBY_QUERY_BUDGET = PLACE_QUERY_BUDGET + 1
+
+nearby_parser = reqparse.RequestParser()
+nearby_parser.add_argument('lat', type=float, location='args', help='Latitude of the search center')
+nearby_parser.add_argument('lng', type=float, location='args', help='Longitude of the search center')
+nearby_parser.add_argument('radius_km', type=float, location='args', help=f'Search radius in km (max {MAX_RADIUS_KM})')
+nearby_parser.add_argument('bbox', type=str, location='args', help='min_lng,min_lat,max_lng,max_lat')
+nearby_parser.add_argument('limit', type=inputs.int_range(1, MAX_LIMIT), default=DEFAULT_LIMIT,
+                           location='args', help=f'Maximum number of places (1-{MAX_LIMIT})')
+
+
+def parse_bbox(value):
+    """Return (min_lat, min_lng, max_lat, max_lng) from a bbox query string.
+
+    min_lng > max_lng is a box crossing the antimeridian.
+    """
+    try:
+        min_lng, min_lat, max_lng, max_lat = (float(v) for v in value.split(','))
+    except ValueError:
+        raise ValueError('bbox must be min_lng,min_lat,max_lng,max_lat')
+    if not (-90 <= min_lat <= max_lat <= 90 and -180 <= min_lng <= 180 and -180 <= max_lng <= 180):
+        raise ValueError('Invalid bbox')
+    return min_lat, min_lng, max_lat, max_lng
+
+def serialize_place(place, fieldset):
+    return place.to_dict_list() if fieldset is None else place.to_dict_fields(*fieldset)
+
 @api.route('/')
 class PlaceList(Resource):
     @api.expect(place_model)
@@ -35,6 +93,7 @@ class PlaceList(Resource):
     @api.response(401, 'Unauthorized')
     @api.doc(security='apikey')
     @jwt_required()
+    @query_budget(8)
     def post(self):
         """Register a new place"""
         place_data = api.payload
@@ -46,22 +105,94 @@ class PlaceList(Resource):
         except Exception as e:
             return {'error': str(e).strip("'")}, 400
 
+    @api.expect(place_filter_parser)
     @api.response(200, 'List of places retrieved successfully')
+    @api.response(400, 'Invalid cursor')
+    @conditional(*PLACE_TABLES)
+    @query_budget(PLACE_QUERY_BUDGET)
     def get(self):
-        """Retrieve a list of all places"""
-        places = facade.get_all_places()
-        return [place.to_dict_list() for place in places], 200
+        """Retrieve a page of places, optionally filtered and sorted, or the places listed in ids"""
+        args = place_filter_parser.parse_args()
+        filters = {key: args[key] for key in ('min_price', 'max_price', 'owner_id', 'amenity_ids')}
+        try:
+            filters['fieldset'] = parse_fieldset(args, Place)
+            if args['ids'] is not None:
+                place_ids = [place_id for place_id in args['ids'].split(',') if place_id]
+                if len(place_ids) > MAX_LIMIT:
+                    raise ValueError(f'At most {MAX_LIMIT} ids')
+                places = facade.get_places(place_ids, filters['fieldset'])
+                return [serialize_place(place, filters['fieldset']) for place in places], 200
+            if args['all']:
+                places = facade.get_all_places_with_relations(args['sort'], **filters)
+                return [serialize_place(place, filters['fieldset']) for place in places], 200
+            places, next_cursor = facade.get_places_page(args['limit'], args['cursor'], args['sort'], **filters)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        return page_response([serialize_place(place, filters['fieldset']) for place in places], next_cursor), 200
+
+@api.route('/search')
+class PlaceSearch(Resource):
+    @api.expect(place_search_parser)
+    @api.response(200, 'Matching places, best match first')
+    @api.response(400, 'Invalid input data')
+    @conditional(*PLACE_TABLES)
+    @query_budget(PLACE_QUERY_BUDGET)
+    def get(self):
+        """Full-text search over place titles and descriptions"""
+        args = place_search_parser.parse_args()
+        filters = {key: args[key] for key in ('min_price', 'max_price', 'owner_id', 'amenity_ids')}
+        try:
+            results = facade.search_places(args['q'], args['limit'], **filters)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        return [dict(place.to_dict_list(), score=round(-rank, 6), snippet=snippet)
+                for place, rank, snippet in results], 200
+
+@api.route('/nearby')
+class PlaceNearby(Resource):
+    @api.expect(nearby_parser)
+    @api.response(200, 'Places retrieved successfully')
+    @api.response(400, 'Invalid input data')
+    @conditional(*PLACE_TABLES)
+    @query_budget(NEARBY_QUERY_BUDGET)
+    def get(self):
+        """Find places around a point or inside a bounding box, nearest first"""
+        args = nearby_parser.parse_args()
+        try:
+            if args['bbox']:
+                results = facade.get_places_in_bbox(*parse_bbox(args['bbox']), args['limit'])
+            else:
+                lat, lng, radius_km = args['lat'], args['lng'], args['radius_km']
+                if lat is None or lng is None or radius_km is None:
+                    return {'error': 'lat, lng and radius_km are required'}, 400
+                if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+                    return {'error': 'Invalid coordinates'}, 400
+                if not 0 < radius_km <= MAX_RADIUS_KM:
+                    return {'error': f'radius_km must be between 0 and {MAX_RADIUS_KM}'}, 400
+                results = facade.get_places_nearby(lat, lng, radius_km, args['limit'])
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        return [dict(place.to_dict_list(), distance_km=round(distance, 3))
+                for place, distance in results], 200
 
 @api.route('/<place_id>')
 class PlaceResource(Resource):
+    @api.expect(fieldset_parser)
     @api.response(200, 'Place details retrieved successfully')
+    @api.response(400, 'Invalid input data')
     @api.response(404, 'Place not found')
+    @conditional(*PLACE_TABLES)
+    @query_budget(PLACE_QUERY_BUDGET)
     def get(self, place_id):
         """Get place details by ID"""
-        place = facade.get_place(place_id)
+        try:
+            fieldset = parse_fieldset(fieldset_parser.parse_args(), Place)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        place = facade.get_place_with_relations(place_id, fieldset)
         if not place:
             return {'error': 'Place not found'}, 404
-        return place.to_dict_list(), 200
+        return serialize_place(place, fieldset), 200
 
     @api.expect(place_model)
     @api.response(200, 'Place updated successfully')
@@ -71,6 +202,8 @@ class PlaceResource(Resource):
     @api.response(403, 'Forbidden')
     @api.doc(security='apikey')
     @jwt_required()
+    # The reload after the commit also selects the relations the place was loaded with
+    @query_budget(5)
     def put(self, place_id):
         """Update a place's information"""
         place_data = api.payload
@@ -93,6 +226,7 @@ class PlaceResource(Resource):
     @api.response(403, 'Forbidden')
     @api.doc(security='apikey')
     @jwt_required()
+    @query_budget(6)
     def delete(self, place_id):
         """Update a place's information"""
         current_user = get_jwt_identity()
@@ -110,32 +244,53 @@ class PlaceResource(Resource):
 
 @api.route('/<place_id>/amenities')
 class PlaceAmenities(Resource):
-    @api.expect(amenity_model)
-    @api.response(200, 'Amenities added successfully')
-    @api.response(404, 'Place not found')
-    @api.response(400, 'Invalid input data')
-    def post(self, place_id):
-        amenities_data = api.payload
-        if not amenities_data or len(amenities_data) == 0:
+    def _change(self, place_id, change):
+        current_user = get_jwt_identity()
+        amenity_ids = api.payload
+        if not isinstance(amenity_ids, list) or not amenity_ids:
             return {'error': 'Invalid input data'}, 400
-        
         place = facade.get_place(place_id)
         if not place:
             return {'error': 'Place not found'}, 404
-        
-        for amenity in amenities_data:
-            a = facade.get_amenity(amenity['id'])
-            if not a:
-                return {'error': 'Invalid input data'}, 400
-        
-        for amenity in amenities_data:
-            place.add_amenity(amenity)
-        return {'message': 'Amenities added successfully'}, 200
+        if place.user_id != current_user and not get_jwt()['is_admin']:
+            return {'error': 'Forbidden'}, 403
+        try:
+            amenities = change(place_id, amenity_ids)
+        except KeyError as e:
+            return {'error': str(e).strip("'")}, 400
+        return [amenity.to_dict() for amenity in amenities], 200
+
+    @api.expect(amenity_ids_model)
+    @api.response(200, 'Amenities added, the amenities of the place returned')
+    @api.response(400, 'Invalid input data')
+    @api.response(403, 'Forbidden')
+    @api.response(404, 'Place not found')
+    @api.doc(security='apikey')
+    @jwt_required()
+    # place, existence check, INSERT OR IGNORE, resulting amenities
+    @query_budget(4)
+    def post(self, place_id):
+        """Link a list of amenity IDs to a place"""
+        return self._change(place_id, facade.add_place_amenities)
+
+    @api.expect(amenity_ids_model)
+    @api.response(200, 'Amenities removed, the amenities of the place returned')
+    @api.response(400, 'Invalid input data')
+    @api.response(403, 'Forbidden')
+    @api.response(404, 'Place not found')
+    @api.doc(security='apikey')
+    @jwt_required()
+    @query_budget(4)
+    def delete(self, place_id):
+        """Unlink a list of amenity IDs from a place"""
+        return self._change(place_id, facade.remove_place_amenities)
 
 @api.route('/<place_id>/reviews/')
 class PlaceReviewList(Resource):
     @api.response(200, 'List of reviews for the place retrieved successfully')
     @api.response(404, 'Place not found')
+    @conditional('places', 'reviews')
+    @query_budget(3)
     def get(self, place_id):
         """Get all reviews for a specific place"""
         place = facade.get_place(place_id)
@@ -1,5 +1,8 @@
 from flask_restx import Namespace, Resource
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+from app.services import facade
+from app.query_guard import query_budget
+from app import password_hasher
 
 api = Namespace('protected', description='Protected operations')
 
@@ -9,8 +12,36 @@ class ProtectedResource(Resource):
 	@api.response(200, 'Hello, user <id>')
 	@api.response(401, 'Unauthorized')
 	@jwt_required()
+	@query_budget(0)
 	def get(self):
 		"""A protected endpoint that requires a valid JWT token"""
 		current_user = get_jwt_identity()
-		print(current_user)
 		return {'message': f'Hello, user {current_user}'}, 200
+
+@api.route('/cache')
+class CacheStats(Resource):
+	@api.doc(security='apikey')
+	@api.response(200, 'Cache counters')
+	@api.response(401, 'Unauthorized')
+	@api.response(403, 'Forbidden')
+	@jwt_required()
+	@query_budget(0)
+	def get(self):
+		"""Hit, miss and eviction counters of the facade cache"""
+		if not get_jwt()['is_admin']:
+			return {'error': 'Forbidden'}, 403
+		return facade.get_cache_stats(), 200
+
+@api.route('/passwords')
+class PasswordHasherStats(Resource):
+	@api.doc(security='apikey')
+	@api.response(200, 'Password hashing pool metrics')
+	@api.response(401, 'Unauthorized')
+	@api.response(403, 'Forbidden')
+	@jwt_required()
+	@query_budget(0)
+	def get(self):
+		"""Queue depth and hash latency of the password hashing pool"""
+		if not get_jwt()['is_admin']:
+			return {'error': 'Forbidden'}, 403
+		return password_hasher.stats(), 200
@@ -1,6 +1,11 @@
-from flask_restx import Namespace, Resource, fields
+from flask_restx import Namespace, Resource, fields, reqparse, inputs
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from app.services import facade
+from app.query_guard import query_budget
+from app.api.v1.conditional import conditional
+from app.api.v1.pagination import pagination_parser, page_response, DEFAULT_LIMIT, MAX_LIMIT
+from app.api.v1.fieldsets import fieldset_parser, parse_fieldset
+from app.models.review import Review
 
 api = Namespace('reviews', description='Review operations')
 
@@ -11,6 +16,23 @@ review_model = api.model('Review', {
     'place_id': fields.String(required=True, description='ID of the place')
 })
 
+review_search_parser = reqparse.RequestParser()
+review_search_parser.add_argument('q', type=str, required=True, location='args', help='Words to search for')
+review_search_parser.add_argument('place_id', type=str, location='args', help='Only reviews of this place')
+review_search_parser.add_argument('limit', type=inputs.int_range(1, MAX_LIMIT), default=DEFAULT_LIMIT,
+                                  location='args', help=f'Maximum number of reviews (1-{MAX_LIMIT})')
+
+review_list_parser = pagination_parser.copy()
+for argument in fieldset_parser.args:
+    review_list_parser.add_argument(argument)
+
+# Tables behind a review with its user and place expanded
+REVIEW_TABLES = ('reviews', 'users', 'places')
+
+
+def serialize_review(review, fieldset):
+    return review.to_dict() if fieldset is None else review.to_dict_fields(*fieldset)
+
 @api.route('/')
 class ReviewList(Resource):
     @api.expect(review_model)
@@ -19,6 +41,7 @@ class ReviewList(Resource):
     @api.response(401, 'Unauthorized')
     @jwt_required()
     @api.doc(security='apikey')
+    @query_budget(8)
     def post(self):
         """Register a new review"""
         current_user = get_jwt_identity()
@@ -29,21 +52,58 @@ class ReviewList(Resource):
         except Exception as e:
             return {"error": str(e).strip("'")}, 400
 
+    @api.expect(review_list_parser)
     @api.response(200, 'List of reviews retrieved successfully')
+    @api.response(400, 'Invalid cursor')
+    @conditional(*REVIEW_TABLES)
+    @query_budget(3)
     def get(self):
-        """Retrieve a list of all reviews"""
-        return [review.to_dict() for review in facade.get_all_reviews()], 200
+        """Retrieve a page of reviews"""
+        args = review_list_parser.parse_args()
+        try:
+            fieldset = parse_fieldset(args, Review)
+            if args['all']:
+                return [serialize_review(review, fieldset) for review in facade.get_all_reviews(fieldset)], 200
+            reviews, next_cursor = facade.get_reviews_page(args['limit'], args['cursor'], fieldset)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        return page_response([serialize_review(review, fieldset) for review in reviews], next_cursor), 200
+
+@api.route('/search')
+class ReviewSearch(Resource):
+    @api.expect(review_search_parser)
+    @api.response(200, 'Matching reviews, best match first')
+    @api.response(400, 'Invalid input data')
+    @conditional('reviews')
+    @query_budget(2)
+    def get(self):
+        """Full-text search over review text"""
+        args = review_search_parser.parse_args()
+        try:
+            results = facade.search_reviews(args['q'], args['limit'], args['place_id'])
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        return [dict(review.to_dict(), score=round(-rank, 6), snippet=snippet)
+                for review, rank, snippet in results], 200
 
 @api.route('/<review_id>')
 class ReviewResource(Resource):
+    @api.expect(fieldset_parser)
     @api.response(200, 'Review details retrieved successfully')
+    @api.response(400, 'Invalid input data')
     @api.response(404, 'Review not found')
+    @conditional(*REVIEW_TABLES)
+    @query_budget(3)
     def get(self, review_id):
         """Get review details by ID"""
-        review = facade.get_review(review_id)
+        try:
+            fieldset = parse_fieldset(fieldset_parser.parse_args(), Review)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        review = facade.get_review(review_id, fieldset)
         if not review:
             return {'error': 'Review not found'}, 404
-        return review.to_dict(), 200
+        return serialize_review(review, fieldset), 200
 
     @api.expect(review_model)
     @api.response(200, 'Review updated successfully')
@@ -53,6 +113,7 @@ class ReviewResource(Resource):
     @api.response(403, 'Forbidden')
     @jwt_required()
     @api.doc(security='apikey')
+    @query_budget(7)
     def put(self, review_id):
         """Update a review's information"""
         current_user = get_jwt_identity()
@@ -76,6 +137,7 @@ class ReviewResource(Resource):
     @api.response(403, 'Forbidden')
     @api.doc(security='apikey')
     @jwt_required()
+    @query_budget(7)
     def delete(self, review_id):
         """Delete a review"""
         current_user = get_jwt_identity()
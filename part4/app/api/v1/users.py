@@ -1,6 +1,10 @@
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from app.services import facade
+from app.query_guard import query_budget
+from app.api.v1.conditional import conditional
+from app.passwords import PasswordHasherBusy
+from app.api.v1.pagination import pagination_parser, page_response
 
 api = Namespace('users', description='User operations')
 
@@ -20,6 +24,7 @@ class UserList(Resource):
     @api.response(400, 'Email already registered')
     @api.response(400, 'Invalid input data')
     @jwt_required(optional=True)
+    @query_budget(3)
     def post(self):
         """Register a new user"""
         user_data = api.payload
@@ -40,19 +45,33 @@ class UserList(Resource):
         try:
             new_user = facade.create_user(user_data)
             return {'message': 'User successfully created', 'id': new_user.id}, 201
+        except PasswordHasherBusy as e:
+            return {'error': str(e)}, 503
         except Exception as e:
             return {'error': str(e).strip("'")}, 400
         
+    @api.expect(pagination_parser)
     @api.response(200, 'List of users retrieved successfully')
+    @api.response(400, 'Invalid cursor')
+    @conditional('users')
+    @query_budget(2)
     def get(self):
-        """Retrieve a list of users"""
-        users = facade.get_users()
-        return [user.to_dict() for user in users], 200
+        """Retrieve a page of users"""
+        args = pagination_parser.parse_args()
+        if args['all']:
+            return [user.to_dict() for user in facade.get_users()], 200
+        try:
+            users, next_cursor = facade.get_users_page(args['limit'], args['cursor'])
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        return page_response([user.to_dict() for user in users], next_cursor), 200
     
 @api.route('/<user_id>')
 class UserResource(Resource):
     @api.response(200, 'User details retrieved successfully')
     @api.response(404, 'User not found')
+    @conditional('users')
+    @query_budget(2)
     def get(self, user_id):
         """Get user details by ID"""
         user = facade.get_user(user_id)
@@ -68,6 +87,7 @@ class UserResource(Resource):
     @api.response(403, 'Forbidden')
     @api.doc(security='apikey')
     @jwt_required()
+    @query_budget(4)
     def put(self, user_id):
         current_user = get_jwt_identity()
         admin = get_jwt()['is_admin']
@@ -0,0 +1,48 @@
+import json
+import click
+from flask.cli import AppGroup
+from app.services import facade
+
+hbnb_cli = AppGroup('hbnb', help='HBnB maintenance commands.')
+
+
+@hbnb_cli.command('recompute-ratings')
+@click.option('--dry-run', is_flag=True, help='Only report places whose aggregates drifted.')
+def recompute_ratings(dry_run):
+    """Verify the rating aggregates of every place and repair drift."""
+    place_ids = facade.recompute_place_ratings(fix=not dry_run)
+    for place_id in place_ids:
+        click.echo(f"drift: {place_id}")
+    action = 'found' if dry_run else 'repaired'
+    click.echo(f"{len(place_ids)} place(s) {action}")
+
+
+@hbnb_cli.command('rebuild-search')
+def rebuild_search():
+    """Create the full-text search tables if needed and reindex every place and review."""
+    facade.rebuild_search_index()
+    click.echo("search index rebuilt")
+
+
+@hbnb_cli.command('import')
+@click.argument('file', type=click.File('r'))
+@click.option('--chunk-size', default=1000, show_default=True, help='Records per transaction.')
+def import_records(file, chunk_size):
+    """Import amenities, places and reviews from an NDJSON FILE ('-' for stdin)."""
+    report = facade.bulk_import(file, chunk_size)
+    for error in report['errors']:
+        click.echo(f"line {error['line']}: {error['error']}", err=True)
+    click.echo(json.dumps(report['created']))
+
+
+@hbnb_cli.command('export')
+@click.argument('entity', type=click.Choice(['users', 'amenities', 'places', 'reviews']))
+@click.option('--format', 'export_format', type=click.Choice(['ndjson', 'csv']), default='ndjson',
+              show_default=True)
+@click.option('--since', type=click.DateTime(), help='Only rows updated at or after this time.')
+@click.option('-o', '--output', type=click.File('w'), default='-', help='Output file, stdout by default.')
+def export_records(entity, export_format, since, output):
+    """Stream every ENTITY row as NDJSON or CSV."""
+    from app.services.exporter import serialize
+    for chunk in serialize(entity, facade.export_rows(entity, since), export_format):
+        output.write(chunk)
@@ -0,0 +1,48 @@
+"""Negotiated gzip/brotli compression of API responses"""
+import gzip
+from flask import request
+
+try:
+    import brotli  # optional dependency, gzip is used without it
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = ('application/json', 'text/html', 'text/css', 'text/csv', 'text/plain',
+                      'application/javascript', 'application/x-ndjson')
+
+
+def compress(data, encoding, gzip_level=6, brotli_quality=4):
+    if encoding == 'br':
+        return brotli.compress(data, quality=brotli_quality)
+    return gzip.compress(data, compresslevel=gzip_level, mtime=0)
+
+
+def init_compression(app):
+    """Compress responses larger than COMPRESS_MIN_SIZE bytes"""
+    min_size = app.config.get('COMPRESS_MIN_SIZE', 1024)
+    gzip_level = app.config.get('COMPRESS_LEVEL', 6)
+    brotli_quality = app.config.get('COMPRESS_BROTLI_QUALITY', 4)
+    encodings = [name for name in app.config.get('COMPRESS_ENCODINGS', ('br', 'gzip'))
+                 if name != 'br' or brotli is not None]
+    if not encodings:
+        return
+
+    @app.after_request
+    def compress_response(response):
+        # Streamed exports and files are sent as they are produced
+        if (response.direct_passthrough or response.is_streamed
+                or response.mimetype not in COMPRESSIBLE_TYPES or 'Content-Encoding' in response.headers):
+            return response
+        response.vary.add('Accept-Encoding')
+        if not 200 <= response.status_code < 300 or (response.content_length or 0) < min_size:
+            return response
+        encoding = request.accept_encodings.best_match(encodings)
+        if encoding is None:
+            return response
+        response.set_data(compress(response.get_data(), encoding, gzip_level, brotli_quality))
+        response.headers['Content-Encoding'] = encoding
+        # Both encodings share the validators of the same entity, as nginx does
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
@@ -0,0 +1,41 @@
+"""JSON encoders for API responses, orjson when installed"""
+import json
+from flask import current_app, make_response
+
+try:
+    import orjson  # optional dependency, several times faster than json on place lists
+except ImportError:
+    orjson = None
+
+
+def json_dumps(data, indent=False):
+    return json.dumps(data, indent=4 if indent else None).encode()
+
+
+def orjson_dumps(data, indent=False):
+    option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+    return orjson.dumps(data, default=str, option=option)
+
+
+ENCODERS = {'json': json_dumps, 'orjson': orjson_dumps}
+
+
+def get_encoder(name='auto'):
+    """Return the dumps function called name, 'auto' picks the fastest available"""
+    if name == 'auto':
+        name = 'orjson' if orjson is not None else 'json'
+    if name == 'orjson' and orjson is None:
+        raise RuntimeError("JSON_ENCODER is 'orjson' but orjson is not installed")
+    try:
+        return ENCODERS[name]
+    except KeyError:
+        raise ValueError(f"Unknown JSON encoder: {name}")
+
+
+def make_output_json(dumps):
+    """Build a flask_restx representation writing bodies with dumps"""
+    def output_json(data, code, headers=None):
+        resp = make_response(dumps(data, indent=current_app.debug) + b"\n", code)
+        resp.headers.extend(headers or {})
+        return resp
+    return output_json
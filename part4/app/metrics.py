@@ -0,0 +1,158 @@
+"""Request and SQL metrics, served at /metrics in the Prometheus text format"""
+import threading
+import time
+from bisect import bisect_left
+from flask import Response, g, has_request_context, request
+from sqlalchemy import event
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class Histogram:
+    """Cumulative buckets, sum and count of one labelled series"""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def samples(self, name, labels):
+        cumulative = 0
+        for bound, count in zip(self.buckets + ('+Inf',), self.counts):
+            cumulative += count
+            yield f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}'
+        yield f'{name}_sum{{{labels}}} {self.sum}'
+        yield f'{name}_count{{{labels}}} {self.count}'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels):
+    return ','.join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+
+
+class Metrics:
+    """Per-endpoint latency, status, in-flight and SQL statistics.
+
+    Endpoints are labelled with their URL rule (/api/v1/places/<place_id>),
+    never the raw path, so the number of series stays bounded. SQL time
+    is measured with cursor events on the engine and charged to the
+    request running on the same thread.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.in_flight = 0
+            self.requests = {}      # (method, endpoint, status) -> count
+            self.latency = {}       # (method, endpoint) -> Histogram
+            self.queries = {}       # (method, endpoint) -> Histogram of queries per request
+            self.query_seconds = {}  # (method, endpoint) -> total SQL time
+
+    def init_app(self, app):
+        server_timing = app.config.get('METRICS_SERVER_TIMING')
+        if server_timing is None:
+            server_timing = app.debug
+
+        with app.app_context():
+            from app import db
+            engine = db.engine
+        event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+
+        @app.before_request
+        def start_request():
+            g.metrics_start = time.perf_counter()
+            g.sql_queries = 0
+            g.sql_seconds = 0.0
+            with self._lock:
+                self.in_flight += 1
+
+        @app.after_request
+        def record_request(response):
+            if 'metrics_start' not in g:
+                return response
+            elapsed = time.perf_counter() - g.metrics_start
+            self.observe(request.method, self.endpoint(), response.status_code, elapsed,
+                         g.sql_queries, g.sql_seconds)
+            if server_timing:
+                response.headers['Server-Timing'] = (
+                    f'app;dur={elapsed * 1000:.1f}, '
+                    f'db;dur={g.sql_seconds * 1000:.1f};desc="{g.sql_queries} queries"')
+            return response
+
+        @app.teardown_request
+        def end_request(error=None):
+            if g.pop('metrics_start', None) is not None:
+                with self._lock:
+                    self.in_flight -= 1
+
+        if app.config.get('METRICS_ENABLED', True):
+            app.add_url_rule('/metrics', 'metrics', self.metrics_view)
+
+    @staticmethod
+    def endpoint():
+        return request.url_rule.rule if request.url_rule is not None else '<unmatched>'
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        # Kept on the statement's own context so a failing statement leaves nothing behind
+        if context is not None:
+            context.metrics_query_start = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, 'metrics_query_start', None)
+        if started is not None and has_request_context() and 'sql_queries' in g:
+            g.sql_queries += 1
+            g.sql_seconds += time.perf_counter() - started
+
+    def observe(self, method, endpoint, status, seconds, queries, query_seconds):
+        key = (method, endpoint)
+        with self._lock:
+            self.requests[key + (status,)] = self.requests.get(key + (status,), 0) + 1
+            self.latency.setdefault(key, Histogram(LATENCY_BUCKETS)).observe(seconds)
+            self.queries.setdefault(key, Histogram(QUERY_COUNT_BUCKETS)).observe(queries)
+            self.query_seconds[key] = self.query_seconds.get(key, 0.0) + query_seconds
+
+    def render(self):
+        """Every series in the Prometheus text exposition format"""
+        with self._lock:
+            lines = [
+                '# HELP hbnb_http_requests_in_flight Requests being served.',
+                '# TYPE hbnb_http_requests_in_flight gauge',
+                f'hbnb_http_requests_in_flight {self.in_flight}',
+                '# HELP hbnb_http_requests_total Requests served, by status.',
+                '# TYPE hbnb_http_requests_total counter',
+            ]
+            for (method, endpoint, status), count in sorted(self.requests.items()):
+                lines.append(f'hbnb_http_requests_total{{{_labels(method=method, endpoint=endpoint, status=status)}}} '
+                             f'{count}')
+            lines += ['# HELP hbnb_http_request_duration_seconds Request latency.',
+                      '# TYPE hbnb_http_request_duration_seconds histogram']
+            for (method, endpoint), histogram in sorted(self.latency.items()):
+                lines += histogram.samples('hbnb_http_request_duration_seconds',
+                                           _labels(method=method, endpoint=endpoint))
+            lines += ['# HELP hbnb_db_queries_per_request SQL statements issued by one request.',
+                      '# TYPE hbnb_db_queries_per_request histogram']
+            for (method, endpoint), histogram in sorted(self.queries.items()):
+                lines += histogram.samples('hbnb_db_queries_per_request', _labels(method=method, endpoint=endpoint))
+            lines += ['# HELP hbnb_db_query_seconds_total Time spent in SQL statements.',
+                      '# TYPE hbnb_db_query_seconds_total counter']
+            for (method, endpoint), seconds in sorted(self.query_seconds.items()):
+                lines.append(f'hbnb_db_query_seconds_total{{{_labels(method=method, endpoint=endpoint)}}} {seconds}')
+        return '\n'.join(lines) + '\n'
+
+    def metrics_view(self):
+        return Response(self.render(), content_type=PROMETHEUS_CONTENT_TYPE)
@@ -5,3 +5,6 @@ class AmenityPlace(db.Model):
 
     place_id = db.Column(db.String(36), db.ForeignKey('places.id'), primary_key=True)
     amenity_id = db.Column(db.String(36), db.ForeignKey('amenities.id'), primary_key=True)
+
+    # The primary key covers lookups by place; this one serves amenity filters
+    __table_args__ = (db.Index('ix_amenities_places_amenity_id_place_id', 'amenity_id', 'place_id'),)
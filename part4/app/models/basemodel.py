@@ -1,6 +1,7 @@
 from app import db
 import uuid
 from datetime import datetime
+from sqlalchemy.orm import declared_attr
 
 class BaseModel(db.Model):
     __abstract__ = True
@@ -9,11 +10,16 @@ class BaseModel(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.now)
     updated_at = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now)
 
+    @declared_attr.directive
+    def __table_args__(cls):
+        # Keyset pagination walks (created_at, id), incremental exports select on updated_at
+        return (db.Index(f'ix_{cls.__tablename__}_created_at_id', 'created_at', 'id'),
+                db.Index(f'ix_{cls.__tablename__}_updated_at', 'updated_at'))
+
     def save(self):
         """Update the updated_at timestamp whenever the object is modified"""
         self.updated_at = datetime.now()
         db.session.add(self)
-        db.session.commit()
 
     def update(self, data):
         """Update the attributes of the object based on the provided dictionary"""
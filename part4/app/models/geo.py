@@ -0,0 +1,119 @@
+"""Geohash helpers backing the spatial search on places"""
+from math import asin, cos, floor, radians, sin, sqrt
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+PRECISION = 9
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE_LAT = 111.32
+# Upper bound on the number of cells used to cover a search box
+MAX_COVER_CELLS = 16
+
+
+def encode(latitude, longitude, precision=PRECISION):
+    """Return the geohash of a point"""
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+    while len(chars) < precision:
+        if even:
+            mid = (lng_range[0] + lng_range[1]) / 2
+            if longitude >= mid:
+                bits = bits * 2 + 1
+                lng_range[0] = mid
+            else:
+                bits = bits * 2
+                lng_range[1] = mid
+        else:
+            mid = (lat_range[0] + lat_range[1]) / 2
+            if latitude >= mid:
+                bits = bits * 2 + 1
+                lat_range[0] = mid
+            else:
+                bits = bits * 2
+                lat_range[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(BASE32[bits])
+            bits = 0
+            bit_count = 0
+    return ''.join(chars)
+
+
+def cell_size(precision):
+    """Return the (height, width) in degrees of a geohash cell"""
+    nb_bits = 5 * precision
+    lng_bits = (nb_bits + 1) // 2
+    lat_bits = nb_bits // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lng_bits
+
+
+def cover(min_lat, min_lng, max_lat, max_lng):
+    """Return the geohash prefixes of the cells covering a bounding box.
+
+    The finest precision that needs at most MAX_COVER_CELLS cells is used,
+    so the prefixes stay few while matching as little outside the box as
+    possible.
+    """
+    for precision in range(PRECISION, 0, -1):
+        height, width = cell_size(precision)
+        rows = range(floor((min_lat + 90) / height), floor((max_lat + 90) / height) + 1)
+        cols = range(floor((min_lng + 180) / width), floor((max_lng + 180) / width) + 1)
+        if len(rows) * len(cols) <= MAX_COVER_CELLS or precision == 1:
+            break
+    cells = set()
+    for row in rows:
+        lat = min(-90 + (row + 0.5) * height, 90.0)
+        for col in cols:
+            lng = min(-180 + (col + 0.5) * width, 180.0)
+            cells.add(encode(lat, lng, precision))
+    return sorted(cells)
+
+
+def bbox_around(latitude, longitude, radius_km):
+    """Return the (min_lat, min_lng, max_lat, max_lng) boxes enclosing a circle.
+
+    A circle crossing the antimeridian gets two boxes, one on each side.
+    """
+    delta_lat = radius_km / KM_PER_DEGREE_LAT
+    min_lat = max(latitude - delta_lat, -90.0)
+    max_lat = min(latitude + delta_lat, 90.0)
+    if min_lat == -90.0 or max_lat == 90.0:
+        return [(min_lat, -180.0, max_lat, 180.0)]
+    delta_lng = delta_lat / cos(radians(latitude))
+    if delta_lng >= 180.0:
+        return [(min_lat, -180.0, max_lat, 180.0)]
+    min_lng, max_lng = longitude - delta_lng, longitude + delta_lng
+    if min_lng < -180.0:
+        return [(min_lat, -180.0, max_lat, max_lng), (min_lat, min_lng + 360.0, max_lat, 180.0)]
+    if max_lng > 180.0:
+        return [(min_lat, min_lng, max_lat, 180.0), (min_lat, -180.0, max_lat, max_lng - 360.0)]
+    return [(min_lat, min_lng, max_lat, max_lng)]
+
+
+def split_bbox(min_lat, min_lng, max_lat, max_lng):
+    """Return the boxes of a box, two when it crosses the antimeridian (min_lng > max_lng)"""
+    if min_lng > max_lng:
+        return [(min_lat, min_lng, max_lat, 180.0), (min_lat, -180.0, max_lat, max_lng)]
+    return [(min_lat, min_lng, max_lat, max_lng)]
+
+
+def bbox_center(min_lat, min_lng, max_lat, max_lng):
+    """Return the (latitude, longitude) center of a box, across the antimeridian if it crosses it"""
+    if min_lng > max_lng:
+        max_lng += 360.0
+    center_lng = (min_lng + max_lng) / 2
+    if center_lng > 180.0:
+        center_lng -= 360.0
+    return (min_lat + max_lat) / 2, center_lng
+
+
+def distance_km(lat1, lng1, lat2, lng2):
+    """Great-circle distance between two points (haversine)"""
+    d_lat = radians(lat2 - lat1)
+    d_lng = radians(lng2 - lng1)
+    a = sin(d_lat / 2) ** 2 + cos(radians(lat1)) * cos(radians(lat2)) * sin(d_lng / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * asin(sqrt(a))
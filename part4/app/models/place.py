@@ -1,5 +1,7 @@
 from .basemodel import BaseModel
+from . import geo
 from app import db
+from sqlalchemy import event
 from sqlalchemy.orm import validates
 
 class Place(BaseModel):
@@ -10,11 +12,43 @@ class Place(BaseModel):
     price = db.Column(db.Float, nullable=False)
     latitude = db.Column(db.Float, nullable=False)
     longitude = db.Column(db.Float, nullable=False)
+    geohash = db.Column(db.String(geo.PRECISION), nullable=True, index=True)
+
+    # Rating aggregates, maintained by the Review mapper events
+    review_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rating_sum = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    average_rating = db.Column(db.Float, nullable=False, default=0.0, server_default='0')
+    rating_1 = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rating_2 = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rating_3 = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rating_4 = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rating_5 = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     user_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False)
     amenities = db.relationship('Amenity', secondary='amenities_places', backref='places', lazy='dynamic')
 
     owner = db.relationship('User', backref='places', lazy='select')
 
+    # Read-only list views of the dynamic collections, so listings can
+    # eager-load them with selectinload() instead of one query per place.
+    amenity_list = db.relationship('Amenity', secondary='amenities_places', viewonly=True)
+    review_list = db.relationship('Review', viewonly=True)
+
+    # ?fields= name -> columns it reads, 'rating' covers the aggregates
+    FIELDS = {
+        'id': ('id',),
+        'title': ('title',),
+        'description': ('description',),
+        'price': ('price',),
+        'latitude': ('latitude',),
+        'longitude': ('longitude',),
+        'owner_id': ('user_id',),
+        'rating': ('review_count', 'average_rating') + tuple(f'rating_{i}' for i in range(1, 6)),
+    }
+    # Fields of to_dict_list(), returned when only ?expand= is given
+    DEFAULT_FIELDS = ('id', 'title', 'description', 'price', 'latitude', 'longitude', 'rating')
+    # ?expand= name -> relationship it embeds
+    EXPANSIONS = {'owner': 'owner', 'amenities': 'amenity_list', 'reviews': 'review_list'}
+
     @validates('title')
     def validate_title(self, key, value):
         if not isinstance(value, str):
@@ -75,7 +109,7 @@ class Place(BaseModel):
             'price': self.price,
             'latitude': self.latitude,
             'longitude': self.longitude,
-            'owner_id': self.owner.id
+            'owner_id': self.user_id
         }
     
     def to_dict_list(self):
@@ -87,6 +121,43 @@ class Place(BaseModel):
             'latitude': self.latitude,
             'longitude': self.longitude,
             'owner': self.owner.to_dict(),
-            'amenities': [amenity.to_dict() for amenity in self.amenities],
-            'reviews': [review.to_dict() for review in self.reviews]
+            'amenities': [amenity.to_dict() for amenity in self.amenity_list],
+            'reviews': [review.to_dict() for review in self.review_list],
+            'rating': self.rating_to_dict()
         }
+
+    def to_dict_fields(self, fields, expand):
+        """Only the requested fields and relationships, see FIELDS and EXPANSIONS"""
+        data = {}
+        for name in fields:
+            if name == 'owner_id':
+                data[name] = self.user_id
+            elif name == 'rating':
+                data[name] = self.rating_to_dict()
+            else:
+                data[name] = getattr(self, name)
+        if 'owner' in expand:
+            data['owner'] = self.owner.to_dict()
+        if 'amenities' in expand:
+            data['amenities'] = [amenity.to_dict() for amenity in self.amenity_list]
+        if 'reviews' in expand:
+            data['reviews'] = [review.to_dict() for review in self.review_list]
+        return data
+
+    def rating_to_dict(self):
+        return {
+            'average': self.average_rating,
+            'count': self.review_count,
+            'histogram': {str(i): getattr(self, f'rating_{i}') for i in range(1, 6)}
+        }
+
+@event.listens_for(Place, 'before_insert')
+@event.listens_for(Place, 'before_update')
+def set_geohash(mapper, connection, place):
+    """Keep the geohash column in step with latitude and longitude"""
+    place.geohash = geo.encode(place.latitude, place.longitude)
+
+# Listing filters: price range / price sort, rating sort, and owner
+db.Index('ix_places_price_created_at_id', Place.price, Place.created_at, Place.id)
+db.Index('ix_places_average_rating_created_at_id', Place.average_rating, Place.created_at, Place.id)
+db.Index('ix_places_user_id_created_at_id', Place.user_id, Place.created_at, Place.id)
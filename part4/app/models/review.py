@@ -1,5 +1,7 @@
 from .basemodel import BaseModel
+from .place import Place
 from app import db
+from sqlalchemy import Float, cast, event, func, inspect, update
 from sqlalchemy.orm import validates
 
 class Review(BaseModel):
@@ -13,6 +15,12 @@ class Review(BaseModel):
 	place = db.relationship('Place', backref=db.backref('reviews', lazy='dynamic'), lazy='select')
 	user = db.relationship('User', backref=db.backref('reviews', lazy='dynamic'), lazy='select')
 
+	# ?fields= names, all of them plain columns
+	FIELDS = {name: (name,) for name in ('id', 'text', 'rating', 'place_id', 'user_id')}
+	DEFAULT_FIELDS = tuple(FIELDS)
+	# ?expand= name -> relationship it embeds
+	EXPANSIONS = {'user': 'user', 'place': 'place'}
+
 	@validates('text')
 	def validate_text(self, key, value):
 		if not isinstance(value, str):
@@ -34,6 +42,60 @@ class Review(BaseModel):
 			'id': self.id,
 			'text': self.text,
 			'rating': self.rating,
-			'place_id': self.place.id,
-			'user_id': self.user.id
+			'place_id': self.place_id,
+			'user_id': self.user_id
 		}
+
+	def to_dict_fields(self, fields, expand):
+		"""Only the requested fields and relationships, see FIELDS and EXPANSIONS"""
+		data = {name: getattr(self, name) for name in fields}
+		if 'user' in expand:
+			data['user'] = self.user.to_dict()
+		if 'place' in expand:
+			data['place'] = self.place.to_dict()
+		return data
+
+
+# One review per user and place
+db.Index('uq_reviews_user_id_place_id', Review.user_id, Review.place_id, unique=True)
+
+
+def _apply_rating(connection, place_id, rating, delta):
+	"""Add (delta=1) or remove (delta=-1) a rating from a place's aggregates"""
+	places = Place.__table__
+	histogram = places.c[f'rating_{rating}']
+	connection.execute(
+		update(places)
+		.where(places.c.id == place_id)
+		.values({
+			places.c.review_count: places.c.review_count + delta,
+			places.c.rating_sum: places.c.rating_sum + rating * delta,
+			histogram: histogram + delta,
+			places.c.average_rating: func.coalesce(
+				cast(places.c.rating_sum + rating * delta, Float) / func.nullif(places.c.review_count + delta, 0), 0.0)
+		})
+	)
+
+
+# Run inside the flush, so aggregates commit or roll back with the review
+@event.listens_for(Review, 'after_insert')
+def add_rating(mapper, connection, review):
+	_apply_rating(connection, review.place_id, review.rating, 1)
+
+
+@event.listens_for(Review, 'after_update')
+def move_rating(mapper, connection, review):
+	state = inspect(review)
+	rating = state.attrs.rating.history
+	place_id = state.attrs.place_id.history
+	if not rating.has_changes() and not place_id.has_changes():
+		return
+	old_rating = rating.deleted[0] if rating.deleted else review.rating
+	old_place_id = place_id.deleted[0] if place_id.deleted else review.place_id
+	_apply_rating(connection, old_place_id, old_rating, -1)
+	_apply_rating(connection, review.place_id, review.rating, 1)
+
+
+@event.listens_for(Review, 'after_delete')
+def remove_rating(mapper, connection, review):
+	_apply_rating(connection, review.place_id, review.rating, -1)
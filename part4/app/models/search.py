@@ -0,0 +1,82 @@
+"""SQLite FTS5 indexes over place titles/descriptions and review text.
+
+Each *_fts table is an external-content FTS5 table keyed on the rowid of
+its source table. Triggers keep it in sync, so ORM writes, Core bulk
+inserts and raw SQL all reach the index. Rowids of tables without an
+INTEGER PRIMARY KEY may change on VACUUM: run `flask hbnb rebuild-search`
+afterwards.
+"""
+import re
+from sqlalchemy import DDL, column, event, func, literal_column, table, text
+from app import db
+from .place import Place
+from .review import Review
+
+# fts table -> (source table, indexed columns)
+FTS_INDEXES = {
+    'places_fts': (Place.__table__, ('title', 'description')),
+    'reviews_fts': (Review.__table__, ('text',)),
+}
+SNIPPET_TOKENS = 16
+
+# Lightweight handles for joins, the tables are not part of the metadata
+places_fts = table('places_fts', column('rowid'))
+reviews_fts = table('reviews_fts', column('rowid'))
+
+
+def fts_ddl(name, source, columns):
+    """Statements creating an FTS table and its sync triggers"""
+    indexed = ', '.join(columns)
+    new_values = ', '.join(f'new.{column}' for column in columns)
+    old_values = ', '.join(f'old.{column}' for column in columns)
+    insert = f"INSERT INTO {name}(rowid, {indexed}) VALUES (new.rowid, {new_values});"
+    delete = f"INSERT INTO {name}({name}, rowid, {indexed}) VALUES ('delete', old.rowid, {old_values});"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {name} USING fts5("
+        f"{indexed}, content='{source}', content_rowid='rowid', tokenize='porter unicode61')",
+        f"CREATE TRIGGER IF NOT EXISTS {name}_ai AFTER INSERT ON {source} BEGIN {insert} END",
+        f"CREATE TRIGGER IF NOT EXISTS {name}_ad AFTER DELETE ON {source} BEGIN {delete} END",
+        f"CREATE TRIGGER IF NOT EXISTS {name}_au AFTER UPDATE OF {indexed} ON {source} "
+        f"BEGIN {delete} {insert} END",
+    ]
+
+
+for _name, (_table, _columns) in FTS_INDEXES.items():
+    for _statement in fts_ddl(_name, _table.name, _columns):
+        event.listen(_table, 'after_create', DDL(_statement).execute_if(dialect='sqlite'))
+    event.listen(_table, 'before_drop', DDL(f"DROP TABLE IF EXISTS {_name}").execute_if(dialect='sqlite'))
+
+
+def rebuild():
+    """Create missing FTS tables and triggers, then reindex every row"""
+    for name, (table, columns) in FTS_INDEXES.items():
+        for statement in fts_ddl(name, table.name, columns):
+            db.session.execute(text(statement))
+        db.session.execute(text(f"INSERT INTO {name}({name}) VALUES ('rebuild')"))
+    db.session.commit()
+
+
+def match_expression(query):
+    """Turn free text into an FTS5 query matching every word.
+
+    Each word is quoted so that operators and punctuation typed by users
+    never reach the FTS5 query parser.
+    """
+    terms = re.findall(r'\w+', query or '')
+    if not terms:
+        raise ValueError('Search query must contain at least one word')
+    return ' '.join(f'"{term}"' for term in terms)
+
+
+def matches(name, expression):
+    return literal_column(name).match(expression)
+
+
+def rank(name, *weights):
+    """BM25 score of the current match, lower is better"""
+    return func.bm25(literal_column(name), *weights)
+
+
+def snippet(name):
+    """Best matching fragment with the matched terms wrapped in <mark>"""
+    return func.snippet(literal_column(name), -1, '<mark>', '</mark>', '…', SNIPPET_TOKENS)
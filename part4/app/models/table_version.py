@@ -0,0 +1,41 @@
+"""Per-table version counters backing conditional GETs.
+
+SQLite triggers bump the row of a table on every insert, update and
+delete, whatever issued the write (ORM, Core bulk statements, rating
+aggregates, another process), so a single indexed lookup tells whether
+any data behind a response changed.
+"""
+from sqlalchemy import DDL, event
+from app import db
+
+VERSIONED_TABLES = ('users', 'amenities', 'places', 'reviews', 'amenities_places')
+
+
+class TableVersion(db.Model):
+    __tablename__ = 'table_versions'
+
+    name = db.Column(db.String(64), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    # Unix time of the last write, second precision like HTTP dates
+    modified_at = db.Column(db.Integer, nullable=False, default=0)
+
+
+def version_ddl(table):
+    """Statements creating the version row and triggers of a table.
+
+    Percent signs are doubled because DDL() applies %-formatting.
+    """
+    bump = (f"UPDATE table_versions SET version = version + 1, "
+            f"modified_at = CAST(strftime('%%s', 'now') AS INTEGER) WHERE name = '{table}';")
+    statements = [f"INSERT OR IGNORE INTO table_versions (name, version, modified_at) "
+                  f"VALUES ('{table}', 0, CAST(strftime('%%s', 'now') AS INTEGER))"]
+    for suffix, operation in (('ai', 'INSERT'), ('au', 'UPDATE'), ('ad', 'DELETE')):
+        statements.append(f"CREATE TRIGGER IF NOT EXISTS {table}_version_{suffix} "
+                          f"AFTER {operation} ON {table} BEGIN {bump} END")
+    return statements
+
+
+# Triggers need every table, so they are installed once create_all is done
+for _table in VERSIONED_TABLES:
+    for _statement in version_ddl(_table):
+        event.listen(db.metadata, 'after_create', DDL(_statement).execute_if(dialect='sqlite'))
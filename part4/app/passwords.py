@@ -0,0 +1,118 @@
+"""Password hashing on a bounded worker pool"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class PasswordHasherBusy(RuntimeError):
+    """Every hashing slot stayed taken for longer than the timeout"""
+
+
+def bcrypt_cost(pw_hash):
+    """Return the cost factor stored in a bcrypt hash ($2b$<cost>$...)"""
+    try:
+        return int(pw_hash.split('$')[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+class PasswordHasher:
+    """Run bcrypt on a small thread pool instead of the request thread.
+
+    bcrypt releases the GIL, so a thread pool is enough to spread the work
+    over several cores. At most workers hashes run at once and at most
+    queue_size more wait for a worker; beyond that callers wait up to
+    timeout seconds for a slot, then get PasswordHasherBusy.
+    """
+
+    def __init__(self, bcrypt):
+        self.bcrypt = bcrypt
+        self._lock = threading.Lock()
+        self._executor = None
+        self.configure()
+
+    def init_app(self, app):
+        self.configure(
+            rounds=app.config.get('BCRYPT_LOG_ROUNDS', 12),
+            workers=app.config.get('PASSWORD_HASH_WORKERS') or os.cpu_count() or 1,
+            queue_size=app.config.get('PASSWORD_HASH_QUEUE_SIZE', 32),
+            timeout=app.config.get('PASSWORD_HASH_TIMEOUT', 10.0)
+        )
+
+    def configure(self, rounds=12, workers=1, queue_size=32, timeout=10.0):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+        self.rounds = rounds
+        self.workers = workers
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hasher')
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+        self.queued = 0
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.hash_seconds = 0.0
+        self.max_hash_seconds = 0.0
+        self.wait_seconds = 0.0
+
+    def _run(self, func, *args):
+        if not self._slots.acquire(timeout=self.timeout):
+            with self._lock:
+                self.rejected += 1
+            raise PasswordHasherBusy('Too many password operations in progress, try again later')
+        submitted = time.perf_counter()
+        with self._lock:
+            self.queued += 1
+
+        def task():
+            started = time.perf_counter()
+            with self._lock:
+                self.queued -= 1
+                self.in_flight += 1
+            try:
+                return func(*args)
+            finally:
+                elapsed = time.perf_counter() - started
+                with self._lock:
+                    self.in_flight -= 1
+                    self.completed += 1
+                    self.hash_seconds += elapsed
+                    self.max_hash_seconds = max(self.max_hash_seconds, elapsed)
+                    self.wait_seconds += started - submitted
+
+        try:
+            return self._executor.submit(task).result()
+        finally:
+            self._slots.release()
+
+    def hash(self, password):
+        return self._run(self._hash, password)
+
+    def _hash(self, password):
+        return self.bcrypt.generate_password_hash(password, self.rounds).decode('utf-8')
+
+    def verify(self, pw_hash, password):
+        return self._run(self.bcrypt.check_password_hash, pw_hash, password)
+
+    def needs_rehash(self, pw_hash):
+        """True when a hash was made with a lower cost than the configured one.
+
+        Stronger hashes are kept, so lowering the cost never weakens them.
+        """
+        cost = bcrypt_cost(pw_hash)
+        return cost is None or cost < self.rounds
+
+    def stats(self):
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'rounds': self.rounds,
+                'queue_depth': self.queued,
+                'in_flight': self.in_flight,
+                'completed': self.completed,
+                'rejected': self.rejected,
+                'avg_hash_seconds': self.hash_seconds / self.completed if self.completed else 0.0,
+                'max_hash_seconds': self.max_hash_seconds,
+                'avg_wait_seconds': self.wait_seconds / self.completed if self.completed else 0.0
+            }
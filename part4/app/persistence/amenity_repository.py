@@ -1,7 +1,22 @@
 from app.models.amenity import Amenity
+from app.models.amenities_places import AmenityPlace
 from app import db
-from app.persistence.repository import SQLAlchemyRepository
+from app.persistence.repository import SQLAlchemyRepository, chunked
+from sqlalchemy import select
 
 class AmenityRepository(SQLAlchemyRepository):
     def __init__(self):
         super().__init__(Amenity)
+
+    def get_existing_names(self, names):
+        found = set()
+        for chunk in chunked(set(names)):
+            found.update(db.session.scalars(select(Amenity.name).where(Amenity.name.in_(chunk))))
+        return found
+
+    def get_by_place(self, place_id):
+        """Amenities linked to a place, by name"""
+        return (Amenity.query.join(AmenityPlace, AmenityPlace.amenity_id == Amenity.id)
+                .filter(AmenityPlace.place_id == place_id)
+                .order_by(Amenity.name)
+                .all())
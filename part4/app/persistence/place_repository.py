@@ -1,7 +1,191 @@
 from app.models.place import Place
+from app.models.amenities_places import AmenityPlace
+from app.models.review import Review
+from app.models import geo, search
 from app import db
-from app.persistence.repository import SQLAlchemyRepository
+from app.persistence.repository import MAX_SQL_PARAMS, SQLAlchemyRepository, chunked
+from sqlalchemy import Float, and_, bindparam, case, cast, delete, func, literal_column, or_, select, update
+from sqlalchemy.orm import joinedload, selectinload
+
+# sort name -> (keyset columns, descending)
+PLACE_SORTS = {
+    'created_at': ((Place.created_at, Place.id), False),
+    'price': ((Place.price, Place.created_at, Place.id), False),
+    '-price': ((Place.price, Place.created_at, Place.id), True),
+    'rating': ((Place.average_rating, Place.created_at, Place.id), False),
+    '-rating': ((Place.average_rating, Place.created_at, Place.id), True),
+}
+
+# Loaded whatever ?fields= asks for: primary key, keyset columns of every sort, owner join
+PLACE_KEY_COLUMNS = ('id', 'created_at', 'price', 'average_rating', 'user_id')
 
 class PlaceRepository(SQLAlchemyRepository):
     def __init__(self):
         super().__init__(Place)
+
+    def _with_relations(self, fieldset=None):
+        """Query loading owner, amenities and reviews in three statements.
+
+        With a (fields, expand) fieldset only the columns of fields and the
+        relationships named in expand are loaded.
+        """
+        loaders = {
+            'owner': joinedload(Place.owner),
+            'amenities': selectinload(Place.amenity_list),
+            'reviews': selectinload(Place.review_list)
+        }
+        if fieldset is None:
+            return self.model.query.options(*loaders.values())
+        fields, expand = fieldset
+        return self.model.query.options(self.load_fields(fields, PLACE_KEY_COLUMNS),
+                                        *[loaders[name] for name in expand])
+
+    def _filtered(self, min_price=None, max_price=None, owner_id=None, amenity_ids=None, fieldset=None):
+        """Apply the listing filters as SQL predicates"""
+        query = self._with_relations(fieldset)
+        if min_price is not None:
+            query = query.filter(Place.price >= min_price)
+        if max_price is not None:
+            query = query.filter(Place.price <= max_price)
+        if owner_id is not None:
+            query = query.filter(Place.user_id == owner_id)
+        if amenity_ids:
+            # Places linked to every requested amenity
+            amenity_ids = set(amenity_ids)
+            matching = (select(AmenityPlace.place_id)
+                        .where(AmenityPlace.amenity_id.in_(amenity_ids))
+                        .group_by(AmenityPlace.place_id)
+                        .having(func.count() == len(amenity_ids)))
+            query = query.filter(Place.id.in_(matching))
+        return query
+
+    def get_ids_by_owner(self, user_id):
+        return [row.id for row in db.session.query(Place.id).filter(Place.user_id == user_id)]
+
+    def get_ids_by_amenity(self, amenity_id):
+        return [row.place_id for row in
+                db.session.query(AmenityPlace.place_id).filter(AmenityPlace.amenity_id == amenity_id)]
+
+    def get_with_relations(self, place_id, fieldset=None):
+        return self._with_relations(fieldset).filter(Place.id == place_id).first()
+
+    def get_many_with_relations(self, place_ids, fieldset=None):
+        return self.get_many(place_ids, self._with_relations(fieldset))
+
+    def get_all_with_relations(self, sort='created_at', **filters):
+        columns, descending = PLACE_SORTS[sort]
+        if descending:
+            columns = [column.desc() for column in columns]
+        return self._filtered(**filters).order_by(*columns).all()
+
+    def get_page_with_relations(self, limit, cursor=None, sort='created_at', **filters):
+        columns, descending = PLACE_SORTS[sort]
+        return self.get_page(limit, cursor, self._filtered(**filters), columns, descending)
+
+    def get_in_bboxes(self, boxes):
+        """(id, latitude, longitude) rows of the places inside any of the
+        (min_lat, min_lng, max_lat, max_lng) boxes, found through the geohash index.
+
+        Only the location is loaded, relations are left to get_many_with_relations.
+        """
+        in_boxes = []
+        for min_lat, min_lng, max_lat, max_lng in boxes:
+            cells = geo.cover(min_lat, min_lng, max_lat, max_lng)
+            # Every geohash starting with cell sorts in [cell, cell + '{')
+            in_cells = or_(*[and_(Place.geohash >= cell, Place.geohash < cell + '{') for cell in cells])
+            in_boxes.append(and_(in_cells,
+                                 Place.latitude.between(min_lat, max_lat),
+                                 Place.longitude.between(min_lng, max_lng)))
+        return db.session.query(Place.id, Place.latitude, Place.longitude).filter(or_(*in_boxes)).all()
+
+    def search(self, match, limit, **filters):
+        """(place, rank, snippet) rows matching an FTS5 expression, best first.
+
+        Titles weigh ten times more than descriptions in the ranking.
+        """
+        rank = search.rank('places_fts', 10.0, 1.0)
+        return (self._filtered(**filters)
+                .add_columns(rank, search.snippet('places_fts'))
+                .join(search.places_fts, search.places_fts.c.rowid == literal_column('places.rowid'))
+                .filter(search.matches('places_fts', match))
+                .order_by(rank)
+                .limit(limit)
+                .all())
+
+    def recompute_ratings(self, fix=True):
+        """Compare rating aggregates with the reviews table.
+
+        Returns the ids of the places whose stored aggregates drifted and,
+        if fix is set, rewrites them from the reviews.
+        """
+        histogram = [func.sum(case((Review.rating == i, 1), else_=0)) for i in range(1, 6)]
+        actual = {
+            row[0]: row[1:]
+            for row in db.session.query(Review.place_id, func.count(), func.sum(Review.rating), *histogram)
+            .group_by(Review.place_id)
+        }
+        stored = db.session.query(Place.id, Place.review_count, Place.rating_sum, Place.average_rating,
+                                  Place.rating_1, Place.rating_2, Place.rating_3, Place.rating_4, Place.rating_5)
+        fixes = []
+        for place_id, count, total, average, *counts in stored:
+            real_count, real_total, *real_counts = actual.get(place_id, (0, 0, 0, 0, 0, 0, 0))
+            real_average = real_total / real_count if real_count else 0.0
+            if (count, total, counts) == (real_count, real_total, real_counts) and abs(average - real_average) < 1e-9:
+                continue
+            fix_values = {'id': place_id, 'review_count': real_count, 'rating_sum': real_total,
+                          'average_rating': real_average}
+            fix_values.update({f'rating_{i}': real_counts[i - 1] for i in range(1, 6)})
+            fixes.append(fix_values)
+        if fix and fixes:
+            db.session.execute(update(Place), fixes)
+        return [values['id'] for values in fixes]
+
+    def get_owner_ids(self, place_ids):
+        """Map each existing place id to its owner id"""
+        owners = {}
+        for chunk in chunked(set(place_ids)):
+            owners.update(db.session.execute(select(Place.id, Place.user_id).where(Place.id.in_(chunk))).all())
+        return owners
+
+    def bulk_insert_amenity_links(self, rows):
+        """Insert (place_id, amenity_id) rows into amenities_places"""
+        if rows:
+            db.session.execute(AmenityPlace.__table__.insert(), rows)
+
+    def link_amenities(self, place_id, amenity_ids):
+        """Link amenities to a place with multi-row INSERT OR IGNORE.
+
+        Links that already exist are left alone. Each statement carries up to
+        MAX_SQL_PARAMS parameters, two per row.
+        """
+        rows = [{'place_id': place_id, 'amenity_id': amenity_id} for amenity_id in dict.fromkeys(amenity_ids)]
+        for chunk in chunked(rows, MAX_SQL_PARAMS // 2):
+            db.session.execute(AmenityPlace.__table__.insert().prefix_with('OR IGNORE').values(chunk))
+
+    def unlink_amenities(self, place_id, amenity_ids):
+        """Remove links between a place and amenities"""
+        for chunk in chunked(set(amenity_ids)):
+            db.session.execute(delete(AmenityPlace).where(AmenityPlace.place_id == place_id,
+                                                          AmenityPlace.amenity_id.in_(chunk)))
+
+    def bulk_add_ratings(self, deltas):
+        """Add ratings to places in one executemany.
+
+        deltas maps place id -> {'count': n, 'sum': total, 1: n1, ..., 5: n5}
+        """
+        if not deltas:
+            return
+        places = Place.__table__
+        values = {
+            places.c.review_count: places.c.review_count + bindparam('d_count'),
+            places.c.rating_sum: places.c.rating_sum + bindparam('d_sum'),
+            places.c.average_rating: func.coalesce(
+                cast(places.c.rating_sum + bindparam('d_sum'), Float)
+                / func.nullif(places.c.review_count + bindparam('d_count'), 0), 0.0)
+        }
+        for i in range(1, 6):
+            values[places.c[f'rating_{i}']] = places.c[f'rating_{i}'] + bindparam(f'd_{i}')
+        rows = [dict({'p_id': place_id, 'd_count': delta['count'], 'd_sum': delta['sum']},
+                     **{f'd_{i}': delta[i] for i in range(1, 6)})
+                for place_id, delta in deltas.items()]
+        db.session.execute(update(places).where(places.c.id == bindparam('p_id')).values(values), rows)
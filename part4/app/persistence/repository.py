@@ -1,6 +1,44 @@
+import json
 from abc import ABC, abstractmethod
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+from operator import attrgetter
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.orm import load_only
 from app import db
 
+# Stay under SQLite's limit on bound parameters per statement
+MAX_SQL_PARAMS = 900
+
+
+def chunked(values, size=MAX_SQL_PARAMS):
+    """Split a list into lists of at most size items"""
+    values = list(values)
+    return [values[i:i + size] for i in range(0, len(values), size)]
+
+
+def encode_cursor(obj, columns):
+    """Build an opaque cursor holding the values of obj for the sort columns"""
+    values = [getattr(obj, column.key) for column in columns]
+    values = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    return urlsafe_b64encode(json.dumps(values).encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor, columns):
+    """Return the sort column values stored in a cursor"""
+    try:
+        values = json.loads(urlsafe_b64decode(cursor.encode('ascii')))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError
+        # Only scalars may reach the keyset comparison
+        if any(isinstance(v, bool) or not isinstance(v, (str, int, float)) for v in values):
+            raise ValueError
+        return [datetime.fromisoformat(v) if isinstance(column.type, db.DateTime) else v
+                for column, v in zip(columns, values)]
+    except (ValueError, TypeError, UnicodeError):
+        raise ValueError('Invalid cursor')
+
+
 class Repository(ABC):
     @abstractmethod
     def add(self, obj):
@@ -10,6 +48,10 @@ class Repository(ABC):
     def get(self, obj_id):
         pass
 
+    @abstractmethod
+    def get_many(self, ids):
+        pass
+
     @abstractmethod
     def get_all(self):
         pass
@@ -26,60 +68,225 @@ class Repository(ABC):
     def get_by_attribute(self, attr_name, attr_value):
         pass
 
+    @abstractmethod
+    def find_all_by_attribute(self, attr_name, attr_value):
+        pass
+
 
 class InMemoryRepository(Repository):
-    def __init__(self):
+    """Objects stored by id, with optional secondary hash indexes.
+
+    unique and indexed name the attributes to index, dotted paths such as
+    'place.id' included. A unique index maps a value to one object and
+    rejects duplicates, a multi-valued index maps it to every object
+    carrying it. Indexes are kept up to date by add, update and delete,
+    so indexed attributes must only change through update().
+    """
+
+    def __init__(self, unique=(), indexed=()):
         self._storage = {}
+        self._unique = {attr_name: {} for attr_name in unique}
+        self._indexes = {attr_name: {} for attr_name in indexed}
+
+    @staticmethod
+    def _value(obj, attr_name):
+        return attrgetter(attr_name)(obj)
+
+    def _check_unique(self, obj, values):
+        for attr_name, value in values.items():
+            if self._unique[attr_name].get(value, obj) is not obj:
+                raise ValueError(f"{attr_name} '{value}' already exists")
+
+    def _index(self, obj):
+        self._check_unique(obj, {attr_name: self._value(obj, attr_name) for attr_name in self._unique})
+        for attr_name, index in self._unique.items():
+            index[self._value(obj, attr_name)] = obj
+        for attr_name, index in self._indexes.items():
+            index.setdefault(self._value(obj, attr_name), {})[obj.id] = obj
+
+    def _unindex(self, obj):
+        for attr_name, index in self._unique.items():
+            index.pop(self._value(obj, attr_name), None)
+        for attr_name, index in self._indexes.items():
+            value = self._value(obj, attr_name)
+            bucket = index.get(value)
+            if bucket is not None:
+                bucket.pop(obj.id, None)
+                if not bucket:
+                    del index[value]
 
     def add(self, obj):
+        previous = self._storage.get(obj.id)
+        if previous is not None:
+            self._unindex(previous)
+        try:
+            self._index(obj)
+        except ValueError:
+            if previous is not None:
+                self._index(previous)
+            raise
         self._storage[obj.id] = obj
 
     def get(self, obj_id):
         return self._storage.get(obj_id)
 
+    def get_many(self, ids):
+        """Objects for ids in the order given, unknown and repeated ids skipped"""
+        found = map(self._storage.get, dict.fromkeys(ids))
+        return [obj for obj in found if obj is not None]
+
     def get_all(self):
         return list(self._storage.values())
 
     def update(self, obj_id, data):
         obj = self.get(obj_id)
         if obj:
-            obj = obj.update(data)
+            self._check_unique(obj, {attr_name: data[attr_name] for attr_name in self._unique if attr_name in data})
+            self._unindex(obj)
+            try:
+                obj = obj.update(data)
+            finally:
+                # Re-index whatever state the object ended in
+                self._index(self._storage[obj_id])
         return obj
 
     def delete(self, obj_id):
         if obj_id in self._storage:
-            del self._storage[obj_id]
+            self._unindex(self._storage.pop(obj_id))
 
     def get_by_attribute(self, attr_name, attr_value):
-        return next((obj for obj in self._storage.values() if getattr(obj, attr_name) == attr_value), None)
-    
+        if attr_name == 'id':
+            return self._storage.get(attr_value)
+        if attr_name in self._unique:
+            return self._unique[attr_name].get(attr_value)
+        if attr_name in self._indexes:
+            return next(iter(self._indexes[attr_name].get(attr_value, {}).values()), None)
+        return next((obj for obj in self._storage.values() if self._value(obj, attr_name) == attr_value), None)
+
+    def find_all_by_attribute(self, attr_name, attr_value):
+        """Every object whose attribute equals attr_value, O(1) on average when indexed"""
+        if attr_name == 'id':
+            obj = self._storage.get(attr_value)
+            return [obj] if obj is not None else []
+        if attr_name in self._unique:
+            obj = self._unique[attr_name].get(attr_value)
+            return [obj] if obj is not None else []
+        if attr_name in self._indexes:
+            return list(self._indexes[attr_name].get(attr_value, {}).values())
+        return [obj for obj in self._storage.values() if self._value(obj, attr_name) == attr_value]
+
 class SQLAlchemyRepository(Repository):
     def __init__(self, model):
         self.model = model
 
+    # Writes are flushed, not committed: the caller's unit_of_work() commits
     def add(self, obj):
         db.session.add(obj)
-        db.session.commit()
+        db.session.flush()
 
     def get(self, obj_id):
         return self.model.query.get(obj_id)
 
+    def get_many(self, ids, query=None):
+        """Objects for ids in the order given, unknown and repeated ids skipped.
+
+        One IN query per MAX_SQL_PARAMS ids. query replaces model.query, to
+        add loader options.
+        """
+        ids = list(dict.fromkeys(ids))
+        if query is None:
+            query = self.model.query
+        found = {}
+        for chunk in chunked(ids):
+            found.update((obj.id, obj) for obj in query.filter(self.model.id.in_(chunk)))
+        return [found[obj_id] for obj_id in ids if obj_id in found]
+
     def get_all(self):
         return self.model.query.all()
 
+    def load_fields(self, fields, key_columns=('id', 'created_at')):
+        """load_only() option for the columns behind model.FIELDS names.
+
+        key_columns are always loaded: the primary key and whatever the
+        query orders or joins on. Every other column stays deferred.
+        """
+        names = set(key_columns)
+        for field in fields:
+            names.update(self.model.FIELDS[field])
+        return load_only(*[getattr(self.model, name) for name in sorted(names)])
+
+    def get_page(self, limit, cursor=None, query=None, order_by=None, descending=False):
+        """Return up to limit objects after cursor and the cursor of the next page.
+
+        Pages are keyed on the order_by columns (created_at, id by default)
+        rather than an OFFSET, so every page costs the same index range scan
+        whatever its depth. order_by must end with a unique column.
+        """
+        if query is None:
+            query = self.model.query
+        if order_by is None:
+            order_by = (self.model.created_at, self.model.id)
+        if descending:
+            query = query.order_by(*[column.desc() for column in order_by])
+        else:
+            query = query.order_by(*order_by)
+        if cursor:
+            key = tuple_(*order_by)
+            values = tuple_(*decode_cursor(cursor, order_by))
+            query = query.filter(key < values if descending else key > values)
+        objs = query.limit(limit + 1).all()
+        if len(objs) > limit:
+            objs = objs[:limit]
+            return objs, encode_cursor(objs[-1], order_by)
+        return objs, None
+
     def update(self, obj_id, data):
         obj = self.get(obj_id)
         if obj:
             for key, value in data.items():
                 setattr(obj, key, value)
-            db.session.commit()
+            db.session.flush()
         return obj
 
     def delete(self, obj_id):
         obj = self.get(obj_id)
         if obj:
             db.session.delete(obj)
-            db.session.commit()
+            db.session.flush()
 
     def get_by_attribute(self, attr_name, attr_value):
         return self.model.query.filter_by(**{attr_name: attr_value}).first()
+
+    def find_all_by_attribute(self, attr_name, attr_value):
+        return self.model.query.filter_by(**{attr_name: attr_value}).all()
+
+    def get_existing_ids(self, ids):
+        """Return which of ids are present in the table"""
+        found = set()
+        for chunk in chunked(set(ids)):
+            found.update(db.session.scalars(select(self.model.id).where(self.model.id.in_(chunk))))
+        return found
+
+    def stream(self, columns, since=None, batch_size=1000):
+        """Yield rows of the given columns, fetched batch_size at a time.
+
+        Rows come from a server-side cursor, so memory use does not grow with
+        the table. since keeps only rows updated at or after that time.
+        """
+        query = select(*columns).order_by(self.model.created_at, self.model.id)
+        if since is not None:
+            query = query.where(self.model.updated_at >= since)
+        result = db.session.execute(query.execution_options(yield_per=batch_size))
+        for row in result.mappings():
+            yield row
+
+    def get_last_updated(self):
+        return db.session.scalar(select(func.max(self.model.updated_at)))
+
+    def bulk_insert(self, rows):
+        """Insert plain dict rows with one executemany, without committing.
+
+        Column defaults apply, ORM validators and mapper events do not.
+        """
+        if rows:
+            db.session.execute(self.model.__table__.insert(), rows)
@@ -1,7 +1,51 @@
 from app.models.review import Review
+from app.models import search
 from app import db
-from app.persistence.repository import SQLAlchemyRepository
+from app.persistence.repository import SQLAlchemyRepository, chunked
+from sqlalchemy import exists, literal_column, select
+from sqlalchemy.orm import joinedload
 
 class ReviewRepository(SQLAlchemyRepository):
     def __init__(self):
         super().__init__(Review)
+
+    def _with_fields(self, fieldset):
+        """Query loading the columns and relationships of a (fields, expand) fieldset"""
+        fields, expand = fieldset
+        loaders = {'user': joinedload(Review.user), 'place': joinedload(Review.place)}
+        return self.model.query.options(self.load_fields(fields, ('id', 'created_at', 'place_id', 'user_id')),
+                                        *[loaders[name] for name in expand])
+
+    def get_with_fields(self, review_id, fieldset):
+        return self._with_fields(fieldset).filter(Review.id == review_id).first()
+
+    def get_all_with_fields(self, fieldset):
+        return self._with_fields(fieldset).all()
+
+    def get_page_with_fields(self, limit, cursor, fieldset):
+        return self.get_page(limit, cursor, self._with_fields(fieldset))
+
+    def user_has_reviewed(self, user_id, place_id):
+        """Single lookup on the (user_id, place_id) unique index"""
+        return db.session.query(
+            exists().where(Review.user_id == user_id, Review.place_id == place_id)
+        ).scalar()
+
+    def get_existing_pairs(self, pairs):
+        """Return which (user_id, place_id) pairs already have a review"""
+        pairs = set(pairs)
+        found = set()
+        for chunk in chunked({place_id for _, place_id in pairs}):
+            rows = db.session.execute(select(Review.user_id, Review.place_id).where(Review.place_id.in_(chunk)))
+            found.update(pair for pair in map(tuple, rows) if pair in pairs)
+        return found
+
+    def search(self, match, limit, place_id=None):
+        """(review, rank, snippet) rows matching an FTS5 expression, best first"""
+        rank = search.rank('reviews_fts')
+        query = (db.session.query(Review, rank, search.snippet('reviews_fts'))
+                 .join(search.reviews_fts, search.reviews_fts.c.rowid == literal_column('reviews.rowid'))
+                 .filter(search.matches('reviews_fts', match)))
+        if place_id is not None:
+            query = query.filter(Review.place_id == place_id)
+        return query.order_by(rank).limit(limit).all()
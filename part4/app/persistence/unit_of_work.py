@@ -0,0 +1,50 @@
+"""One transaction per facade operation.
+
+Repositories only add, change and delete objects in the session; the
+unit_of_work() around a facade operation commits them together, so an
+operation costs one commit (one fsync on SQLite) and a failed validation
+leaves nothing half written.
+"""
+from contextlib import contextmanager
+from app import db
+
+
+@contextmanager
+def unit_of_work():
+    """Commit the changes made in the block once, or roll them all back.
+
+    Usable as a decorator. A unit of work opened inside another one joins
+    it: only the outermost commits, and an exception escaping the outermost
+    rolls back the changes of every level. Callbacks registered with
+    after_commit() run once the commit succeeded and are dropped on rollback.
+    """
+    info = db.session.info
+    depth = info.get('unit_of_work_depth', 0)
+    info['unit_of_work_depth'] = depth + 1
+    if depth == 0:
+        info['after_commit'] = []
+    try:
+        yield
+        if depth == 0:
+            db.session.commit()
+    except BaseException:
+        if depth == 0:
+            db.session.rollback()
+        raise
+    finally:
+        info['unit_of_work_depth'] = depth
+        callbacks = info.pop('after_commit', []) if depth == 0 else ()
+    for callback in callbacks:
+        callback()
+
+
+def after_commit(callback):
+    """Run callback once the current unit of work commits, now if there is none.
+
+    Cache invalidations go through here, so that no other request can cache
+    the old rows between the invalidation and the commit.
+    """
+    if db.session.info.get('unit_of_work_depth'):
+        db.session.info['after_commit'].append(callback)
+    else:
+        callback()
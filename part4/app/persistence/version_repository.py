@@ -0,0 +1,13 @@
+from app.models.table_version import TableVersion
+from app import db
+from app.persistence.repository import SQLAlchemyRepository
+
+class VersionRepository(SQLAlchemyRepository):
+    def __init__(self):
+        super().__init__(TableVersion)
+
+    def get_versions(self, names):
+        """(name, version, modified_at) rows of the given tables"""
+        return db.session.query(TableVersion.name, TableVersion.version, TableVersion.modified_at).filter(
+            TableVersion.name.in_(names)
+        ).all()
@@ -0,0 +1,101 @@
+"""Per-request query budgets and N+1 detection for debug and test runs"""
+import re
+from collections import Counter, deque
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+
+# Marks a view whose budget was never declared
+UNDECLARED = object()
+
+
+class QueryBudgetExceeded(AssertionError):
+    """A request issued more statements than its view allows, or repeated one"""
+
+
+def query_budget(limit):
+    """Declare the most SQL statements a view may issue in one request.
+
+    None declares the view unbounded, for work that scales with its input.
+    """
+    def decorator(view):
+        view.query_budget = limit
+        return view
+    return decorator
+
+
+def statement_shape(statement):
+    """Statement text with whitespace and IN lists normalized, so batches of any size compare equal"""
+    statement = ' '.join(statement.split())
+    return re.sub(r'\(\?(?:, \?)*\)', '(?)', statement)
+
+
+def view_budget(endpoint, method):
+    """Budget declared on the view serving endpoint, UNDECLARED if none"""
+    view = current_app.view_functions.get(endpoint)
+    view_class = getattr(view, 'view_class', None)
+    if view_class is not None:
+        view = getattr(view_class, method.lower(), None)
+    return getattr(view, 'query_budget', UNDECLARED)
+
+
+class QueryGuard:
+    """Check every request against the query budget of its view.
+
+    The statements of each request are recorded through cursor events. A
+    request breaks the rules when it issues more statements than the
+    @query_budget of its view, or the same statement shape at least
+    QUERY_GUARD_REPEAT times, the usual sign of a lazy load in a loop.
+    QUERY_GUARD decides what happens then: 'warn' logs, 'raise' raises
+    QueryBudgetExceeded, 'off' disables the guard. By default it warns in
+    debug and test runs and is off otherwise. Violations are also kept in
+    violations for the test suite.
+    """
+
+    def __init__(self):
+        self.violations = deque(maxlen=100)
+
+    def init_app(self, app):
+        mode = app.config.get('QUERY_GUARD')
+        if mode is None:
+            mode = 'warn' if app.debug or app.testing else 'off'
+        if mode == 'off':
+            return
+        repeat = app.config.get('QUERY_GUARD_REPEAT', 5)
+
+        with app.app_context():
+            from app import db
+            engine = db.engine
+
+        @event.listens_for(engine, 'before_cursor_execute')
+        def log_statement(conn, cursor, statement, parameters, context, executemany):
+            if has_request_context() and 'query_log' in g:
+                g.query_log.append(statement)
+
+        @app.before_request
+        def start_query_log():
+            g.query_log = []
+
+        @app.after_request
+        def check_query_log(response):
+            statements = g.pop('query_log', None)
+            if statements is None or request.endpoint is None:
+                return response
+            problems = self.check(view_budget(request.endpoint, request.method), statements, repeat)
+            if problems:
+                message = f"{request.method} {request.url_rule.rule}: {'; '.join(problems)}"
+                self.violations.append(message)
+                if mode == 'raise':
+                    raise QueryBudgetExceeded(message)
+                app.logger.warning(message)
+            return response
+
+    @staticmethod
+    def check(budget, statements, repeat):
+        """Return the problems found in the statements of one request"""
+        problems = []
+        if budget not in (UNDECLARED, None) and len(statements) > budget:
+            problems.append(f"{len(statements)} queries, budget {budget}")
+        for shape, count in Counter(map(statement_shape, statements)).items():
+            if count >= repeat and budget is not None:
+                problems.append(f"possible N+1, {count}x {shape[:200]}")
+        return problems
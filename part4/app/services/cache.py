@@ -0,0 +1,262 @@
+"""Read-through cache used by the facade in front of the repositories"""
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from sqlalchemy import inspect
+from app import db
+from app.persistence.unit_of_work import after_commit
+
+
+def snapshot(value):
+    """Detached copy of value, with the relations its objects have loaded.
+
+    Objects of a session must not be cached as they are: the request that
+    loaded them may change them before its commit, while other requests
+    merge them into their own sessions.
+    """
+    return pickle.loads(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+
+
+class LRUCache:
+    """In-process cache bounded in size, with a per-entry time to live.
+
+    Values are stored as snapshot() copies taken when they are set.
+    """
+
+    def __init__(self, maxsize=1024, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                self.evictions += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def get_many(self, keys):
+        return [self.get(key) for key in keys]
+
+    def set(self, key, value):
+        value = snapshot(value)
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        return {
+            'backend': 'lru',
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions
+        }
+
+
+class RedisCache:
+    """Cache stored in a Redis compatible server, values are pickled"""
+
+    def __init__(self, url='redis://localhost:6379/0', ttl=300, prefix='hbnb:'):
+        import redis  # optional dependency, only needed for this backend
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        raw = self.client.get(self.prefix + key)
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return pickle.loads(raw)
+
+    def get_many(self, keys):
+        """Values of keys, None when missing, in one round trip"""
+        if not keys:
+            return []
+        values = []
+        for raw in self.client.mget([self.prefix + key for key in keys]):
+            if raw is None:
+                self.misses += 1
+                values.append(None)
+            else:
+                self.hits += 1
+                values.append(pickle.loads(raw))
+        return values
+
+    def set(self, key, value):
+        self.client.set(self.prefix + key, pickle.dumps(value), ex=self.ttl)
+
+    def delete(self, *keys):
+        if keys:
+            self.client.delete(*[self.prefix + key for key in keys])
+
+    def clear(self):
+        keys = list(self.client.scan_iter(match=self.prefix + '*'))
+        if keys:
+            self.client.delete(*keys)
+
+    def stats(self):
+        info = self.client.info('stats')
+        return {
+            'backend': 'redis',
+            'size': sum(1 for _ in self.client.scan_iter(match=self.prefix + '*')),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': info.get('evicted_keys', 0) + info.get('expired_keys', 0)
+        }
+
+
+class NullCache:
+    """Cache that stores nothing, every lookup goes to the repository"""
+
+    def __init__(self):
+        self.misses = 0
+
+    def get(self, key):
+        self.misses += 1
+        return None
+
+    def get_many(self, keys):
+        self.misses += len(keys)
+        return [None] * len(keys)
+
+    def set(self, key, value):
+        pass
+
+    def delete(self, *keys):
+        pass
+
+    def clear(self):
+        pass
+
+    def stats(self):
+        return {'backend': 'null', 'size': 0, 'hits': 0, 'misses': self.misses, 'evictions': 0}
+
+
+def make_cache(config):
+    """Build the cache backend selected by CACHE_TYPE"""
+    cache_type = config.get('CACHE_TYPE', 'lru')
+    if cache_type == 'lru':
+        return LRUCache(config.get('CACHE_MAXSIZE', 1024), config.get('CACHE_TTL', 300))
+    if cache_type == 'redis':
+        return RedisCache(config.get('CACHE_REDIS_URL', 'redis://localhost:6379/0'), config.get('CACHE_TTL', 300))
+    if cache_type == 'null':
+        return NullCache()
+    raise ValueError(f"Unknown cache type: {cache_type}")
+
+
+def is_fresh(obj):
+    """A cached object snapshotted with expired attributes must be reloaded"""
+    return obj is not None and not inspect(obj).expired_attributes
+
+
+def attach(obj):
+    """Return a copy of a cached object bound to the current session, without SQL"""
+    if obj in db.session:
+        return obj
+    return db.session.merge(obj, load=False)
+
+
+class CachedRepository:
+    """Repository wrapper caching get() and, optionally, get_all().
+
+    Writes made through the wrapper invalidate the entries of the written
+    object once its unit of work commits; any other call is forwarded to
+    the wrapped repository.
+    """
+
+    def __init__(self, repo, cache, prefix, cache_all=False):
+        self.repo = repo
+        self.cache = cache
+        self.prefix = prefix
+        self.cache_all = cache_all
+
+    def __getattr__(self, name):
+        return getattr(self.repo, name)
+
+    def key(self, obj_id):
+        return f"{self.prefix}:{obj_id}"
+
+    def invalidate(self, obj_id=None):
+        keys = [f"{self.prefix}:all"]
+        if obj_id is not None:
+            keys.append(self.key(obj_id))
+        after_commit(lambda: self.cache.delete(*keys))
+
+    def get(self, obj_id):
+        cached = self.cache.get(self.key(obj_id))
+        if is_fresh(cached):
+            return attach(cached)
+        obj = self.repo.get(obj_id)
+        if obj is not None:
+            self.cache.set(self.key(obj_id), obj)
+        return obj
+
+    def get_many(self, ids):
+        """Cached objects for ids, the others fetched with one repository get_many()"""
+        ids = list(dict.fromkeys(ids))
+        found = {}
+        for obj_id, cached in zip(ids, self.cache.get_many([self.key(obj_id) for obj_id in ids])):
+            if is_fresh(cached):
+                found[obj_id] = attach(cached)
+        for obj in self.repo.get_many([obj_id for obj_id in ids if obj_id not in found]):
+            self.cache.set(self.key(obj.id), obj)
+            found[obj.id] = obj
+        return [found[obj_id] for obj_id in ids if obj_id in found]
+
+    def get_all(self):
+        if not self.cache_all:
+            return self.repo.get_all()
+        cached = self.cache.get(f"{self.prefix}:all")
+        if cached is not None and all(is_fresh(obj) for obj in cached):
+            return [attach(obj) for obj in cached]
+        objs = self.repo.get_all()
+        self.cache.set(f"{self.prefix}:all", objs)
+        return objs
+
+    def add(self, obj):
+        self.repo.add(obj)
+        self.invalidate(obj.id)
+
+    def update(self, obj_id, data):
+        try:
+            return self.repo.update(obj_id, data)
+        finally:
+            self.invalidate(obj_id)
+
+    def delete(self, obj_id):
+        try:
+            self.repo.delete(obj_id)
+        finally:
+            self.invalidate(obj_id)
@@ -0,0 +1,54 @@
+"""Row-at-a-time NDJSON and CSV serialization for exports"""
+import csv
+import io
+import json
+from datetime import datetime
+from app.models.user import User
+from app.models.amenity import Amenity
+from app.models.place import Place
+from app.models.review import Review
+
+# entity -> (repository attribute on the facade, exported columns)
+EXPORTS = {
+    'users': ('user_repo', (User.id, User.first_name, User.last_name, User.email, User.is_admin,
+                            User.created_at, User.updated_at)),
+    'amenities': ('amenity_repo', (Amenity.id, Amenity.name, Amenity.created_at, Amenity.updated_at)),
+    'places': ('place_repo', (Place.id, Place.title, Place.description, Place.price, Place.latitude,
+                              Place.longitude, Place.user_id.label('owner_id'), Place.review_count,
+                              Place.average_rating, Place.created_at, Place.updated_at)),
+    'reviews': ('review_repo', (Review.id, Review.text, Review.rating, Review.place_id, Review.user_id,
+                                Review.created_at, Review.updated_at)),
+}
+FORMATS = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+
+
+def column_names(entity):
+    return [column.key for column in EXPORTS[entity][1]]
+
+
+def _plain(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def to_ndjson(rows):
+    for row in rows:
+        yield json.dumps({key: _plain(value) for key, value in row.items()}) + '\n'
+
+
+def to_csv(rows, fieldnames):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fieldnames)
+    writer.writeheader()
+    for row in rows:
+        writer.writerow({key: _plain(value) for key, value in row.items()})
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+def serialize(entity, rows, export_format):
+    """Yield the export of rows as text chunks in the requested format"""
+    if export_format == 'csv':
+        return to_csv(rows, column_names(entity))
+    return to_ndjson(rows)
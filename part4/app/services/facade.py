@@ -3,19 +3,67 @@ from app.models.amenity import Amenity
 from app.models.place import Place
 from app.models.review import Review
 from app.models.amenities_places import AmenityPlace
+from app.models import geo, search
+from sqlalchemy.exc import IntegrityError
 from app.persistence.user_repository import UserRepository
 from app.persistence.amenity_repository import AmenityRepository
 from app.persistence.place_repository import PlaceRepository
 from app.persistence.review_repository import ReviewRepository
+from app.persistence.version_repository import VersionRepository
+from app.persistence.unit_of_work import after_commit, unit_of_work
+from app.services.cache import CachedRepository, NullCache, attach, is_fresh, make_cache
 
 class HBnBFacade:
     def __init__(self):
-        self.user_repo = UserRepository()
-        self.amenity_repo = AmenityRepository()
-        self.place_repo = PlaceRepository()
+        self.init_cache(NullCache())
+
+    def init_app(self, app):
+        self.init_cache(make_cache(app.config))
+
+    def init_cache(self, cache):
+        self.cache = cache
+        self.user_repo = CachedRepository(UserRepository(), cache, 'user')
+        self.amenity_repo = CachedRepository(AmenityRepository(), cache, 'amenity', cache_all=True)
+        self.place_repo = CachedRepository(PlaceRepository(), cache, 'place')
         self.review_repo = ReviewRepository()
+        self.version_repo = VersionRepository()
+
+    def get_cache_stats(self):
+        return self.cache.stats()
+
+    def get_table_versions(self, tables):
+        return self.version_repo.get_versions(tables)
+
+    def _invalidate_place_details(self, place_ids):
+        """Drop cached places embedding a changed owner, amenity or review"""
+        keys = []
+        for place_id in place_ids:
+            keys += [f"place:{place_id}", f"place_full:{place_id}"]
+        after_commit(lambda: self.cache.delete(*keys))
+
+    # BULK
+    def bulk_import(self, lines, chunk_size=1000):
+        """Import NDJSON records, see BulkImporter for the format"""
+        from app.services.importer import BulkImporter
+        importer = BulkImporter(self, chunk_size)
+        try:
+            return importer.run(lines)
+        finally:
+            self.amenity_repo.invalidate()
+            self._invalidate_place_details(importer.reviewed_places)
+
+    def export_rows(self, entity, since=None):
+        """Stream the exported columns of an entity, see exporter.EXPORTS"""
+        from app.services.exporter import EXPORTS
+        repo, columns = EXPORTS[entity]
+        return getattr(self, repo).stream(columns, since)
+
+    def get_last_updated(self, entity):
+        from app.services.exporter import EXPORTS
+        return getattr(self, EXPORTS[entity][0]).get_last_updated()
 
     # USER
+    @unit_of_work()
     def create_user(self, user_data):
         user = User(**user_data)
         self.user_repo.add(user)
@@ -24,16 +72,22 @@ class HBnBFacade:
     def get_users(self):
         return self.user_repo.get_all()
 
+    def get_users_page(self, limit, cursor=None):
+        return self.user_repo.get_page(limit, cursor)
+
     def get_user(self, user_id):
         return self.user_repo.get(user_id)
 
     def get_user_by_email(self, email):
         return self.user_repo.get_by_attribute('email', email)
     
+    @unit_of_work()
     def update_user(self, user_id, user_data):
         self.user_repo.update(user_id, user_data)
+        self._invalidate_place_details(self.place_repo.get_ids_by_owner(user_id))
     
     # AMENITY
+    @unit_of_work()
     def create_amenity(self, amenity_data):
         amenity = Amenity(**amenity_data)
         self.amenity_repo.add(amenity)
@@ -42,45 +96,163 @@ class HBnBFacade:
     def get_amenity(self, amenity_id):
         return self.amenity_repo.get(amenity_id)
 
+    def get_amenities(self, amenity_ids):
+        """Amenities in the order of amenity_ids, unknown ids skipped"""
+        return self.amenity_repo.get_many(amenity_ids)
+
     def get_all_amenities(self):
         return self.amenity_repo.get_all()
 
+    def get_amenities_page(self, limit, cursor=None):
+        return self.amenity_repo.get_page(limit, cursor)
+
+    @unit_of_work()
     def update_amenity(self, amenity_id, amenity_data):
-        return self.amenity_repo.update(amenity_id, amenity_data)
+        amenity = self.amenity_repo.update(amenity_id, amenity_data)
+        self._invalidate_place_details(self.place_repo.get_ids_by_amenity(amenity_id))
+        return amenity
 
     # PLACE
+    @unit_of_work()
     def create_place(self, place_data, owner_id):
         user = self.user_repo.get_by_attribute('id', owner_id)
         if not user:
             raise KeyError('Invalid input data')
         place_data['owner'] = user
-        amenities = place_data.pop('amenities', None)
-        if amenities:
-            for a in amenities:
-                amenity = self.get_amenity(a['id'])
-                if not amenity:
-                    raise KeyError('Invalid input data')
+        amenity_ids = self._amenity_ids(place_data.pop('amenities', None) or [])
+        amenities = self.get_amenities(amenity_ids) if amenity_ids else []
+        if len(amenities) != len(amenity_ids):
+            raise KeyError('Invalid input data')
         place = Place(**place_data)
+        # Linked before the insert, so place and links are committed together
+        for amenity in amenities:
+            place.add_amenity(amenity)
         self.place_repo.add(place)
         user.add_place(place)
-        if amenities:
-            for amenity in amenities:
-                place.add_amenity(amenity)
         return place
 
+    @staticmethod
+    def _amenity_ids(amenities):
+        """Ids of a list of amenity ids or {'id': ...} objects, duplicates dropped"""
+        if not isinstance(amenities, list):
+            raise KeyError('Invalid input data')
+        ids = [amenity.get('id') if isinstance(amenity, dict) else amenity for amenity in amenities]
+        if not all(isinstance(amenity_id, str) for amenity_id in ids):
+            raise KeyError('Invalid input data')
+        return list(dict.fromkeys(ids))
+
+    def _check_amenities_exist(self, amenity_ids):
+        if len(self.amenity_repo.get_existing_ids(amenity_ids)) != len(amenity_ids):
+            raise KeyError('Invalid input data')
+
+    def add_place_amenities(self, place_id, amenities):
+        """Link amenities to a place and return all of its amenities.
+
+        One query checks that every amenity exists and one INSERT OR IGNORE
+        adds the missing links, in the same transaction; if any amenity is
+        unknown nothing is linked and KeyError is raised.
+        """
+        amenity_ids = self._amenity_ids(amenities)
+        with unit_of_work():
+            self._check_amenities_exist(amenity_ids)
+            self.place_repo.link_amenities(place_id, amenity_ids)
+            self._invalidate_place_details([place_id])
+        # Read after the commit, which would expire the amenities one by one
+        return self.amenity_repo.get_by_place(place_id)
+
+    def remove_place_amenities(self, place_id, amenities):
+        """Unlink amenities from a place and return the ones it keeps, see add_place_amenities()"""
+        amenity_ids = self._amenity_ids(amenities)
+        with unit_of_work():
+            self._check_amenities_exist(amenity_ids)
+            self.place_repo.unlink_amenities(place_id, amenity_ids)
+            self._invalidate_place_details([place_id])
+        return self.amenity_repo.get_by_place(place_id)
+
     def get_place(self, place_id):
         return self.place_repo.get(place_id)
 
     def get_all_places(self):
         return self.place_repo.get_all()
 
+    def get_places(self, place_ids, fieldset=None):
+        """Places with their relations in the order of place_ids, unknown ids skipped"""
+        return self.place_repo.get_many_with_relations(place_ids, fieldset)
+
+    def get_place_with_relations(self, place_id, fieldset=None):
+        if fieldset is not None:
+            # Partially loaded places are not cached
+            return self.place_repo.get_with_relations(place_id, fieldset)
+        key = f"place_full:{place_id}"
+        cached = self.cache.get(key)
+        if is_fresh(cached):
+            return attach(cached)
+        place = self.place_repo.get_with_relations(place_id)
+        if place is not None:
+            self.cache.set(key, place)
+        return place
+
+    def get_all_places_with_relations(self, sort='created_at', **filters):
+        return self.place_repo.get_all_with_relations(sort, **filters)
+
+    def get_places_page(self, limit, cursor=None, sort='created_at', **filters):
+        return self.place_repo.get_page_with_relations(limit, cursor, sort, **filters)
+
+    def _nearest(self, rows, lat, lng, limit, radius_km=None):
+        """(place, distance_km) pairs of the limit location rows nearest to a point.
+
+        Relations are loaded for the kept places only.
+        """
+        distances = [(row.id, geo.distance_km(lat, lng, row.latitude, row.longitude)) for row in rows]
+        if radius_km is not None:
+            distances = [result for result in distances if result[1] <= radius_km]
+        distances.sort(key=lambda result: result[1])
+        distances = distances[:limit]
+        places = {place.id: place for place in
+                  self.place_repo.get_many_with_relations([place_id for place_id, _ in distances])}
+        return [(places[place_id], distance) for place_id, distance in distances if place_id in places]
+
+    def get_places_nearby(self, lat, lng, radius_km, limit):
+        """Return (place, distance_km) pairs within radius_km, nearest first"""
+        rows = self.place_repo.get_in_bboxes(geo.bbox_around(lat, lng, radius_km))
+        return self._nearest(rows, lat, lng, limit, radius_km)
+
+    def get_places_in_bbox(self, min_lat, min_lng, max_lat, max_lng, limit):
+        """Return (place, distance_km) pairs inside a box, nearest to its center first.
+
+        min_lng > max_lng is a box crossing the antimeridian.
+        """
+        rows = self.place_repo.get_in_bboxes(geo.split_bbox(min_lat, min_lng, max_lat, max_lng))
+        return self._nearest(rows, *geo.bbox_center(min_lat, min_lng, max_lat, max_lng), limit)
+
+    def search_places(self, query, limit, **filters):
+        """(place, rank, snippet) rows for a free text query, see models.search"""
+        return self.place_repo.search(search.match_expression(query), limit, **filters)
+
+    def rebuild_search_index(self):
+        search.rebuild()
+
+    @unit_of_work()
+    def recompute_place_ratings(self, fix=True):
+        place_ids = self.place_repo.recompute_ratings(fix)
+        if fix:
+            self._invalidate_place_details(place_ids)
+        return place_ids
+
+    @unit_of_work()
     def update_place(self, place_id, place_data):
-        return self.place_repo.update(place_id, place_data)
+        try:
+            return self.place_repo.update(place_id, place_data)
+        finally:
+            self._invalidate_place_details([place_id])
     
+    @unit_of_work()
     def delete_place(self, place_id):
         self.place_repo.delete(place_id)
+        self._invalidate_place_details([place_id])
 
     # REVIEWS
+    @unit_of_work()
     def create_review(self, review_data, user_id):
         user = self.user_repo.get(user_id)
         if not user:
@@ -93,40 +265,60 @@ class HBnBFacade:
         del review_data['place_id']
         review_data['place'] = place
 
-        if place.owner.id == user.id:
+        if place.user_id == user.id:
             raise KeyError("You cannot review your own place.")
 
-        for r in place.reviews:
-            if r.user.id == user.id:
-                raise KeyError('You have already reviewed this place.')
+        if self.review_repo.user_has_reviewed(user.id, place.id):
+            raise KeyError('You have already reviewed this place.')
 
         review = Review(**review_data)
-        self.review_repo.add(review)
-        user.add_review(review)
-        place.add_review(review)
+        try:
+            self.review_repo.add(review)
+        except IntegrityError:
+            # Lost a race against a concurrent review by the same user
+            raise KeyError('You have already reviewed this place.')
+        self._invalidate_place_details([place.id])
         return review
         
-    def get_review(self, review_id):
+    def get_review(self, review_id, fieldset=None):
+        if fieldset is not None:
+            return self.review_repo.get_with_fields(review_id, fieldset)
         return self.review_repo.get(review_id)
 
-    def get_all_reviews(self):
+    def get_all_reviews(self, fieldset=None):
+        if fieldset is not None:
+            return self.review_repo.get_all_with_fields(fieldset)
         return self.review_repo.get_all()
 
+    def get_reviews_page(self, limit, cursor=None, fieldset=None):
+        if fieldset is not None:
+            return self.review_repo.get_page_with_fields(limit, cursor, fieldset)
+        return self.review_repo.get_page(limit, cursor)
+
+    def search_reviews(self, query, limit, place_id=None):
+        return self.review_repo.search(search.match_expression(query), limit, place_id)
+
     def get_reviews_by_place(self, place_id):
         place = self.place_repo.get(place_id)
         if not place:
             raise KeyError('Place not found')
         return place.reviews
 
+    @unit_of_work()
     def update_review(self, review_id, review_data):
-        return self.review_repo.update(review_id, review_data)
+        review = self.review_repo.get(review_id)
+        place_ids = [review.place_id] if review else []
+        try:
+            review = self.review_repo.update(review_id, review_data)
+        finally:
+            if review:
+                place_ids.append(review.place_id)
+            self._invalidate_place_details(place_ids)
+        return review
 
+    @unit_of_work()
     def delete_review(self, review_id):
+        # The commit expires the user and place review collections
         review = self.review_repo.get(review_id)
-        
-        user = self.user_repo.get(review.user.id)
-        place = self.place_repo.get(review.place.id)
-
-        user.delete_review(review)
-        place.delete_review(review)
         self.review_repo.delete(review_id)
+        self._invalidate_place_details([review.place_id])
@@ -0,0 +1,238 @@
+"""Bulk import of amenities, places and reviews from NDJSON lines"""
+import json
+import uuid
+from sqlalchemy.exc import IntegrityError
+from app import db
+from app.models.amenity import Amenity
+from app.models.place import Place
+from app.models.review import Review
+from app.models import geo
+
+AMENITY_FIELDS = ('name',)
+PLACE_FIELDS = ('title', 'description', 'price', 'latitude', 'longitude')
+REVIEW_FIELDS = ('text', 'rating')
+# Fields each record type accepts besides the model columns above
+REFERENCES = {
+    'amenity': (),
+    'place': ('owner_id', 'amenities'),
+    'review': ('user_id', 'place_id'),
+}
+REQUIRED = {
+    'amenity': ('name',),
+    'place': ('title', 'price', 'latitude', 'longitude', 'owner_id'),
+    'review': ('text', 'rating', 'user_id', 'place_id'),
+}
+
+
+class RecordError(Exception):
+    """A record that cannot be imported; the rest of the batch carries on"""
+
+
+class BulkImporter:
+    """Import NDJSON records in chunked transactions.
+
+    Each line is a JSON object with a "type" of amenity, place or review,
+    the fields of that model and an optional "id". Records are checked
+    with the model @validates rules, references are resolved with one
+    query per chunk, and each chunk is inserted with executemany and
+    committed on its own. Records may reference entities of earlier lines.
+    """
+
+    def __init__(self, facade, chunk_size=1000):
+        self.facade = facade
+        self.chunk_size = chunk_size
+        self.created = {'amenity': 0, 'place': 0, 'review': 0}
+        self.errors = []
+        self.reviewed_places = set()
+
+    def run(self, lines):
+        chunk = []
+        for line_no, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                if not isinstance(record, dict):
+                    raise ValueError('Record must be a JSON object')
+            except ValueError as e:
+                self.errors.append({'line': line_no, 'error': f'Invalid JSON: {e}'})
+                continue
+            chunk.append((line_no, record))
+            if len(chunk) >= self.chunk_size:
+                self._import_chunk(chunk)
+                chunk = []
+        if chunk:
+            self._import_chunk(chunk)
+        return self.report()
+
+    def report(self):
+        return {'created': dict(self.created), 'errors': self.errors}
+
+    def _import_chunk(self, records):
+        """Insert a chunk in one transaction, isolating records that break it"""
+        errors = []
+        created = {'amenity': 0, 'place': 0, 'review': 0}
+        reviewed_places = set()
+        try:
+            self._insert(records, errors, created, reviewed_places)
+            db.session.commit()
+        except IntegrityError:
+            # A concurrent writer got there first: retry record by record
+            db.session.rollback()
+            if len(records) == 1:
+                self.errors.append({'line': records[0][0], 'error': 'Conflicts with an existing record'})
+                return
+            for record in records:
+                self._import_chunk([record])
+            return
+        except Exception:
+            db.session.rollback()
+            raise
+        self.errors.extend(errors)
+        for key, count in created.items():
+            self.created[key] += count
+        self.reviewed_places |= reviewed_places
+
+    def _insert(self, records, errors, created, reviewed_places):
+        by_type = {'amenity': [], 'place': [], 'review': []}
+        for line_no, record in records:
+            record_type = record.get('type')
+            if record_type not in by_type:
+                errors.append({'line': line_no, 'error': 'type must be one of amenity, place, review'})
+                continue
+            by_type[record_type].append((line_no, record))
+
+        # Dependencies first, so later record types see earlier ones
+        for record_type, build_rows in (('amenity', self._amenity_rows),
+                                        ('place', self._place_rows),
+                                        ('review', self._review_rows)):
+            if by_type[record_type]:
+                created[record_type] += build_rows(by_type[record_type], errors, reviewed_places)
+        errors.sort(key=lambda error: error['line'])
+
+    def _check_fields(self, record_type, record, model_fields):
+        fields = {key: value for key, value in record.items() if key != 'type'}
+        unknown = set(fields) - set(model_fields) - set(REFERENCES[record_type]) - {'id'}
+        if unknown:
+            raise RecordError(f"Unknown field(s): {', '.join(sorted(unknown))}")
+        missing = [key for key in REQUIRED[record_type] if fields.get(key) is None]
+        if missing:
+            raise RecordError(f"Missing field(s): {', '.join(missing)}")
+        for key in REFERENCES[record_type]:
+            if key != 'amenities' and not isinstance(fields[key], str):
+                raise RecordError(f'{key} must be a string')
+        if fields.get('amenities') is not None:
+            # Same forms as the API: amenity ids or {"id": ...} objects
+            try:
+                fields['amenities'] = self.facade._amenity_ids(fields['amenities'])
+            except KeyError:
+                raise RecordError('amenities must be a list of amenity ids')
+        record_id = fields.get('id', str(uuid.uuid4()))
+        if not isinstance(record_id, str) or not 0 < len(record_id) <= 36:
+            raise RecordError('id must be a string of at most 36 characters')
+        return record_id, fields
+
+    def _validate(self, model, fields, model_fields):
+        """Run the model's @validates rules and return the validated values"""
+        values = {key: fields[key] for key in model_fields if key in fields}
+        try:
+            obj = model(**values)
+        except (TypeError, ValueError) as e:
+            raise RecordError(str(e).strip("'"))
+        return {key: getattr(obj, key) for key in model_fields}
+
+    def _parse(self, records, record_type, model, model_fields, errors):
+        """Validate records and drop the ones reusing an id"""
+        parsed = []
+        for line_no, record in records:
+            try:
+                record_id, fields = self._check_fields(record_type, record, model_fields)
+                values = self._validate(model, fields, model_fields)
+            except RecordError as e:
+                errors.append({'line': line_no, 'error': str(e)})
+                continue
+            values['id'] = record_id
+            parsed.append((line_no, fields, values))
+
+        repo = getattr(self.facade, f'{record_type}_repo')
+        existing = repo.get_existing_ids(values['id'] for _, _, values in parsed)
+        unique = []
+        for line_no, fields, values in parsed:
+            if values['id'] in existing:
+                errors.append({'line': line_no, 'error': 'id already exists'})
+                continue
+            existing.add(values['id'])
+            unique.append((line_no, fields, values))
+        return unique
+
+    def _amenity_rows(self, records, errors, reviewed_places):
+        parsed = self._parse(records, 'amenity', Amenity, AMENITY_FIELDS, errors)
+        names = self.facade.amenity_repo.get_existing_names(values['name'] for _, _, values in parsed)
+        rows = []
+        for line_no, fields, values in parsed:
+            if values['name'] in names:
+                errors.append({'line': line_no, 'error': 'Amenity already exists'})
+                continue
+            names.add(values['name'])
+            rows.append(values)
+        self.facade.amenity_repo.bulk_insert(rows)
+        return len(rows)
+
+    def _place_rows(self, records, errors, reviewed_places):
+        parsed = self._parse(records, 'place', Place, PLACE_FIELDS, errors)
+        owners = self.facade.user_repo.get_existing_ids(fields['owner_id'] for _, fields, _ in parsed)
+        amenity_ids = set()
+        for _, fields, _ in parsed:
+            amenity_ids.update(fields.get('amenities') or [])
+        amenities = self.facade.amenity_repo.get_existing_ids(amenity_ids)
+
+        rows = []
+        links = []
+        for line_no, fields, values in parsed:
+            place_amenities = fields.get('amenities') or []
+            if fields['owner_id'] not in owners:
+                errors.append({'line': line_no, 'error': 'Owner not found'})
+                continue
+            if not set(place_amenities) <= amenities:
+                errors.append({'line': line_no, 'error': 'Amenity not found'})
+                continue
+            values['user_id'] = fields['owner_id']
+            values['geohash'] = geo.encode(values['latitude'], values['longitude'])
+            rows.append(values)
+            links.extend({'place_id': values['id'], 'amenity_id': a} for a in place_amenities)
+        self.facade.place_repo.bulk_insert(rows)
+        self.facade.place_repo.bulk_insert_amenity_links(links)
+        return len(rows)
+
+    def _review_rows(self, records, errors, reviewed_places):
+        parsed = self._parse(records, 'review', Review, REVIEW_FIELDS, errors)
+        users = self.facade.user_repo.get_existing_ids(fields['user_id'] for _, fields, _ in parsed)
+        owners = self.facade.place_repo.get_owner_ids(fields['place_id'] for _, fields, _ in parsed)
+        reviewed = self.facade.review_repo.get_existing_pairs(
+            (fields['user_id'], fields['place_id']) for _, fields, _ in parsed)
+
+        rows = []
+        ratings = {}
+        for line_no, fields, values in parsed:
+            user_id, place_id = fields['user_id'], fields['place_id']
+            if user_id not in users:
+                errors.append({'line': line_no, 'error': 'User not found'})
+            elif place_id not in owners:
+                errors.append({'line': line_no, 'error': 'Place not found'})
+            elif owners[place_id] == user_id:
+                errors.append({'line': line_no, 'error': 'You cannot review your own place.'})
+            elif (user_id, place_id) in reviewed:
+                errors.append({'line': line_no, 'error': 'You have already reviewed this place.'})
+            else:
+                reviewed.add((user_id, place_id))
+                values.update(user_id=user_id, place_id=place_id)
+                rows.append(values)
+                delta = ratings.setdefault(place_id, {'count': 0, 'sum': 0, 1: 0, 2: 0, 3: 0, 4: 0, 5: 0})
+                delta['count'] += 1
+                delta['sum'] += values['rating']
+                delta[values['rating']] += 1
+        self.facade.review_repo.bulk_insert(rows)
+        # Core inserts skip the Review mapper events, so ratings are added here
+        self.facade.place_repo.bulk_add_ratings(ratings)
+        reviewed_places.update(ratings)
+        return len(rows)
@@ -67,26 +67,12 @@ document.addEventListener('DOMContentLoaded', () => {
     if (priceFilter){
         priceFilter.addEventListener('change', (event) => {
         let selectedValue = event.target.value;
-        const cards = document.getElementsByClassName('place-card');
-        
+
+        // The API filters on price, only matching places are downloaded
         if (selectedValue == 'All') {
-            for (card of cards){
-                card.style.display =''
-            }
+            fetchPlaces(token)
         } else {
-            const maxPrice = parseInt(selectedValue)
-
-            for (card of cards){
-                const priceP = card.getElementsByTagName('p')[0]
-                const priceText = priceP.textContent;
-                const price = parseInt(priceText.replace('Price per night: ', ''));
-    
-                if (price <= maxPrice) {
-                    card.style.display =''
-                } else {
-                    card.style.display ='none'
-                }
-            }
+            fetchPlaces(token, parseInt(selectedValue))
         }
     })}
 
@@ -187,24 +173,36 @@ function getCookie(name) {
     return null
 }
 
-async function fetchPlaces(token) {
+async function fetchPlaces(token, maxPrice) {
     try {
-        const URL = "http://127.0.0.1:5000/api/places"
+        // The index only shows the title and price of each place
+        let URL = "http://127.0.0.1:5000/api/v1/places/?fields=title,price"
+        if (maxPrice !== undefined) {
+            URL += "&max_price=" + maxPrice
+        }
 
-        const response = await fetch(URL, {
-            method: 'GET',
-            headers: {
-                'Content-Type': 'application/json',
-                'Authorization': 'Bearer ' + token
-            }
-        })
+        // The list is paginated: follow next_cursor until the last page
+        const places = []
+        let cursor = null
+        do {
+            const pageURL = cursor ? URL + "&cursor=" + encodeURIComponent(cursor) : URL
+            const response = await fetch(pageURL, {
+                method: 'GET',
+                headers: {
+                    'Content-Type': 'application/json',
+                    'Authorization': 'Bearer ' + token
+                }
+            })
 
-        if (response.ok) {
+            if (!response.ok) {
+                alert("Error fetching places: " + response.statusText);
+                return
+            }
             const data = await response.json()
-            displayPlaces(data)
-        } else {
-            alert("Error fetching places: " + response.statusText);
-        }
+            places.push(...data.items)
+            cursor = data.next_cursor
+        } while (cursor)
+        displayPlaces(places)
     } catch (error) {
         alert('Network error: ' + error);
     }
@@ -0,0 +1,90 @@
+"""Concurrent read/write throughput on a file database, default engine vs ProductionConfig.
+
+Usage: python benchmarks/bench_concurrency.py
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.exc import OperationalError
+from app import create_app, db
+from app.models.place import Place
+from app.models.user import User
+from app.services import facade
+from config import Config, ProductionConfig
+
+READERS = 8
+WRITERS = 2
+DURATION = 5.0
+PLACES = 2000
+
+
+def make_config(base, path):
+    class BenchConfig(base):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{path}"
+        SQLALCHEMY_TRACK_MODIFICATIONS = False
+        BCRYPT_LOG_ROUNDS = 4
+    return BenchConfig
+
+
+def populate():
+    owner = User(first_name="Owner", last_name="Bench", email=f"owner_{uuid.uuid4().hex}@bench.io",
+                 password="password123")
+    db.session.add(owner)
+    db.session.add_all([Place(title=f"Place {i}", description="Bench", price=float(i % 500 + 1),
+                              latitude=1.0, longitude=1.0, owner=owner) for i in range(PLACES)])
+    db.session.commit()
+
+
+def worker(app, stop, counters, write):
+    with app.app_context():
+        while not stop.is_set():
+            try:
+                if write:
+                    facade.create_amenity({'name': f"Amenity {uuid.uuid4().hex[:20]}"})
+                else:
+                    facade.get_places_page(20, None, 'price', max_price=250.0)
+                counters['writes' if write else 'reads'] += 1
+            except OperationalError:
+                db.session.rollback()
+                counters['locked'] += 1
+            finally:
+                db.session.remove()
+
+
+def run(name, base):
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app(make_config(base, os.path.join(tmp, 'bench.db')))
+        with app.app_context():
+            db.create_all()
+            populate()
+            db.session.remove()
+        counters = {'reads': 0, 'writes': 0, 'locked': 0}
+        stop = threading.Event()
+        threads = [threading.Thread(target=worker, args=(app, stop, counters, i < WRITERS))
+                   for i in range(READERS + WRITERS)]
+        for thread in threads:
+            thread.start()
+        time.sleep(DURATION)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        with app.app_context():
+            db.engine.dispose()
+        print(f"{name:>10} {counters['reads'] / DURATION:>10.0f} {counters['writes'] / DURATION:>10.0f} "
+              f"{counters['locked']:>8}")
+
+
+def main():
+    print(f"{'profile':>10} {'reads/s':>10} {'writes/s':>10} {'locked':>8}")
+    run('default', Config)
+    run('production', ProductionConfig)
+
+
+if __name__ == '__main__':
+    main()
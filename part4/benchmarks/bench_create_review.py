@@ -0,0 +1,71 @@
+"""Time HBnBFacade.create_review on places that already have many reviews.
+
+Usage: python benchmarks/bench_create_review.py
+"""
+import os
+import sys
+import time
+import uuid
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event
+from app import create_app, db
+from app.models.place import Place
+from app.models.review import Review
+from app.models.user import User
+from app.services import facade
+from config import TestingConfig
+
+SIZES = (10, 1000, 10000)
+RUNS = 20
+
+
+def populate(nb_reviews):
+    """Insert a place with nb_reviews reviews from distinct users"""
+    now = datetime.now()
+    owner = User(first_name="Owner", last_name="Bench", email=f"owner_{uuid.uuid4().hex}@bench.io",
+                 password="password123")
+    place = Place(title="Busy place", description="Bench", price=10.0, latitude=1.0, longitude=1.0, owner=owner)
+    db.session.add(place)
+    db.session.commit()
+    users = [{'id': str(uuid.uuid4()), 'first_name': 'U', 'last_name': 'B', 'email': f'{i}_{uuid.uuid4().hex}@bench.io',
+              'password': 'x', 'is_admin': False, 'created_at': now, 'updated_at': now}
+             for i in range(nb_reviews)]
+    db.session.execute(User.__table__.insert(), users)
+    db.session.execute(Review.__table__.insert(), [
+        {'id': str(uuid.uuid4()), 'text': 'Bench review', 'rating': 4, 'place_id': place.id,
+         'user_id': user['id'], 'created_at': now, 'updated_at': now}
+        for user in users])
+    db.session.commit()
+    return place.id
+
+
+def main():
+    app = create_app(TestingConfig)
+    with app.app_context():
+        db.create_all()
+        statements = []
+        event.listen(db.engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+        print(f"{'reviews':>8} {'ms/create':>10} {'queries':>8}")
+        for size in SIZES:
+            place_id = populate(size)
+            reviewers = [User(first_name="New", last_name="Reviewer", email=f"new_{uuid.uuid4().hex}@bench.io",
+                              password="password123") for _ in range(RUNS)]
+            db.session.add_all(reviewers)
+            db.session.commit()
+            reviewer_ids = [user.id for user in reviewers]
+            db.session.remove()
+
+            statements.clear()
+            start = time.perf_counter()
+            for user_id in reviewer_ids:
+                facade.create_review({'text': 'Benchmark stay', 'rating': 5, 'place_id': place_id}, user_id)
+                db.session.remove()
+            elapsed = (time.perf_counter() - start) / RUNS
+            print(f"{size:>8} {elapsed * 1000:>10.2f} {len(statements) / RUNS:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
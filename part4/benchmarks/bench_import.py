@@ -0,0 +1,55 @@
+"""Time the bulk importer on generated places.
+
+Usage: python benchmarks/bench_import.py [nb_places]
+"""
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db
+from app.models.amenity import Amenity
+from app.models.place import Place
+from app.models.user import User
+from app.services import facade
+from config import TestingConfig
+
+
+def main(nb_places):
+    with tempfile.TemporaryDirectory() as tmp:
+        class BenchConfig(TestingConfig):
+            SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+
+        app = create_app(BenchConfig)
+        with app.app_context():
+            db.create_all()
+            owner = User(first_name="Owner", last_name="Bench", email=f"owner_{uuid.uuid4().hex}@bench.io",
+                         password="password123")
+            amenities = [Amenity(name=f"Amenity {i}") for i in range(20)]
+            db.session.add(owner)
+            db.session.add_all(amenities)
+            db.session.commit()
+            amenity_ids = [amenity.id for amenity in amenities]
+
+            lines = [json.dumps({
+                'type': 'place', 'title': f'Imported place {i}', 'description': 'Bulk imported',
+                'price': round(random.uniform(10, 500), 2), 'latitude': random.uniform(-80, 80),
+                'longitude': random.uniform(-170, 170), 'owner_id': owner.id,
+                'amenities': random.sample(amenity_ids, 3)
+            }) for i in range(nb_places)]
+
+            start = time.perf_counter()
+            report = facade.bulk_import(lines)
+            elapsed = time.perf_counter() - start
+            assert not report['errors'], report['errors'][:5]
+            print(f"{Place.query.count()} places imported in {elapsed:.1f}s "
+                  f"({nb_places / elapsed:,.0f} places/s)")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
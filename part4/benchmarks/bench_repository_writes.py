@@ -0,0 +1,72 @@
+"""Write latency and cold load time of SQLAlchemyRepository on a file database.
+
+Counterpart of part2_reviewed/hbnb/benchmarks/bench_durable_repository.py:
+same record counts, amenities standing in for records.
+
+Usage: python benchmarks/bench_repository_writes.py
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db
+from app.models.amenity import Amenity
+from app.persistence.amenity_repository import AmenityRepository
+from config import Config, ProductionConfig
+
+WRITES = 2000
+LOAD_SIZE = 200_000
+
+
+def make_config(base, path):
+    class BenchConfig(base):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{path}"
+        SQLALCHEMY_TRACK_MODIFICATIONS = False
+        CACHE_TYPE = 'null'
+    return BenchConfig
+
+
+def write_latency(name, base, tmp):
+    app = create_app(make_config(base, os.path.join(tmp, f'{name}.db')))
+    with app.app_context():
+        db.create_all()
+        repo = AmenityRepository()
+        start = time.perf_counter()
+        for i in range(WRITES):
+            repo.add(Amenity(name=f"Amenity {i}"))
+        elapsed = time.perf_counter() - start
+        db.engine.dispose()
+    print(f"{f'SQLAlchemyRepository.add, {name}':<44} {elapsed / WRITES * 1e6:>10,.1f} us/write")
+
+
+def cold_load(tmp):
+    path = os.path.join(tmp, 'load.db')
+    app = create_app(make_config(ProductionConfig, path))
+    with app.app_context():
+        db.create_all()
+        db.session.bulk_insert_mappings(Amenity, [{'name': f"Amenity {i}"} for i in range(LOAD_SIZE)])
+        db.session.commit()
+        db.engine.dispose()
+
+    start = time.perf_counter()
+    app = create_app(make_config(ProductionConfig, path))
+    with app.app_context():
+        assert len(AmenityRepository().get_all()) == LOAD_SIZE
+        elapsed = time.perf_counter() - start
+        db.engine.dispose()
+    print(f"{f'load {LOAD_SIZE:,} with get_all()':<44} {elapsed:>10,.2f} s "
+          f"({os.path.getsize(path) / 2**20:,.1f} MiB)")
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        write_latency('default', Config, tmp)
+        write_latency('production', ProductionConfig, tmp)
+        cold_load(tmp)
+
+
+if __name__ == '__main__':
+    main()
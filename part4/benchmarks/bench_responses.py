@@ -0,0 +1,76 @@
+"""Bytes on the wire and latency of the place listing per encoder and compression.
+
+Usage: python benchmarks/bench_responses.py
+"""
+import os
+import statistics
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db
+from app.models.amenity import Amenity
+from app.models.place import Place
+from app.models.review import Review
+from app.models.user import User
+from config import TestingConfig
+
+PLACES = 200
+REVIEWS_PER_PLACE = 10
+RUNS = 200
+URL = f"/api/v1/places/?limit={PLACES}"
+PROFILES = (
+    # name, JSON_ENCODER, Accept-Encoding
+    ('json, identity', 'json', None),
+    ('orjson, identity', 'orjson', None),
+    ('orjson, gzip', 'orjson', 'gzip'),
+    ('orjson, br', 'orjson', 'br, gzip'),
+)
+
+
+def populate():
+    owner = User(first_name="Owner", last_name="Bench", email=f"owner_{uuid.uuid4().hex}@bench.io",
+                 password="password123")
+    reviewers = [User(first_name="Guest", last_name=str(i), email=f"guest_{uuid.uuid4().hex}@bench.io",
+                      password="password123") for i in range(REVIEWS_PER_PLACE)]
+    amenities = [Amenity(name=name) for name in ("Wifi", "Pool", "Parking")]
+    db.session.add_all(reviewers + amenities)
+    for i in range(PLACES):
+        place = Place(title=f"Place {i}", description="Bright flat close to the beach with a sea view",
+                      price=float(50 + i), latitude=43.0, longitude=5.0, owner=owner)
+        place.amenities.extend(amenities)
+        db.session.add(place)
+        db.session.add_all([Review(text="Great stay, would come back", rating=1 + j % 5, place=place, user=user)
+                            for j, user in enumerate(reviewers)])
+    db.session.commit()
+
+
+def main():
+    print(f"{'profile':>18} {'bytes':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    for name, encoder, accept_encoding in PROFILES:
+        class BenchConfig(TestingConfig):
+            JSON_ENCODER = encoder
+
+        app = create_app(BenchConfig)
+        with app.app_context():
+            db.create_all()
+            populate()
+            client = app.test_client()
+            headers = {'Accept-Encoding': accept_encoding} if accept_encoding else {}
+            timings = []
+            for _ in range(RUNS):
+                start = time.perf_counter()
+                resp = client.get(URL, headers=headers)
+                timings.append((time.perf_counter() - start) * 1000)
+            assert resp.status_code == 200
+            timings.sort()
+            print(f"{name:>18} {len(resp.data):>9,} {statistics.median(timings):>8.1f} "
+                  f"{timings[int(len(timings) * 0.99) - 1]:>8.1f}")
+            db.session.remove()
+            db.drop_all()
+
+
+if __name__ == '__main__':
+    main()
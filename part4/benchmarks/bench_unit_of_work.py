@@ -0,0 +1,83 @@
+"""Commits and latency of the facade write operations on a file database.
+
+Every commit of the default SQLite configuration (rollback journal,
+synchronous=FULL) costs at least one fsync.
+
+Usage: python benchmarks/bench_unit_of_work.py
+"""
+import os
+import sys
+import tempfile
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event
+from app import create_app, db
+from app.models.amenity import Amenity
+from app.models.amenities_places import AmenityPlace
+from app.models.user import User
+from app.services import facade
+from config import Config
+
+RUNS = 100
+
+
+class BenchConfig(Config):
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    CACHE_TYPE = 'null'
+
+
+def make_user():
+    user = User(first_name="Bench", last_name="User", email=f"{uuid.uuid4().hex}@bench.io", password="password123")
+    db.session.add(user)
+    return user
+
+
+def measure(name, operation, args, commits):
+    commits.clear()
+    start = time.perf_counter()
+    results = []
+    for arg in args:
+        results.append(operation(*arg))
+        db.session.remove()
+    elapsed = (time.perf_counter() - start) / len(args)
+    print(f"{name:<34} {elapsed * 1000:>8.2f} {len(commits) / len(args):>8.1f}")
+    return results
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        BenchConfig.SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        app = create_app(BenchConfig)
+        with app.app_context():
+            db.create_all()
+            owners = [make_user() for _ in range(RUNS)]
+            reviewers = [make_user() for _ in range(RUNS)]
+            amenities = [Amenity(name=f"Amenity {i}") for i in range(3)]
+            db.session.add_all(amenities)
+            db.session.commit()
+            owner_ids = [user.id for user in owners]
+            reviewer_ids = [user.id for user in reviewers]
+            amenity_ids = [amenity.id for amenity in amenities]
+            db.session.remove()
+
+            commits = []
+            event.listen(db.engine, 'commit', lambda conn: commits.append(conn))
+            print(f"{'operation':<34} {'ms/op':>8} {'commits':>8}")
+            places = measure("create_place, 3 amenities", lambda owner_id: facade.create_place(
+                {'title': "Bench place", 'description': "Bench", 'price': 10.0, 'latitude': 1.0,
+                 'longitude': 1.0, 'amenities': list(amenity_ids)}, owner_id).id,
+                [(owner_id,) for owner_id in owner_ids], commits)
+            print(f"{'amenity links committed':<34} {AmenityPlace.query.count():>17}")
+            db.session.remove()
+            reviews = measure("create_review", lambda place_id, user_id: facade.create_review(
+                {'text': "Bench stay", 'rating': 4, 'place_id': place_id}, user_id).id,
+                list(zip(places, reviewer_ids)), commits)
+            measure("delete_review", facade.delete_review, [(review_id,) for review_id in reviews], commits)
+            db.engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
@@ -3,13 +3,67 @@ import os
 class Config:
     SECRET_KEY = os.getenv('SECRET_KEY', 'default_secret_key')
     DEBUG = False
+    # Facade cache: 'lru', 'redis' or 'null'
+    CACHE_TYPE = os.getenv('CACHE_TYPE', 'lru')
+    CACHE_MAXSIZE = 1024
+    CACHE_TTL = 300
+    CACHE_REDIS_URL = os.getenv('CACHE_REDIS_URL', 'redis://localhost:6379/0')
+    # Password hashing: bcrypt cost and worker pool (workers default to the CPU count)
+    BCRYPT_LOG_ROUNDS = 12
+    PASSWORD_HASH_WORKERS = None
+    PASSWORD_HASH_QUEUE_SIZE = 32
+    PASSWORD_HASH_TIMEOUT = 10.0
+    # API output: 'auto' uses orjson when installed, else 'json'
+    JSON_ENCODER = os.getenv('JSON_ENCODER', 'auto')
+    # Responses of at least COMPRESS_MIN_SIZE bytes are compressed, brotli needs the brotli package
+    COMPRESS_MIN_SIZE = 1024
+    COMPRESS_ENCODINGS = ('br', 'gzip')
+    COMPRESS_LEVEL = 6
+    # Brotli quality 4 compresses about like gzip -9 at the speed of gzip -6
+    COMPRESS_BROTLI_QUALITY = 4
+    # Prometheus metrics at /metrics; Server-Timing headers default to DEBUG
+    METRICS_ENABLED = True
+    METRICS_SERVER_TIMING = None
+    # Query budgets: 'warn', 'raise' or 'off', None warns in debug and tests
+    QUERY_GUARD = None
+    # A statement repeated this many times in one request is reported as N+1
+    QUERY_GUARD_REPEAT = 5
+    # PRAGMA name -> value, applied to each new SQLite connection
+    SQLITE_PRAGMAS = {}
 
 class DevelopmentConfig(Config):
     DEBUG = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///development.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+class TestingConfig(Config):
+    TESTING = True
+    BCRYPT_LOG_ROUNDS = 4
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+class ProductionConfig(Config):
+    SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', 'sqlite:///production.db')
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        # One connection per worker thread, readers never wait on each other in WAL mode
+        'pool_size': int(os.getenv('DATABASE_POOL_SIZE', 8)),
+        'max_overflow': 4,
+        'pool_timeout': 10,
+    }
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'foreign_keys': 'ON',
+        'busy_timeout': 5000,
+        'cache_size': -64000,
+        'mmap_size': 268435456,
+        'temp_store': 'MEMORY',
+    }
+
 config = {
     'development': DevelopmentConfig,
+    'testing': TestingConfig,
+    'production': ProductionConfig,
     'default': DevelopmentConfig
 }
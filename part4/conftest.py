@@ -0,0 +1,83 @@
+import pytest
+import uuid
+from sqlalchemy import event
+from flask_jwt_extended import create_access_token
+from app import create_app, db as _db, query_guard
+from app.models.user import User
+from config import TestingConfig
+
+
+@pytest.fixture()
+def app():
+    """Create a new app instance backed by a fresh in-memory database."""
+    app = create_app(TestingConfig)
+
+    with app.app_context():
+        _db.create_all()
+        yield app
+        _db.session.remove()
+        _db.drop_all()
+
+
+@pytest.fixture()
+def db(app):
+    """Return the database bound to the test app."""
+    return _db
+
+
+@pytest.fixture()
+def client(app):
+    """A test client for the app."""
+    return app.test_client()
+
+
+@pytest.fixture()
+def make_user(db):
+    """Factory creating users directly in the database."""
+    def _make_user(is_admin=False):
+        user = User(
+            first_name="Test",
+            last_name="User",
+            email=f"user_{uuid.uuid4().hex[:8]}@example.com",
+            password="password123",
+            is_admin=is_admin
+        )
+        db.session.add(user)
+        db.session.commit()
+        return user
+    return _make_user
+
+
+@pytest.fixture()
+def auth_headers(app):
+    """Factory returning an Authorization header for a user."""
+    def _auth_headers(user):
+        token = create_access_token(identity=user.id, additional_claims={'is_admin': user.is_admin})
+        return {"Authorization": f"Bearer {token}"}
+    return _auth_headers
+
+
+@pytest.fixture()
+def query_counter(db):
+    """Record every SQL statement sent to the database."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    yield statements
+    event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+
+
+@pytest.fixture(autouse=True)
+def query_budgets(app):
+    """Fail the test if one of its requests broke the query budget of its route.
+
+    Budgets are declared on views with @query_budget, see app.query_guard.
+    """
+    query_guard.violations.clear()
+    yield query_guard
+    violations = list(query_guard.violations)
+    query_guard.violations.clear()
+    assert violations == [], "\n".join(violations)
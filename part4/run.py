@@ -1,6 +1,8 @@
+import os
+import config
 from app import create_app
 
-app = create_app()
+app = create_app(config.config[os.getenv('HBNB_ENV', 'default')])
 
 if __name__ == '__main__':
-    app.run(debug=True)
+    app.run(debug=app.config['DEBUG'])
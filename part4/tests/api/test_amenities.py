@@ -0,0 +1,56 @@
+import json
+from base64 import urlsafe_b64encode
+from app.models.amenity import Amenity
+
+
+def _add_amenities(db, count):
+    db.session.add_all([Amenity(name=f"Amenity {i:03d}") for i in range(count)])
+    db.session.commit()
+
+
+def test_get_amenities_is_paginated(client, db):
+    _add_amenities(db, 5)
+    resp = client.get("/api/v1/amenities/?limit=2")
+    assert resp.status_code == 200
+    assert len(resp.json["items"]) == 2
+    assert resp.json["next_cursor"]
+
+
+def test_get_amenities_walks_every_page_once(client, db):
+    _add_amenities(db, 7)
+    seen = []
+    cursor = None
+    while True:
+        url = "/api/v1/amenities/?limit=3"
+        if cursor:
+            url += f"&cursor={cursor}"
+        resp = client.get(url)
+        assert resp.status_code == 200
+        seen.extend(a["id"] for a in resp.json["items"])
+        cursor = resp.json["next_cursor"]
+        if not cursor:
+            break
+    assert len(seen) == 7
+    assert len(set(seen)) == 7
+
+
+def test_get_amenities_all_returns_plain_list(client, db):
+    _add_amenities(db, 3)
+    resp = client.get("/api/v1/amenities/?all=true")
+    assert resp.status_code == 200
+    assert isinstance(resp.json, list)
+    assert len(resp.json) == 3
+
+
+def test_get_amenities_invalid_cursor(client, db):
+    resp = client.get("/api/v1/amenities/?cursor=not-a-cursor")
+    assert resp.status_code == 400
+    # Well-formed base64 JSON, but with a nested value
+    cursor = urlsafe_b64encode(json.dumps(["2020-01-01T00:00:00", [1, 2]]).encode()).decode()
+    resp = client.get(f"/api/v1/amenities/?cursor={cursor}")
+    assert resp.status_code == 400
+
+
+def test_get_amenities_invalid_limit(client, db):
+    resp = client.get("/api/v1/amenities/?limit=0")
+    assert resp.status_code == 400
@@ -0,0 +1,131 @@
+import json
+from app.models.place import Place
+
+
+def _ndjson(*records):
+    return "\n".join(r if isinstance(r, str) else json.dumps(r) for r in records) + "\n"
+
+
+def test_bulk_import_requires_admin(client, make_user, auth_headers):
+    resp = client.post("/api/v1/bulk/import", data=_ndjson(), headers=auth_headers(make_user()))
+    assert resp.status_code == 403
+
+
+def test_bulk_import_creates_records_and_reports_errors(client, db, make_user, auth_headers):
+    admin, owner, reviewer = make_user(is_admin=True), make_user(), make_user()
+    body = _ndjson(
+        {"type": "amenity", "id": "wifi", "name": "Wifi"},
+        {"type": "amenity", "name": "Wifi"},
+        {"type": "place", "id": "p1", "title": "Imported place", "price": 80, "latitude": 48.85,
+         "longitude": 2.35, "owner_id": owner.id, "amenities": ["wifi"]},
+        {"type": "place", "title": "Bad place", "price": -1, "latitude": 1.0, "longitude": 1.0,
+         "owner_id": owner.id},
+        "not json",
+        {"type": "review", "text": "Great stay!", "rating": 5, "user_id": reviewer.id, "place_id": "p1"},
+        {"type": "review", "text": "Again great", "rating": 4, "user_id": reviewer.id, "place_id": "p1"},
+        {"type": "review", "text": "My own place", "rating": 5, "user_id": owner.id, "place_id": "p1"},
+        {"type": "place", "title": "Lost place", "price": 10, "latitude": 1.0, "longitude": 1.0,
+         "owner_id": "nobody"},
+    )
+    resp = client.post("/api/v1/bulk/import?chunk_size=4", data=body, headers=auth_headers(admin),
+                       content_type="application/x-ndjson")
+    assert resp.status_code == 200
+    assert resp.json["created"] == {"amenity": 1, "place": 1, "review": 1}
+    assert resp.json["errors"] == [
+        {"line": 2, "error": "Amenity already exists"},
+        {"line": 4, "error": "Price must be positive."},
+        {"line": 5, "error": resp.json["errors"][2]["error"]},
+        {"line": 7, "error": "You have already reviewed this place."},
+        {"line": 8, "error": "You cannot review your own place."},
+        {"line": 9, "error": "Owner not found"},
+    ]
+    assert resp.json["errors"][2]["error"].startswith("Invalid JSON")
+
+    place = db.session.get(Place, "p1")
+    assert [a.name for a in place.amenity_list] == ["Wifi"]
+    assert place.geohash.startswith("u09")
+    assert (place.review_count, place.average_rating, place.rating_5) == (1, 5.0, 1)
+
+
+def test_bulk_import_reports_badly_typed_references(client, db, make_user, auth_headers):
+    admin, owner, reviewer = make_user(is_admin=True), make_user(), make_user()
+    place = {"type": "place", "title": "Imported place", "price": 80.0, "latitude": 48.85, "longitude": 2.35}
+    body = _ndjson(
+        {"type": "amenity", "id": "wifi", "name": "Wifi"},
+        dict(place, id="p1", owner_id=owner.id, amenities=[{"id": "wifi"}]),
+        dict(place, owner_id=[owner.id]),
+        dict(place, owner_id=owner.id, amenities=[["wifi"]]),
+        {"type": "review", "text": "Great stay!", "rating": 5, "user_id": {"id": reviewer.id}, "place_id": "p1"},
+        {"type": "review", "text": "Great stay!", "rating": 5, "user_id": reviewer.id, "place_id": "p1"},
+    )
+    resp = client.post("/api/v1/bulk/import", data=body, headers=auth_headers(admin),
+                       content_type="application/x-ndjson")
+    assert resp.status_code == 200
+    assert resp.json["created"] == {"amenity": 1, "place": 1, "review": 1}
+    assert resp.json["errors"] == [
+        {"line": 3, "error": "owner_id must be a string"},
+        {"line": 4, "error": "amenities must be a list of amenity ids"},
+        {"line": 5, "error": "user_id must be a string"},
+    ]
+    assert [a.name for a in db.session.get(Place, "p1").amenity_list] == ["Wifi"]
+
+
+def test_cli_import(app, db, make_user, tmp_path):
+    owner = make_user()
+    path = tmp_path / "places.ndjson"
+    path.write_text(_ndjson(*[
+        {"type": "place", "title": f"Place {i}", "price": 10 + i, "latitude": 1.0, "longitude": 1.0,
+         "owner_id": owner.id} for i in range(25)]))
+    result = app.test_cli_runner().invoke(args=["hbnb", "import", str(path), "--chunk-size", "10"])
+    assert result.exit_code == 0
+    assert json.loads(result.output.strip().splitlines()[-1]) == {"amenity": 0, "place": 25, "review": 0}
+    assert Place.query.count() == 25
+
+
+def test_export_ndjson(client, db, make_user, auth_headers):
+    admin = make_user(is_admin=True)
+    resp = client.get("/api/v1/bulk/export/users", headers=auth_headers(admin))
+    assert resp.status_code == 200
+    assert resp.mimetype == "application/x-ndjson"
+    assert resp.is_streamed
+    rows = [json.loads(line) for line in resp.get_data(as_text=True).splitlines()]
+    assert [row["id"] for row in rows] == [admin.id]
+    assert "password" not in rows[0]
+    assert resp.last_modified is not None
+
+
+def test_export_csv(client, db, make_user, auth_headers):
+    admin, owner = make_user(is_admin=True), make_user()
+    db.session.add(Place(title="Exported", description="Nice", price=12.5, latitude=1.0,
+                         longitude=1.0, owner=owner))
+    db.session.commit()
+    resp = client.get("/api/v1/bulk/export/places?format=csv", headers=auth_headers(admin))
+    assert resp.status_code == 200
+    lines = resp.get_data(as_text=True).splitlines()
+    assert lines[0].startswith("id,title,description,price")
+    assert len(lines) == 2
+    assert "Exported" in lines[1]
+
+
+def test_export_if_modified_since(client, db, make_user, auth_headers):
+    headers = auth_headers(make_user(is_admin=True))
+    last_modified = client.get("/api/v1/bulk/export/users", headers=headers).headers["Last-Modified"]
+    resp = client.get("/api/v1/bulk/export/users", headers=dict(headers, **{
+        "If-Modified-Since": "Sat, 01 Jan 2000 00:00:00 GMT"}))
+    assert len(resp.get_data(as_text=True).splitlines()) == 1
+    resp = client.get("/api/v1/bulk/export/users", headers=dict(headers, **{
+        "If-Modified-Since": "Fri, 01 Jan 2100 00:00:00 GMT"}))
+    assert resp.status_code == 304
+    assert last_modified
+
+
+def test_export_unknown_entity(client, make_user, auth_headers):
+    resp = client.get("/api/v1/bulk/export/secrets", headers=auth_headers(make_user(is_admin=True)))
+    assert resp.status_code == 404
+
+
+def test_cli_export(app, db, make_user):
+    make_user()
+    result = app.test_cli_runner().invoke(args=["hbnb", "export", "users", "--format", "csv"])
+    assert result.exit_code == 0
+    assert result.output.splitlines()[0] == "id,first_name,last_name,email,is_admin,created_at,updated_at"
@@ -0,0 +1,53 @@
+import gzip
+import json
+import pytest
+from app.encoding import get_encoder
+from app.models.place import Place
+
+
+def _add_places(db, owner, count):
+    db.session.add_all([Place(title=f"Place number {i}", description="A long description " * 5, price=50.0,
+                              latitude=10.0, longitude=20.0, owner=owner) for i in range(count)])
+    db.session.commit()
+
+
+def test_large_responses_are_gzipped(client, db, make_user):
+    _add_places(db, make_user(), 20)
+    resp = client.get("/api/v1/places/", headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in resp.headers["Vary"]
+    assert resp.headers["ETag"].startswith('W/"')
+    body = json.loads(gzip.decompress(resp.data))
+    assert len(body["items"]) == 20
+    assert int(resp.headers["Content-Length"]) == len(resp.data)
+
+
+def test_small_or_unaccepted_responses_are_not_compressed(client, db, make_user):
+    resp = client.get("/api/v1/amenities/", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in resp.headers
+    _add_places(db, make_user(), 20)
+    resp = client.get("/api/v1/places/")
+    assert "Content-Encoding" not in resp.headers
+    assert len(resp.json["items"]) == 20
+
+
+def test_brotli_preferred_when_available(client, db, make_user):
+    brotli = pytest.importorskip("brotli")
+    _add_places(db, make_user(), 20)
+    resp = client.get("/api/v1/places/", headers={"Accept-Encoding": "gzip, br"})
+    assert resp.headers["Content-Encoding"] == "br"
+    assert len(json.loads(brotli.decompress(resp.data))["items"]) == 20
+
+
+def test_weak_etag_revalidates_compressed_response(client, db, make_user):
+    _add_places(db, make_user(), 20)
+    etag = client.get("/api/v1/places/", headers={"Accept-Encoding": "gzip"}).headers["ETag"]
+    resp = client.get("/api/v1/places/", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert resp.status_code == 304
+
+
+def test_encoders_agree():
+    pytest.importorskip("orjson")
+    data = {"items": [{"id": "1", "title": "Café", "price": 12.5, "rating": {"histogram": {"1": 0}}}],
+            "next_cursor": None}
+    assert json.loads(get_encoder("orjson")(data)) == json.loads(get_encoder("json")(data))
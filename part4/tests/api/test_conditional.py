@@ -0,0 +1,72 @@
+from app.models.place import Place
+from app.services import facade
+
+
+def _add_place(db, owner):
+    place = Place(title="Cosy flat", description="Nice place", price=80.0, latitude=10.0, longitude=20.0,
+                  owner=owner)
+    db.session.add(place)
+    db.session.commit()
+    return place
+
+
+def test_unchanged_collection_returns_304_after_one_query(client, db, make_user, query_counter):
+    _add_place(db, make_user())
+    first = client.get("/api/v1/places/")
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    query_counter.clear()
+    resp = client.get("/api/v1/places/", headers={"If-None-Match": etag})
+    assert resp.status_code == 304
+    assert resp.data == b""
+    assert resp.headers["ETag"] == etag
+    assert len(query_counter) == 1
+
+
+def test_etag_changes_with_embedded_data(client, db, make_user):
+    owner, reviewer = make_user(), make_user()
+    place = _add_place(db, owner)
+    etag = client.get(f"/api/v1/places/{place.id}").headers["ETag"]
+    # Through the facade, which drops the cached place
+    facade.create_review({"text": "Lovely stay", "rating": 5, "place_id": place.id}, reviewer.id)
+    resp = client.get(f"/api/v1/places/{place.id}", headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+    assert resp.headers["ETag"] != etag
+    assert resp.json["rating"]["count"] == 1
+
+
+def test_etag_depends_on_query_string(client, db, make_user):
+    _add_place(db, make_user())
+    etag = client.get("/api/v1/places/").headers["ETag"]
+    assert client.get("/api/v1/places/?limit=1", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_deletes_invalidate_collections(client, db, make_user):
+    user = make_user()
+    etag = client.get("/api/v1/users/").headers["ETag"]
+    db.session.delete(user)
+    db.session.commit()
+    assert client.get("/api/v1/users/", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_if_modified_since(client, db, make_user):
+    _add_place(db, make_user())
+    resp = client.get("/api/v1/amenities/", headers={"If-Modified-Since": "Fri, 01 Jan 2100 00:00:00 GMT"})
+    assert resp.status_code == 304
+    resp = client.get("/api/v1/amenities/", headers={"If-Modified-Since": "Mon, 01 Jan 2001 00:00:00 GMT"})
+    assert resp.status_code == 200
+
+
+def test_write_in_the_same_second_is_not_304(client, db, make_user):
+    user = make_user()
+    last_modified = client.get("/api/v1/users/").headers["Last-Modified"]
+    facade.update_user(user.id, {"first_name": "Renamed"})
+    resp = client.get("/api/v1/users/", headers={"If-Modified-Since": last_modified})
+    assert resp.status_code == 200
+    assert resp.json["items"][0]["first_name"] == "Renamed"
+
+
+def test_errors_carry_no_validators(client):
+    resp = client.get("/api/v1/places/missing")
+    assert resp.status_code == 404
+    assert "ETag" not in resp.headers
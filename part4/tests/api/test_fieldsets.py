@@ -0,0 +1,74 @@
+from app.models.place import Place
+from app.models.amenity import Amenity
+from app.models.review import Review
+
+
+def _populate(db, make_user, nb_places=3):
+    owner, reviewer = make_user(), make_user()
+    wifi = Amenity(name="Wifi")
+    places = []
+    for i in range(nb_places):
+        place = Place(title=f"Place number {i}", description="Long description " * 20, price=float(50 + i),
+                      latitude=10.0, longitude=20.0, owner=owner)
+        place.amenities.append(wifi)
+        db.session.add(place)
+        db.session.add(Review(text="Great stay!", rating=4, place=place, user=reviewer))
+        places.append(place)
+    db.session.commit()
+    ids = [place.id for place in places]
+    db.session.expunge_all()
+    return ids
+
+
+def test_fields_load_only_requested_columns(client, db, make_user, query_counter):
+    _populate(db, make_user)
+    query_counter.clear()
+    resp = client.get("/api/v1/places/?fields=title,price&sort=price")
+    assert resp.status_code == 200
+    assert [set(place) for place in resp.json["items"]] == [{"id", "title", "price"}] * 3
+    place_queries = [sql for sql in query_counter if "FROM places" in sql]
+    # table versions + places, no owner join, no amenities or reviews
+    assert len(query_counter) == 2
+    assert "places.description" not in place_queries[0]
+    assert "JOIN users" not in place_queries[0]
+
+
+def test_expand_embeds_only_requested_relationships(client, db, make_user, query_counter):
+    _populate(db, make_user)
+    query_counter.clear()
+    resp = client.get("/api/v1/places/?expand=owner&limit=2")
+    assert resp.status_code == 200
+    place = resp.json["items"][0]
+    assert set(place) == {"id", "title", "description", "price", "latitude", "longitude", "rating", "owner"}
+    assert place["owner"]["first_name"] == "Test"
+    assert len(query_counter) == 2
+    cursor = resp.json["next_cursor"]
+    assert len(client.get(f"/api/v1/places/?expand=owner&limit=2&cursor={cursor}").json["items"]) == 1
+
+
+def test_place_detail_fieldset(client, db, make_user):
+    place_id = _populate(db, make_user, 1)[0]
+    resp = client.get(f"/api/v1/places/{place_id}?fields=title,rating&expand=reviews,amenities")
+    assert resp.status_code == 200
+    assert set(resp.json) == {"id", "title", "rating", "reviews", "amenities"}
+    assert resp.json["rating"]["count"] == 1
+    assert resp.json["amenities"][0]["name"] == "Wifi"
+    assert "owner" in client.get(f"/api/v1/places/{place_id}").json
+
+
+def test_unknown_fields_are_rejected(client):
+    assert client.get("/api/v1/places/?fields=title,password").status_code == 400
+    assert client.get("/api/v1/places/?expand=owner,host").status_code == 400
+    assert client.get("/api/v1/reviews/?fields=secret").status_code == 400
+
+
+def test_review_fieldset(client, db, make_user):
+    _populate(db, make_user, 1)
+    resp = client.get("/api/v1/reviews/?fields=rating&expand=user,place")
+    assert resp.status_code == 200
+    review = resp.json["items"][0]
+    assert set(review) == {"id", "rating", "user", "place"}
+    assert review["place"]["title"] == "Place number 0"
+    review_id = review["id"]
+    resp = client.get(f"/api/v1/reviews/{review_id}?fields=text")
+    assert resp.json == {"id": review_id, "text": "Great stay!"}
@@ -0,0 +1,72 @@
+import re
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from app import create_app, db as _db, metrics
+from app.models.place import Place
+from config import TestingConfig
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    metrics.reset()
+
+
+def _sample(text, name, **labels):
+    """Value of the first series of name carrying all the given labels"""
+    for line in text.splitlines():
+        if line.startswith(name + '{') and all(f'{key}="{value}"' in line for key, value in labels.items()):
+            return float(line.rsplit(' ', 1)[1])
+    return None
+
+
+def test_metrics_count_requests_by_route_and_status(client, db, make_user):
+    owner = make_user()
+    place = Place(title="Cosy flat", description="Nice", price=80.0, latitude=1.0, longitude=1.0, owner=owner)
+    db.session.add(place)
+    db.session.commit()
+    client.get(f"/api/v1/places/{place.id}")
+    client.get("/api/v1/places/missing")
+    resp = client.get("/metrics")
+    assert resp.status_code == 200
+    assert resp.content_type.startswith("text/plain; version=0.0.4")
+    text = resp.get_data(as_text=True)
+    route = "/api/v1/places/<place_id>"
+    assert _sample(text, "hbnb_http_requests_total", endpoint=route, status=200) == 1
+    assert _sample(text, "hbnb_http_requests_total", endpoint=route, status=404) == 1
+    assert _sample(text, "hbnb_http_request_duration_seconds_count", endpoint=route) == 2
+    assert _sample(text, "hbnb_http_request_duration_seconds_bucket", endpoint=route, le="+Inf") == 2
+    assert _sample(text, "hbnb_db_queries_per_request_sum", endpoint=route) >= 2
+    assert _sample(text, "hbnb_db_query_seconds_total", endpoint=route) > 0
+    # /metrics itself is still being served
+    assert "hbnb_http_requests_in_flight 1" in text
+
+
+def test_unmatched_paths_share_one_series(client):
+    client.get("/no/such/page")
+    client.get("/another/missing/page")
+    text = client.get("/metrics").get_data(as_text=True)
+    assert _sample(text, "hbnb_http_requests_total", endpoint="<unmatched>", status=404) == 2
+    assert "/no/such/page" not in text
+
+
+def test_failed_statement_leaves_no_timing_state(db):
+    with db.engine.connect() as conn:
+        with pytest.raises(OperationalError):
+            conn.execute(text("SELECT * FROM no_such_table"))
+        conn.execute(text("SELECT 1"))
+        assert not [key for key in conn.info if key.startswith("metrics")]
+
+
+def test_server_timing_only_when_enabled(client):
+    assert "Server-Timing" not in client.get("/api/v1/amenities/").headers
+
+    class TimingConfig(TestingConfig):
+        METRICS_SERVER_TIMING = True
+
+    app = create_app(TimingConfig)
+    with app.app_context():
+        _db.create_all()
+        header = app.test_client().get("/api/v1/amenities/").headers["Server-Timing"]
+        _db.session.remove()
+    assert re.fullmatch(r'app;dur=[\d.]+, db;dur=[\d.]+;desc="\d+ queries"', header)
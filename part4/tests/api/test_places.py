@@ -0,0 +1,268 @@
+from app.models.place import Place
+from app.models.amenity import Amenity
+from app.models.review import Review
+
+# table versions, places + owners, amenities, reviews
+PLACE_LIST_QUERY_BUDGET = 4
+
+
+def _populate(db, make_user, nb_places):
+    owner = make_user()
+    reviewers = [make_user() for _ in range(2)]
+    amenities = [Amenity(name=f"Amenity {i}") for i in range(3)]
+    db.session.add_all(amenities)
+    for i in range(nb_places):
+        place = Place(title=f"Place number {i}", description="Nice place",
+                      price=float(50 + i), latitude=10.0, longitude=20.0, owner=owner)
+        db.session.add(place)
+        for amenity in amenities:
+            place.amenities.append(amenity)
+        for reviewer in reviewers:
+            db.session.add(Review(text="Great stay!", rating=4, place=place, user=reviewer))
+    db.session.commit()
+    db.session.expunge_all()
+
+
+def test_get_places_returns_relations(client, db, make_user):
+    _populate(db, make_user, 2)
+    resp = client.get("/api/v1/places/")
+    assert resp.status_code == 200
+    assert len(resp.json["items"]) == 2
+    for place in resp.json["items"]:
+        assert place["owner"]["first_name"] == "Test"
+        assert len(place["amenities"]) == 3
+        assert len(place["reviews"]) == 2
+        assert place["reviews"][0]["place_id"] == place["id"]
+
+
+def test_get_places_query_count_is_constant(client, db, make_user, query_counter):
+    _populate(db, make_user, 20)
+    query_counter.clear()
+    resp = client.get("/api/v1/places/?all=true")
+    assert resp.status_code == 200
+    assert len(resp.json) == 20
+    assert len(query_counter) <= PLACE_LIST_QUERY_BUDGET
+
+
+def test_get_places_page_query_count_is_constant(client, db, make_user, query_counter):
+    _populate(db, make_user, 20)
+    query_counter.clear()
+    resp = client.get("/api/v1/places/?limit=5")
+    assert resp.status_code == 200
+    assert len(resp.json["items"]) == 5
+    assert resp.json["next_cursor"]
+    assert len(query_counter) <= PLACE_LIST_QUERY_BUDGET
+
+
+def test_get_place_details_query_count(client, db, make_user, query_counter):
+    _populate(db, make_user, 5)
+    place_id = Place.query.first().id
+    db.session.expunge_all()
+    query_counter.clear()
+    resp = client.get(f"/api/v1/places/{place_id}")
+    assert resp.status_code == 200
+    assert len(resp.json["amenities"]) == 3
+    assert len(query_counter) <= PLACE_LIST_QUERY_BUDGET
+
+
+def _add_priced_places(db, owner, prices):
+    places = [Place(title=f"Place at {price}", description="Nice place", price=float(price),
+                    latitude=10.0, longitude=20.0, owner=owner) for price in prices]
+    db.session.add_all(places)
+    db.session.commit()
+    return places
+
+
+def test_get_places_by_ids(client, db, make_user, query_counter):
+    _populate(db, make_user, 5)
+    ids = [place.id for place in Place.query.order_by(Place.price)]
+    db.session.expunge_all()
+    query_counter.clear()
+    resp = client.get(f"/api/v1/places/?ids={ids[3]},unknown,{ids[0]},{ids[3]}")
+    assert resp.status_code == 200
+    assert [p["id"] for p in resp.json] == [ids[3], ids[0]]
+    assert len(resp.json[0]["amenities"]) == 3
+    assert len(query_counter) <= PLACE_LIST_QUERY_BUDGET
+
+    resp = client.get(f"/api/v1/places/?ids={ids[1]}&fields=title")
+    assert resp.json == [{"id": ids[1], "title": "Place number 1"}]
+    resp = client.get("/api/v1/places/?ids=" + ",".join(["x"] * 201))
+    assert resp.status_code == 400
+
+
+def test_filter_places_by_price(client, db, make_user):
+    _add_priced_places(db, make_user(), [10, 50, 100, 150])
+    resp = client.get("/api/v1/places/?min_price=20&max_price=100")
+    assert resp.status_code == 200
+    assert sorted(p["price"] for p in resp.json["items"]) == [50.0, 100.0]
+
+
+def test_filter_places_by_owner(client, db, make_user):
+    owner = make_user()
+    _add_priced_places(db, owner, [10, 20])
+    _add_priced_places(db, make_user(), [30])
+    resp = client.get(f"/api/v1/places/?owner_id={owner.id}")
+    assert resp.status_code == 200
+    assert {p["owner"]["id"] for p in resp.json["items"]} == {owner.id}
+    assert len(resp.json["items"]) == 2
+
+
+def test_filter_places_by_amenities_requires_all(client, db, make_user):
+    wifi, pool = Amenity(name="Wifi"), Amenity(name="Pool")
+    db.session.add_all([wifi, pool])
+    both, only_wifi, _ = _add_priced_places(db, make_user(), [10, 20, 30])
+    both.amenities.append(wifi)
+    both.amenities.append(pool)
+    only_wifi.amenities.append(wifi)
+    db.session.commit()
+
+    resp = client.get(f"/api/v1/places/?amenity={wifi.id}")
+    assert {p["id"] for p in resp.json["items"]} == {both.id, only_wifi.id}
+    resp = client.get(f"/api/v1/places/?amenity={wifi.id}&amenity={pool.id}")
+    assert [p["id"] for p in resp.json["items"]] == [both.id]
+
+
+def test_create_place_with_amenities(client, db, make_user, auth_headers):
+    wifi, pool = Amenity(name="Wifi"), Amenity(name="Pool")
+    db.session.add_all([wifi, pool])
+    db.session.commit()
+    place = {"title": "Flat", "description": "Nice", "price": 80.0, "latitude": 1.0, "longitude": 2.0}
+    headers = auth_headers(make_user())
+
+    resp = client.post("/api/v1/places/", json=dict(place, amenities=[wifi.id, {"id": pool.id}]), headers=headers)
+    assert resp.status_code == 201
+    resp = client.get(f"/api/v1/places/{resp.json['id']}")
+    assert sorted(a["name"] for a in resp.json["amenities"]) == ["Pool", "Wifi"]
+    resp = client.post("/api/v1/places/", json=dict(place, amenities=[wifi.id, "unknown"]), headers=headers)
+    assert resp.status_code == 400
+    assert Place.query.count() == 1
+
+
+def test_change_place_amenities_in_one_statement(client, db, make_user, auth_headers, query_counter):
+    amenities = [Amenity(name=f"Amenity {i}") for i in range(4)]
+    db.session.add_all(amenities)
+    owner = make_user()
+    place = _add_priced_places(db, owner, [10])[0]
+    place.amenities.append(amenities[0])
+    db.session.commit()
+    ids = [amenity.id for amenity in amenities]
+    url, headers = f"/api/v1/places/{place.id}/amenities", auth_headers(owner)
+
+    query_counter.clear()
+    resp = client.post(url, json=ids[:3], headers=headers)
+    assert resp.status_code == 200
+    assert [a["name"] for a in resp.json] == ["Amenity 0", "Amenity 1", "Amenity 2"]
+    assert sum(statement.startswith("INSERT OR IGNORE INTO amenities_places") for statement in query_counter) == 1
+
+    resp = client.delete(url, json=[ids[0], ids[2]], headers=headers)
+    assert [a["name"] for a in resp.json] == ["Amenity 1"]
+    resp = client.get(f"/api/v1/places/{place.id}")
+    assert [a["name"] for a in resp.json["amenities"]] == ["Amenity 1"]
+
+    # An unknown amenity rejects the whole list
+    resp = client.post(url, json=[ids[3], "unknown"], headers=headers)
+    assert resp.status_code == 400
+    assert [a.id for a in place.amenities] == [ids[1]]
+    assert client.post(url, json=[], headers=headers).status_code == 400
+    assert client.post(url, json=[ids[3]], headers=auth_headers(make_user())).status_code == 403
+    assert client.post("/api/v1/places/unknown/amenities", json=[ids[3]], headers=headers).status_code == 404
+
+
+def test_sort_places_by_price_across_pages(client, db, make_user):
+    _add_priced_places(db, make_user(), [40, 10, 30, 20, 50])
+    prices = []
+    cursor = None
+    while True:
+        url = "/api/v1/places/?sort=-price&limit=2"
+        if cursor:
+            url += f"&cursor={cursor}"
+        resp = client.get(url)
+        assert resp.status_code == 200
+        prices.extend(p["price"] for p in resp.json["items"])
+        cursor = resp.json["next_cursor"]
+        if not cursor:
+            break
+    assert prices == [50.0, 40.0, 30.0, 20.0, 10.0]
+
+
+def test_sort_places_invalid_value(client, db):
+    resp = client.get("/api/v1/places/?sort=title")
+    assert resp.status_code == 400
+
+
+def _add_located_places(db, owner, coords):
+    places = [Place(title=f"Place {i}", description="Nice place", price=100.0,
+                    latitude=lat, longitude=lng, owner=owner) for i, (lat, lng) in enumerate(coords)]
+    db.session.add_all(places)
+    db.session.commit()
+    return places
+
+
+def test_place_geohash_follows_coordinates(db, make_user):
+    place, = _add_located_places(db, make_user(), [(48.8566, 2.3522)])
+    assert place.geohash.startswith("u09tv")
+    place.latitude = 51.5074
+    place.longitude = -0.1278
+    db.session.commit()
+    assert place.geohash.startswith("gcpvj")
+
+
+def test_places_nearby_sorted_by_distance(client, db, make_user):
+    # Louvre, Eiffel Tower, Versailles, Lyon
+    louvre, eiffel, versailles, lyon = _add_located_places(db, make_user(), [
+        (48.8606, 2.3376), (48.8584, 2.2945), (48.8049, 2.1204), (45.7640, 4.8357)])
+    resp = client.get("/api/v1/places/nearby?lat=48.8566&lng=2.3522&radius_km=20")
+    assert resp.status_code == 200
+    assert [p["id"] for p in resp.json] == [louvre.id, eiffel.id, versailles.id]
+    distances = [p["distance_km"] for p in resp.json]
+    assert distances == sorted(distances)
+    assert all(d <= 20 for d in distances)
+
+
+def test_places_nearby_excludes_box_corners(client, db, make_user):
+    # Inside the enclosing box of a 10 km circle, but ~13 km from its center
+    _add_located_places(db, make_user(), [(48.94, 2.47)])
+    resp = client.get("/api/v1/places/nearby?lat=48.8566&lng=2.3522&radius_km=10")
+    assert resp.json == []
+
+
+def test_places_nearby_across_the_antimeridian(client, db, make_user):
+    east, west, far = _add_located_places(db, make_user(), [(0.0, 179.95), (0.0, -179.9), (0.0, -179.0)])
+    resp = client.get("/api/v1/places/nearby?lat=0&lng=179.9&radius_km=50")
+    assert resp.status_code == 200
+    assert [p["id"] for p in resp.json] == [east.id, west.id]
+    resp = client.get("/api/v1/places/nearby?lat=0&lng=-179.9&radius_km=50")
+    assert [p["id"] for p in resp.json] == [west.id, east.id]
+
+
+def test_places_in_bbox(client, db, make_user):
+    paris, lyon = _add_located_places(db, make_user(), [(48.8566, 2.3522), (45.7640, 4.8357)])
+    resp = client.get("/api/v1/places/nearby?bbox=2.0,48.0,3.0,49.0")
+    assert resp.status_code == 200
+    assert [p["id"] for p in resp.json] == [paris.id]
+
+
+def test_places_in_bbox_across_the_antimeridian(client, db, make_user):
+    east, west, _ = _add_located_places(db, make_user(), [(0.0, 179.5), (0.0, -179.9), (0.0, 170.0)])
+    resp = client.get("/api/v1/places/nearby?bbox=179.0,-1.0,-179.0,1.0")
+    assert resp.status_code == 200
+    # The center is on the antimeridian, 0.1 degree from west and 0.5 from east
+    assert [p["id"] for p in resp.json] == [west.id, east.id]
+    assert resp.json[0]["distance_km"] < 12
+
+
+def test_places_nearby_loads_relations_of_kept_places_only(client, db, make_user, query_counter):
+    ids = [place.id for place in _add_located_places(db, make_user(), [(48.85 + i / 1000, 2.35) for i in range(10)])]
+    db.session.expunge_all()
+    query_counter.clear()
+    resp = client.get("/api/v1/places/nearby?lat=48.85&lng=2.35&radius_km=5&limit=2")
+    assert [p["id"] for p in resp.json] == ids[:2]
+    # Every candidate is looked at through its location, relations are loaded for two
+    loads = [statement for statement in query_counter if "places.description" in statement]
+    assert len(loads) == 1 and loads[0].count("?") == 2
+
+
+def test_places_nearby_invalid_input(client, db):
+    assert client.get("/api/v1/places/nearby?lat=48.8&lng=2.3").status_code == 400
+    assert client.get("/api/v1/places/nearby?lat=48.8&lng=2.3&radius_km=5000").status_code == 400
+    assert client.get("/api/v1/places/nearby?bbox=1,2,3").status_code == 400
@@ -0,0 +1,85 @@
+from app.query_guard import QueryGuard, UNDECLARED, statement_shape, view_budget
+
+
+def _api_routes(app):
+    for rule in app.url_map.iter_rules():
+        if rule.rule.startswith("/api/v1/"):
+            for method in sorted(rule.methods - {"HEAD", "OPTIONS"}):
+                yield rule, method
+
+
+def test_every_route_declares_a_budget(app):
+    missing = [f"{method} {rule.rule}" for rule, method in _api_routes(app)
+               if view_budget(rule.endpoint, method) is UNDECLARED]
+    assert missing == []
+
+
+def test_repeated_statements_are_flagged():
+    statements = ["SELECT * FROM users WHERE users.id = ?"] * 5
+    assert QueryGuard.check(10, statements, 5)[0].startswith("possible N+1, 5x")
+    assert QueryGuard.check(10, statements[:4], 5) == []
+    assert QueryGuard.check(3, statements[:4], 5) == ["4 queries, budget 3"]
+    assert statement_shape("SELECT a FROM t WHERE id IN (?, ?, ?)") == statement_shape("SELECT a FROM t WHERE id IN (?)")
+
+
+def test_budget_violations_are_recorded(app, client, query_budgets):
+    view = app.view_functions["protected_protected_resource"].view_class.get
+    budget, view.query_budget = view.query_budget, -1
+    try:
+        client.get("/api/v1/protected/")
+    finally:
+        view.query_budget = budget
+    assert query_budgets.violations.pop().startswith("GET /api/v1/protected/: 0 queries, budget -1")
+
+
+def test_every_route_stays_within_budget(app, client, db, make_user, auth_headers):
+    """Walk every route once, the query_budgets fixture checks each request"""
+    admin, owner, reviewer = make_user(is_admin=True), make_user(), make_user()
+    as_admin, as_owner, as_reviewer = auth_headers(admin), auth_headers(owner), auth_headers(reviewer)
+
+    def call(method, url, status, **kwargs):
+        resp = client.open(url, method=method, **kwargs)
+        assert resp.status_code == status, (method, url, resp.json)
+        return resp
+
+    user_id = call("POST", "/api/v1/users/", 201, json={"first_name": "New", "last_name": "User",
+                                                         "email": "new.user@example.com",
+                                                         "password": "password123"}).json["id"]
+    call("GET", "/api/v1/users/", 200)
+    call("GET", f"/api/v1/users/{user_id}", 200)
+    call("PUT", f"/api/v1/users/{owner.id}", 200, json={"first_name": "Renamed"}, headers=as_owner)
+    call("POST", "/api/v1/auth/login", 200, json={"email": "new.user@example.com", "password": "password123"})
+
+    amenity_id = call("POST", "/api/v1/amenities/", 201, json={"name": "Wifi"}, headers=as_admin).json["id"]
+    call("GET", "/api/v1/amenities/", 200)
+    call("GET", f"/api/v1/amenities/{amenity_id}", 200)
+    call("PUT", f"/api/v1/amenities/{amenity_id}", 200, json={"name": "Fast wifi"}, headers=as_admin)
+
+    place = {"title": "Budget place", "description": "Cheap and quiet", "price": 50.0,
+             "latitude": 10.0, "longitude": 20.0, "amenities": []}
+    place_id = call("POST", "/api/v1/places/", 201, json=place, headers=as_owner).json["id"]
+    call("GET", "/api/v1/places/", 200)
+    call("GET", "/api/v1/places/search?q=quiet", 200)
+    call("GET", "/api/v1/places/nearby?lat=10&lng=20&radius_km=5", 200)
+    call("GET", f"/api/v1/places/{place_id}", 200)
+    call("PUT", f"/api/v1/places/{place_id}", 200, json=dict(place, price=60.0), headers=as_owner)
+    call("POST", f"/api/v1/places/{place_id}/amenities", 200, json=[amenity_id], headers=as_owner)
+    call("DELETE", f"/api/v1/places/{place_id}/amenities", 200, json=[amenity_id], headers=as_owner)
+
+    review_id = call("POST", "/api/v1/reviews/", 201, json={"text": "Lovely place", "rating": 5,
+                                                            "place_id": place_id}, headers=as_reviewer).json["id"]
+    call("GET", "/api/v1/reviews/", 200)
+    call("GET", "/api/v1/reviews/search?q=lovely", 200)
+    call("GET", f"/api/v1/reviews/{review_id}", 200)
+    call("GET", f"/api/v1/places/{place_id}/reviews/", 200)
+    call("PUT", f"/api/v1/reviews/{review_id}", 200, json={"text": "Lovely place!", "rating": 4,
+                                                           "place_id": place_id}, headers=as_reviewer)
+
+    call("GET", "/api/v1/protected/", 200, headers=as_owner)
+    call("GET", "/api/v1/protected/cache", 200, headers=as_admin)
+    call("GET", "/api/v1/protected/passwords", 200, headers=as_admin)
+    call("POST", "/api/v1/bulk/import", 200, data='{"type": "amenity", "name": "Pool"}\n', headers=as_admin)
+    call("GET", "/api/v1/bulk/export/places", 200, headers=as_admin)
+
+    call("DELETE", f"/api/v1/reviews/{review_id}", 200, headers=as_reviewer)
+    call("DELETE", f"/api/v1/places/{place_id}", 200, headers=as_owner)
@@ -0,0 +1,101 @@
+import pytest
+from app.models.place import Place
+from app.models.review import Review
+
+
+def _make_place(db, owner, title="Rated place"):
+    place = Place(title=title, description="Nice", price=10.0, latitude=1.0, longitude=1.0, owner=owner)
+    db.session.add(place)
+    db.session.commit()
+    return place
+
+
+def _rating(client, place_id):
+    return client.get(f"/api/v1/places/{place_id}").json["rating"]
+
+
+def test_rating_aggregates_follow_reviews(client, db, make_user, auth_headers):
+    place = _make_place(db, make_user())
+    place_id = place.id
+    alice, bob = make_user(), make_user()
+
+    resp = client.post("/api/v1/reviews/", json={"text": "Great stay!", "rating": 5, "place_id": place_id},
+                       headers=auth_headers(alice))
+    assert resp.status_code == 201
+    review_id = resp.json["id"]
+    client.post("/api/v1/reviews/", json={"text": "Not bad at all", "rating": 2, "place_id": place_id},
+                headers=auth_headers(bob))
+    rating = _rating(client, place_id)
+    assert rating["count"] == 2
+    assert rating["average"] == 3.5
+    assert rating["histogram"] == {"1": 0, "2": 1, "3": 0, "4": 0, "5": 1}
+
+    resp = client.put(f"/api/v1/reviews/{review_id}", json={"text": "Good stay!", "rating": 4, "place_id": place_id},
+                      headers=auth_headers(alice))
+    assert resp.status_code == 200
+    rating = _rating(client, place_id)
+    assert rating["average"] == 3.0
+    assert rating["histogram"]["5"] == 0
+    assert rating["histogram"]["4"] == 1
+
+    resp = client.delete(f"/api/v1/reviews/{review_id}", headers=auth_headers(alice))
+    assert resp.status_code == 200
+    rating = _rating(client, place_id)
+    assert rating["count"] == 1
+    assert rating["average"] == 2.0
+
+
+def test_sort_places_by_rating(client, db, make_user):
+    owner, reviewer = make_user(), make_user()
+    low, high, unrated = (_make_place(db, owner, title) for title in ("Low", "High", "Unrated"))
+    db.session.add_all([Review(text="Meh stay", rating=2, place=low, user=reviewer),
+                        Review(text="Great stay", rating=5, place=high, user=reviewer)])
+    db.session.commit()
+    resp = client.get("/api/v1/places/?sort=-rating")
+    assert [p["title"] for p in resp.json["items"]] == ["High", "Low", "Unrated"]
+
+
+def test_recompute_ratings_repairs_drift(app, db, make_user):
+    owner, reviewer = make_user(), make_user()
+    place = _make_place(db, owner)
+    db.session.add(Review(text="Great stay", rating=4, place=place, user=reviewer))
+    db.session.commit()
+    place_id = place.id
+    db.session.query(Place).filter_by(id=place_id).update({"review_count": 7, "rating_4": 0})
+    db.session.commit()
+
+    runner = app.test_cli_runner()
+    result = runner.invoke(args=["hbnb", "recompute-ratings", "--dry-run"])
+    assert place_id in result.output
+    assert db.session.get(Place, place_id).review_count == 7
+
+    result = runner.invoke(args=["hbnb", "recompute-ratings"])
+    assert "1 place(s) repaired" in result.output
+    db.session.expire_all()
+    place = db.session.get(Place, place_id)
+    assert (place.review_count, place.rating_sum, place.rating_4, place.average_rating) == (1, 4, 1, 4.0)
+    result = runner.invoke(args=["hbnb", "recompute-ratings", "--dry-run"])
+    assert "0 place(s) found" in result.output
+
+
+def test_duplicate_review_rejected(client, db, make_user, auth_headers):
+    place_id = _make_place(db, make_user()).id
+    headers = auth_headers(make_user())
+    payload = {"text": "Great stay!", "rating": 5, "place_id": place_id}
+    assert client.post("/api/v1/reviews/", json=dict(payload), headers=headers).status_code == 201
+    resp = client.post("/api/v1/reviews/", json=dict(payload), headers=headers)
+    assert resp.status_code == 400
+    assert resp.json["error"] == "You have already reviewed this place."
+
+
+def test_duplicate_review_race_handled(app, db, make_user, monkeypatch):
+    from app.services import facade
+    place_id = _make_place(db, make_user()).id
+    user_id = make_user().id
+    facade.create_review({"text": "Great stay!", "rating": 5, "place_id": place_id}, user_id)
+    # Simulate a concurrent insert slipping past the existence check
+    monkeypatch.setattr(facade.review_repo, "user_has_reviewed", lambda user_id, place_id: False)
+    with pytest.raises(KeyError, match="already reviewed"):
+        facade.create_review({"text": "Great again!", "rating": 4, "place_id": place_id}, user_id)
+    assert Review.query.filter_by(place_id=place_id).count() == 1
+    assert db.session.get(Place, place_id).review_count == 1
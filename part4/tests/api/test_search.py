@@ -0,0 +1,69 @@
+from app.models.place import Place
+from app.models.amenity import Amenity
+from app.models.review import Review
+
+
+def _add_place(db, owner, title, description="A quiet flat", price=100.0, amenities=()):
+    place = Place(title=title, description=description, price=price, latitude=10.0, longitude=20.0, owner=owner)
+    for amenity in amenities:
+        place.amenities.append(amenity)
+    db.session.add(place)
+    db.session.commit()
+    return place
+
+
+def test_search_places_ranks_title_matches_first(client, db, make_user):
+    owner = make_user()
+    in_description = _add_place(db, owner, "Downtown flat", description="Small room with a sea view")
+    in_title = _add_place(db, owner, "Sea view loft")
+    _add_place(db, owner, "Mountain cabin")
+    resp = client.get("/api/v1/places/search?q=sea views")
+    assert resp.status_code == 200
+    assert [p["id"] for p in resp.json] == [in_title.id, in_description.id]
+    assert "<mark>sea</mark> <mark>view</mark>" in resp.json[1]["snippet"]
+    assert resp.json[0]["score"] > resp.json[1]["score"]
+
+
+def test_search_places_combines_with_filters(client, db, make_user):
+    owner = make_user()
+    pool = Amenity(name="Pool")
+    db.session.add(pool)
+    cheap = _add_place(db, owner, "Beach house", price=50.0, amenities=[pool])
+    _add_place(db, owner, "Beach villa", price=500.0, amenities=[pool])
+    _add_place(db, owner, "Beach hut", price=40.0)
+    resp = client.get(f"/api/v1/places/search?q=beach&max_price=100&amenity={pool.id}")
+    assert resp.status_code == 200
+    assert [p["id"] for p in resp.json] == [cheap.id]
+
+
+def test_search_index_follows_updates_and_deletes(client, db, make_user):
+    place = _add_place(db, make_user(), "Old lighthouse")
+    place.title = "Renovated windmill"
+    db.session.commit()
+    assert client.get("/api/v1/places/search?q=lighthouse").json == []
+    assert len(client.get("/api/v1/places/search?q=windmill").json) == 1
+    db.session.delete(place)
+    db.session.commit()
+    assert client.get("/api/v1/places/search?q=windmill").json == []
+
+
+def test_search_rejects_queries_without_words(client):
+    assert client.get('/api/v1/places/search?q=" * -').status_code == 400
+    assert client.get("/api/v1/reviews/search").status_code == 400
+
+
+def test_search_reviews(client, db, make_user):
+    owner, reviewer = make_user(), make_user()
+    first = _add_place(db, owner, "Garden studio")
+    second = _add_place(db, owner, "City loft")
+    db.session.add_all([
+        Review(text="Breakfast was delicious", rating=5, place=first, user=reviewer),
+        Review(text="Noisy street, no breakfast", rating=2, place=second, user=reviewer),
+    ])
+    db.session.commit()
+    resp = client.get("/api/v1/reviews/search?q=breakfast")
+    assert resp.status_code == 200
+    assert len(resp.json) == 2
+    resp = client.get(f"/api/v1/reviews/search?q=breakfast&place_id={second.id}")
+    assert [r["place_id"] for r in resp.json] == [second.id]
+    assert "<mark>breakfast</mark>" in resp.json[0]["snippet"]
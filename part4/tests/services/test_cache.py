@@ -0,0 +1,125 @@
+import time
+from app.models.amenity import Amenity
+from app.models.place import Place
+from app.services import facade
+from app.services.cache import LRUCache
+
+
+def test_lru_cache_hit_and_miss():
+    cache = LRUCache(maxsize=2, ttl=60)
+    assert cache.get("a") is None
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.stats()["evictions"] == 1
+
+
+def test_lru_cache_ttl():
+    cache = LRUCache(maxsize=2, ttl=0.01)
+    cache.set("a", 1)
+    time.sleep(0.02)
+    assert cache.get("a") is None
+
+
+def test_get_amenity_is_served_from_cache(app, db, query_counter):
+    amenity = Amenity(name="Wifi")
+    db.session.add(amenity)
+    db.session.commit()
+    amenity_id = amenity.id
+    db.session.remove()
+
+    assert facade.get_amenity(amenity_id).name == "Wifi"
+    db.session.remove()
+    query_counter.clear()
+    assert facade.get_amenity(amenity_id).name == "Wifi"
+    assert query_counter == []
+
+
+def test_get_amenities_fetches_only_cache_misses(app, db, query_counter):
+    amenities = [Amenity(name=f"Amenity {i}") for i in range(4)]
+    db.session.add_all(amenities)
+    db.session.commit()
+    ids = [amenity.id for amenity in amenities]
+    db.session.remove()
+
+    facade.get_amenity(ids[1])
+    db.session.remove()
+    query_counter.clear()
+    found = facade.get_amenities([ids[2], "unknown", ids[1], ids[0], ids[2]])
+    assert [a.id for a in found] == [ids[2], ids[1], ids[0]]
+    assert len(query_counter) == 1
+    db.session.remove()
+    query_counter.clear()
+    assert [a.name for a in facade.get_amenities(ids[:3])] == ["Amenity 0", "Amenity 1", "Amenity 2"]
+    assert query_counter == []
+
+
+def test_cache_holds_a_snapshot_not_the_session_object(app, db):
+    amenity = Amenity(name="Wifi")
+    db.session.add(amenity)
+    db.session.commit()
+    amenity_id = amenity.id
+    db.session.remove()
+
+    loaded = facade.get_amenity(amenity_id)
+    cached = facade.cache.get(f"amenity:{amenity_id}")
+    assert cached is not loaded and cached not in db.session
+    # Changed but not committed by the loading session
+    loaded.name = "Fast wifi"
+    db.session.flush()
+    assert cached.name == "Wifi"
+    db.session.rollback()
+    db.session.remove()
+    assert facade.get_amenity(amenity_id).name == "Wifi"
+
+
+def test_update_amenity_invalidates_cache(app, db):
+    amenity_id = facade.create_amenity({"name": "Wifi"}).id
+    facade.get_all_amenities()
+    facade.get_amenity(amenity_id)
+    facade.update_amenity(amenity_id, {"name": "Fast wifi"})
+    db.session.remove()
+    assert facade.get_amenity(amenity_id).name == "Fast wifi"
+    assert [a.name for a in facade.get_all_amenities()] == ["Fast wifi"]
+
+
+def test_place_details_invalidated_by_review(app, db, make_user):
+    owner, reviewer = make_user(), make_user()
+    place = Place(title="Cached place", description="Nice", price=10.0,
+                  latitude=1.0, longitude=1.0, owner=owner)
+    db.session.add(place)
+    db.session.commit()
+    place_id, reviewer_id = place.id, reviewer.id
+    assert facade.get_place_with_relations(place_id).review_list == []
+    db.session.remove()
+
+    facade.create_review({"text": "Great stay!", "rating": 5, "place_id": place_id}, reviewer_id)
+    db.session.remove()
+    assert len(facade.get_place_with_relations(place_id).review_list) == 1
+
+
+def test_place_details_refreshed_after_update(client, db, make_user, auth_headers):
+    owner = make_user()
+    place = Place(title="Cached place", description="Nice", price=10.0,
+                  latitude=1.0, longitude=1.0, owner=owner)
+    db.session.add(place)
+    db.session.commit()
+    place_id, headers = place.id, auth_headers(owner)
+
+    assert client.get(f"/api/v1/places/{place_id}").json["title"] == "Cached place"
+    assert client.get(f"/api/v1/places/{place_id}").json["title"] == "Cached place"
+    resp = client.put(f"/api/v1/places/{place_id}", json={"title": "Renamed place"}, headers=headers)
+    assert resp.status_code == 200
+    assert client.get(f"/api/v1/places/{place_id}").json["title"] == "Renamed place"
+    assert facade.get_cache_stats()["hits"] >= 1
@@ -0,0 +1,17 @@
+from app import create_app, db
+from config import ProductionConfig
+
+
+def test_production_pragmas_applied(tmp_path):
+    class Config(ProductionConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'prod.db'}"
+
+    app = create_app(Config)
+    with app.app_context():
+        pragma = lambda name: db.session.execute(db.text(f"PRAGMA {name}")).scalar()
+        assert pragma("journal_mode") == "wal"
+        assert pragma("synchronous") == 1
+        assert pragma("foreign_keys") == 1
+        assert pragma("busy_timeout") == 5000
+        assert db.engine.pool.size() == ProductionConfig.SQLALCHEMY_ENGINE_OPTIONS["pool_size"]
+        db.session.remove()
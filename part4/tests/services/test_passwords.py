@@ -0,0 +1,52 @@
+import threading
+import pytest
+from app import bcrypt, password_hasher
+from app.models.user import User
+from app.passwords import PasswordHasher, PasswordHasherBusy, bcrypt_cost
+
+
+def test_testing_config_uses_low_cost(app, make_user):
+    assert bcrypt_cost(make_user().password) == 4
+    assert password_hasher.stats()["completed"] >= 1
+
+
+def _login_with_hash(client, db, user, cost):
+    """Store a hash of the given cost for user, log in and return the stored hash"""
+    user_id, email = user.id, user.email
+    old_hash = bcrypt.generate_password_hash("password123", cost).decode("utf-8")
+    db.session.query(User).filter_by(id=user_id).update({"password": old_hash})
+    db.session.commit()
+
+    resp = client.post("/api/v1/auth/login", json={"email": email, "password": "password123"})
+    assert resp.status_code == 200
+    db.session.expire_all()
+    return old_hash, db.session.get(User, user_id).password
+
+
+def test_login_rehashes_outdated_hash(client, db, make_user, monkeypatch):
+    user = make_user()
+    monkeypatch.setattr(password_hasher, "rounds", 5)
+    _, new_hash = _login_with_hash(client, db, user, 4)
+    assert bcrypt_cost(new_hash) == 5
+    assert client.post("/api/v1/auth/login", json={"email": user.email, "password": "password123"}).status_code == 200
+
+
+def test_login_keeps_stronger_hash(client, db, make_user):
+    old_hash, new_hash = _login_with_hash(client, db, make_user(), 5)
+    assert new_hash == old_hash
+
+
+def test_hasher_rejects_when_saturated():
+    hasher = PasswordHasher(bcrypt)
+    hasher.configure(rounds=4, workers=1, queue_size=0, timeout=0.05)
+    release = threading.Event()
+    worker = threading.Thread(target=hasher._run, args=(release.wait,))
+    worker.start()
+    try:
+        with pytest.raises(PasswordHasherBusy):
+            hasher.hash("password123")
+        assert hasher.stats()["rejected"] == 1
+    finally:
+        release.set()
+        worker.join()
+    assert hasher.stats()["in_flight"] == 0
@@ -0,0 +1,84 @@
+import pytest
+from sqlalchemy import event
+from app.models.amenity import Amenity
+from app.models.place import Place
+from app.models.review import Review
+from app.persistence.amenity_repository import AmenityRepository
+from app.persistence.unit_of_work import after_commit, unit_of_work
+from app.services import facade
+
+
+@pytest.fixture()
+def commits(db):
+    """Record every COMMIT sent to the database"""
+    committed = []
+
+    def on_commit(conn):
+        committed.append(conn)
+
+    event.listen(db.engine, 'commit', on_commit)
+    yield committed
+    event.remove(db.engine, 'commit', on_commit)
+
+
+def test_repositories_leave_the_commit_to_the_unit_of_work(db, commits):
+    repo = AmenityRepository()
+    repo.add(Amenity(name="Wifi"))
+    db.session.rollback()
+    assert Amenity.query.count() == 0
+
+    with unit_of_work():
+        repo.add(Amenity(name="Wifi"))
+        repo.add(Amenity(name="Pool"))
+    assert len(commits) == 1
+    db.session.rollback()
+    assert Amenity.query.count() == 2
+
+
+def test_nested_units_commit_once_and_roll_back_together(db, commits):
+    called = []
+    with unit_of_work():
+        with unit_of_work():
+            db.session.add(Amenity(name="Wifi"))
+            after_commit(lambda: called.append("inner"))
+        assert commits == [] and called == []
+    assert len(commits) == 1 and called == ["inner"]
+
+    with pytest.raises(ValueError):
+        with unit_of_work():
+            db.session.add(Amenity(name="Pool"))
+            with unit_of_work():
+                after_commit(lambda: called.append("dropped"))
+                raise ValueError("invalid")
+    assert [a.name for a in Amenity.query] == ["Wifi"]
+    assert called == ["inner"]
+
+
+def test_facade_writes_commit_once(db, make_user, commits):
+    owner, reviewer = make_user(), make_user()
+    wifi = Amenity(name="Wifi")
+    db.session.add(wifi)
+    db.session.commit()
+    commits.clear()
+
+    place = facade.create_place({'title': "Flat", 'description': "Nice", 'price': 80.0, 'latitude': 1.0,
+                                 'longitude': 2.0, 'amenities': [wifi.id]}, owner.id)
+    review = facade.create_review({'text': "Great", 'rating': 5, 'place_id': place.id}, reviewer.id)
+    facade.delete_review(review.id)
+    assert len(commits) == 3
+    assert Review.query.count() == 0
+    assert [a.name for a in Place.query.one().amenities] == ["Wifi"]
+
+
+def test_failed_facade_write_rolls_back(db, make_user, commits):
+    owner = make_user()
+    commits.clear()
+    place = facade.create_place({'title': "Flat", 'description': "Nice", 'price': 80.0,
+                                 'latitude': 1.0, 'longitude': 2.0}, owner.id)
+    with pytest.raises(KeyError):
+        facade.create_review({'text': "Mine", 'rating': 5, 'place_id': place.id}, owner.id)
+    with pytest.raises(ValueError):
+        facade.update_place(place.id, {'title': "Renamed", 'price': -1.0})
+    assert len(commits) == 1
+    db.session.expire_all()
+    assert (place.title, place.price, place.review_count) == ("Flat", 80.0, 0)